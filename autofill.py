@@ -0,0 +1,174 @@
+import sys
+import time
+from abc import ABC, abstractmethod
+
+# 填充步骤：('text', 字符串) 逐字符输入；('key', 键名) 按一次功能键
+STEP_TEXT = 'text'
+STEP_KEY = 'key'
+KEY_TAB = 'tab'
+KEY_ENTER = 'enter'
+
+# 功能键对应的 Windows 虚拟键码
+VIRTUAL_KEYS = {KEY_TAB: 0x09, KEY_ENTER: 0x0D}
+
+# 键盘事件：(类型, 码值, 是否抬起)。类型 'unicode' 的码值是 UTF-16 码元，'vk' 的码值是虚拟键码
+EVENT_UNICODE = 'unicode'
+EVENT_VK = 'vk'
+
+
+def login_sequence(username, password):
+    """OneClick 的输入序列：用户名 -> Tab -> 密码 -> Enter"""
+    return [(STEP_TEXT, username), (STEP_KEY, KEY_TAB), (STEP_TEXT, password), (STEP_KEY, KEY_ENTER)]
+
+
+def text_sequence(text):
+    return [(STEP_TEXT, text)]
+
+
+def expand_events(steps):
+    """把填充步骤展开成按下/抬起的键盘事件列表。
+    
+    文本按 UTF-16 码元输入（非 BMP 字符拆成代理对），因此中文等非 ASCII 字符也能直接输入，
+    不依赖当前键盘布局。
+    """
+    events = []
+    for kind, value in steps:
+        if kind == STEP_TEXT:
+            data = value.encode('utf-16-le')
+            for i in range(0, len(data), 2):
+                unit = data[i] | (data[i + 1] << 8)
+                events.append((EVENT_UNICODE, unit, False))
+                events.append((EVENT_UNICODE, unit, True))
+        elif kind == STEP_KEY:
+            code = VIRTUAL_KEYS[value]
+            events.append((EVENT_VK, code, False))
+            events.append((EVENT_VK, code, True))
+        else:
+            raise ValueError(f"未知的填充步骤: {kind}")
+    return events
+
+
+class InputBackend(ABC):
+    """自动填充的键盘输入后端。send 接收填充步骤列表并把它们输入到当前焦点窗口。
+    
+    cancelled 为可选的 threading.Event，置位后不再继续输入（已提交的事件无法撤回）。
+    未实现 send 的后端在创建时就会报错，而不是到填充中途才失败。
+    """
+    name = None
+    label = None
+
+    @abstractmethod
+    def send(self, steps, cancelled=None):
+        """把填充步骤输入到当前焦点窗口"""
+
+
+class SendInputBackend(InputBackend):
+    """Win32 SendInput：整段序列展开成 KEYEVENTF_UNICODE 事件后一次性提交。
+    
+    一次提交的事件不会与用户的真实键鼠输入交错，也没有逐次调用的额外等待。
+    """
+    name = 'sendinput'
+    label = 'SendInput (推荐)'
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class _INPUTUNION(ctypes.Union):
+            # 联合体大小必须与系统定义一致，SendInput 会校验 cbSize
+            _fields_ = [('ki', KEYBDINPUT), ('mi', MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('union', _INPUTUNION)]
+
+        self._ctypes = ctypes
+        self._KEYBDINPUT = KEYBDINPUT
+        self._INPUT = INPUT
+        self._send_input = ctypes.windll.user32.SendInput
+
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+
+    def send(self, steps, cancelled=None):
+        events = expand_events(steps)
+        if not events or (cancelled is not None and cancelled.is_set()):
+            return
+        inputs = (self._INPUT * len(events))()
+        for item, (kind, code, is_up) in zip(inputs, events):
+            item.type = self.INPUT_KEYBOARD
+            flags = self.KEYEVENTF_KEYUP if is_up else 0
+            if kind == EVENT_UNICODE:
+                item.union.ki = self._KEYBDINPUT(0, code, flags | self.KEYEVENTF_UNICODE, 0, 0)
+            else:
+                item.union.ki = self._KEYBDINPUT(code, 0, flags, 0, 0)
+        sent = self._send_input(len(events), inputs, self._ctypes.sizeof(self._INPUT))
+        if sent != len(events):
+            raise OSError(f"SendInput 只提交了 {sent}/{len(events)} 个事件")
+
+
+class PyAutoGuiBackend(InputBackend):
+    """兼容后端：沿用 pyautogui，但关闭每次调用后的 PAUSE 等待。只能输入当前键盘布局可打出的字符"""
+    name = 'pyautogui'
+    label = 'pyautogui (兼容)'
+
+    def send(self, steps, cancelled=None):
+        import pyautogui
+        for kind, value in steps:
+            if cancelled is not None and cancelled.is_set():
+                return
+            if kind == STEP_TEXT:
+                pyautogui.write(value, _pause=False)
+            elif kind == STEP_KEY:
+                pyautogui.press(value, _pause=False)
+            else:
+                raise ValueError(f"未知的填充步骤: {kind}")
+
+
+class RecordingBackend(InputBackend):
+    """记录型假后端：不产生任何真实输入，只记录每次提交的事件和时间，供测试与基准使用"""
+    name = 'recording'
+    label = '仅记录 (调试)'
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        # 每次 send 一条记录：(提交时间, 事件列表)
+        self.submissions = []
+
+    def send(self, steps, cancelled=None):
+        if cancelled is not None and cancelled.is_set():
+            return
+        self.submissions.append((self.clock(), expand_events(steps)))
+
+    def typed_text(self):
+        """把记录的事件还原成文本，功能键以 \\t、\\n 表示"""
+        units = bytearray()
+        for _, events in self.submissions:
+            for kind, code, is_up in events:
+                if is_up:
+                    continue
+                if kind == EVENT_VK:
+                    code = ord('\t') if code == VIRTUAL_KEYS[KEY_TAB] else ord('\n')
+                units += code.to_bytes(2, 'little')
+        return units.decode('utf-16-le')
+
+
+BACKENDS = {cls.name: cls for cls in (SendInputBackend, PyAutoGuiBackend, RecordingBackend)}
+DEFAULT_BACKEND = SendInputBackend.name if sys.platform == 'win32' else PyAutoGuiBackend.name
+# 保存所选后端的设置键
+SETTING_KEY = 'input_backend'
+# 在设置菜单中提供给用户选择的后端
+SELECTABLE_BACKENDS = (SendInputBackend.name, PyAutoGuiBackend.name)
+
+
+def create_backend(name=None):
+    """按名称创建输入后端，名称未知时使用默认后端"""
+    return BACKENDS.get(name or DEFAULT_BACKEND, BACKENDS[DEFAULT_BACKEND])()
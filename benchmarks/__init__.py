@@ -0,0 +1,5 @@
+"""SuperEasyPass 性能基准脚本。在仓库根目录运行: python -m benchmarks.<脚本名>
+
+回归基准：python -m benchmarks.suite --json 结果.json，用 python -m benchmarks.results 对比两次运行；
+其余 bench_* 脚本各自针对某一项优化做新旧实现的对比。
+"""
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def temp_db_path(name='bench.db'):
+    """创建临时目录并返回其中的数据库路径，退出时整体删除"""
+    tmp_dir = tempfile.mkdtemp(prefix='sep_bench_')
+    try:
+        yield os.path.join(tmp_dir, name)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def prefill(conn, count, group_count=50):
+    """绕过业务层直接批量写入 count 条记录，用于快速构造大库"""
+    conn.executemany(
+        'INSERT INTO passwords (id, name, username, password, group_name, note) VALUES (?, ?, ?, ?, ?, ?)',
+        ((i, f'site-{i}', f'user{i}', f'pw{i}', f'group-{i % group_count}', '') for i in range(1, count + 1))
+    )
+    conn.commit()
+
+
+def time_per_call(func, repeat):
+    """重复调用 func，返回平均每次耗时（微秒）"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(row, widths)))
+
+
+def qt_app():
+    """创建（或复用）无界面的 QApplication，并屏蔽 offscreen 插件的提示信息"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtCore import qInstallMessageHandler
+    from PyQt5.QtWidgets import QApplication
+    qInstallMessageHandler(lambda *args: None)
+    return QApplication.instance() or QApplication(['benchmark'])
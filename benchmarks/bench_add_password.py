@@ -0,0 +1,47 @@
+"""add_password 的ID分配开销随库大小的变化。
+
+对比旧版自连接找空洞的查询（每次插入都扫描全表）与 free_ids/rowid 分配，
+期望新版每次插入的耗时在 1k 到 100k 条之间基本保持不变。
+"""
+import sqlite3
+import sys
+
+from database import PasswordDatabase, SharedConnection
+from benchmarks._common import temp_db_path, prefill, time_per_call, print_table
+
+LEGACY_QUERY = ('SELECT MIN(t1.id + 1) FROM passwords t1 '
+                'LEFT JOIN passwords t2 ON t1.id + 1 = t2.id WHERE t2.id IS NULL')
+SIZES = (1000, 10000, 100000)
+INSERTS = 200
+
+
+def bench_size(size):
+    with temp_db_path() as path:
+        db = PasswordDatabase(path)
+        prefill(db.conn, size)
+        # 删除一部分记录制造空洞，使兼容模式确实走复用路径
+        for password_id in range(1, size, max(size // (INSERTS // 2), 1)):
+            db.delete_password(password_id)
+
+        cursor = db.conn.cursor()
+        legacy_us = time_per_call(lambda i: cursor.execute(LEGACY_QUERY).fetchone(), 20)
+
+        db.reuse_ids = True
+        reuse_us = time_per_call(lambda i: db.add_password(f'new-{i}', 'u', 'p'), INSERTS)
+        db.reuse_ids = False
+        rowid_us = time_per_call(lambda i: db.add_password(f'tail-{i}', 'u', 'p'), INSERTS)
+        SharedConnection.close_all()
+    return legacy_us, reuse_us, rowid_us
+
+
+def main(sizes=SIZES):
+    rows = []
+    for size in sizes:
+        legacy_us, reuse_us, rowid_us = bench_size(size)
+        rows.append((size, f'{legacy_us:.0f}', f'{reuse_us:.0f}', f'{rowid_us:.0f}'))
+    print(f'SQLite {sqlite3.sqlite_version}, 每项为单次平均耗时(us)，add_password 含 commit')
+    print_table(('entries', 'legacy_id_query', 'add(reuse_ids)', 'add(rowid)'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,53 @@
+"""OneClick 自动填充的输入提交开销（使用 RecordingBackend，不产生真实按键，可在 Linux 上运行）。
+
+- legacy：旧流程每一步单独调用 pyautogui（write/press/write/press 共 4 次），
+  每次调用后 pyautogui 默认等待 PAUSE=0.1s，这部分等待按调用次数计算
+- batched：整段序列展开成键盘事件后一次提交，等待为 0
+
+表中 prepare 为展开事件并提交给记录后端的实际耗时，wait 为调用之间的固定等待。
+"""
+import sys
+import time
+
+import autofill
+from benchmarks._common import print_table
+
+LENGTHS = (8, 32, 128)
+REPEAT = 200
+# pyautogui.PAUSE 的默认值
+PYAUTOGUI_PAUSE = 0.1
+
+
+def measure(steps, per_step):
+    backend = autofill.RecordingBackend()
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        if per_step:
+            for step in steps:
+                backend.send([step])
+        else:
+            backend.send(steps)
+    elapsed = (time.perf_counter() - started) / REPEAT
+    submissions = len(backend.submissions) // REPEAT
+    events = sum(len(events) for _, events in backend.submissions) // REPEAT
+    wait = submissions * PYAUTOGUI_PAUSE if per_step else 0.0
+    return submissions, events, elapsed, wait
+
+
+def main(lengths=LENGTHS):
+    rows = []
+    for length in lengths:
+        # 混合 ASCII 与中文，中文走 Unicode 事件，不依赖键盘布局
+        username = ('user名' * length)[:length]
+        password = ('P@ss密码' * length)[:length]
+        steps = autofill.login_sequence(username, password)
+        for label, per_step in (('legacy', True), ('batched', False)):
+            submissions, events, elapsed, wait = measure(steps, per_step)
+            rows.append((length, label, submissions, events, f'{elapsed * 1e6:.1f}',
+                         f'{wait * 1000:.0f}', f'{(elapsed + wait) * 1000:.2f}'))
+    print('用户名/密码长度各为 length；prepare 单位 µs，wait/total 单位 ms')
+    print_table(('length', 'mode', 'submissions', 'events', 'prepare', 'wait', 'total'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or LENGTHS)
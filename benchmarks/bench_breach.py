@@ -0,0 +1,63 @@
+"""离线泄露检测的查找耗时。
+
+生成一个 N 行的合成哈希文件（与 Pwned Passwords 相同的 `SHA1:次数\\r\\n` 格式，按哈希排序），分别测：
+- build：建立前缀表 + Bloom 索引的耗时与索引大小
+- hit / miss：命中与未命中各 LOOKUPS 次查找的平均耗时，对比无索引（整文件二分）与有索引
+  （未命中多数由 Bloom 直接判定，不读哈希文件）
+
+真实文件有数十 GB，页缓存未命中时二分路径上的每一页都是一次磁盘读取，索引带来的差距会比这里更大。
+
+用法：python -m benchmarks.bench_breach [行数...]
+"""
+import os
+import random
+import sys
+import time
+
+import breach_check
+from benchmarks._common import print_table, temp_db_path
+
+SIZES = (100000, 1000000)
+LOOKUPS = 10000
+
+
+def write_hash_file(path, size, seed=0):
+    rng = random.Random(seed)
+    hashes = sorted('%040X' % rng.getrandbits(160) for _ in range(size))
+    with open(path, 'w', newline='') as f:
+        f.writelines(f'{h}:{rng.randint(1, 100000)}\r\n' for h in hashes)
+    return hashes
+
+
+def per_lookup_us(hash_file, queries):
+    started = time.perf_counter()
+    for query in queries:
+        hash_file.lookup(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def bench(size):
+    with temp_db_path('pwned.txt') as path:
+        hashes = write_hash_file(path, size)
+        rng = random.Random(1)
+        hits = rng.sample(hashes, min(LOOKUPS, size))
+        misses = ['%040X' % rng.getrandbits(160) for _ in range(LOOKUPS)]
+        with breach_check.PwnedHashFile(path) as hash_file:
+            plain = (per_lookup_us(hash_file, hits), per_lookup_us(hash_file, misses))
+        started = time.perf_counter()
+        index_path = breach_check.build_index(path)
+        build = time.perf_counter() - started
+        with breach_check.PwnedHashFile(path) as hash_file:
+            indexed = (per_lookup_us(hash_file, hits), per_lookup_us(hash_file, misses))
+        return (size, f'{os.path.getsize(path) / 2 ** 20:.0f}', f'{build:.1f}',
+                f'{os.path.getsize(index_path) / 2 ** 20:.1f}',
+                *(f'{us:.1f}' for us in plain + indexed))
+
+
+def main(sizes=SIZES):
+    rows = [bench(size) for size in sizes]
+    print_table(('lines', 'file MB', 'build s', 'index MB', 'hit us', 'miss us', 'idx hit us', 'idx miss us'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,79 @@
+"""字段加密对列表加载和弹出菜单的影响（QT_QPA_PLATFORM=offscreen）。
+
+plain 为未加密数据库，encrypted 为启用加密并解锁后的同一数据库。
+- list：list_entries + PasswordTableModel.set_records（主界面 load_passwords）
+- popup：新的 VaultCache 快照 + PasswordMenu.update_passwords（首次弹出菜单）
+- fill：get_credentials 读取并解密一条记录（OneClick 输入前）
+列表和菜单都不解密，encrypted 的额外开销只来自更长的密文字段；
+只有 fill 需要解密一个字段。unlock 为每次解锁执行一次的 scrypt 密钥派生。
+"""
+import sys
+import time
+
+from benchmarks._common import prefill, print_table, qt_app, temp_db_path
+
+app = qt_app()
+
+from database import PasswordDatabase, SharedConnection
+from menu import PasswordMenu
+from password_model import PasswordTableModel
+from vault_cache import VaultCache
+
+SIZES = (1000, 10000, 100000)
+REPEAT = 5
+FILL_REPEAT = 1000
+
+
+def best(func, repeat=REPEAT):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure(db, size):
+    def load_list():
+        model = PasswordTableModel()
+        model.set_records(db.list_entries())
+
+    def popup():
+        menu = PasswordMenu(VaultCache(db).get_entries())
+        menu.deleteLater()
+
+    started = time.perf_counter()
+    for i in range(FILL_REPEAT):
+        db.get_credentials(1 + i % size)
+    fill = (time.perf_counter() - started) / FILL_REPEAT
+    return best(load_list), best(popup), fill
+
+
+def bench_size(size):
+    with temp_db_path() as path:
+        db = PasswordDatabase(path)
+        prefill(db.conn, size)
+        plain = measure(db, size)
+
+        db.enable_encryption('benchmark')
+        db.lock()
+        started = time.perf_counter()
+        db.unlock('benchmark')
+        unlock = time.perf_counter() - started
+        encrypted = measure(db, size)
+        SharedConnection.close_all()
+    rows = []
+    for label, (list_time, popup_time, fill_time) in (('plain', plain), ('encrypted', encrypted)):
+        rows.append((size, label, f'{list_time * 1000:.1f}', f'{popup_time * 1000:.1f}',
+                     f'{fill_time * 1e6:.1f}', f'{unlock * 1000:.0f}' if label == 'encrypted' else '-'))
+    return rows
+
+
+def main(sizes=SIZES):
+    rows = [row for size in sizes for row in bench_size(size)]
+    print('list/popup 单位 ms（取最小值），fill 单位 µs/次，unlock 单位 ms')
+    print_table(('entries', 'mode', 'list', 'popup', 'fill', 'unlock'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,106 @@
+"""导入期间 GUI 线程的阻塞时间：同步调用 vault_io.import_json 与经 DatabaseExecutor 提交对比。
+
+GUI 线程上运行一个 5ms 的 QTimer，记录相邻两次触发之间的最大间隔（界面最长卡顿），
+同时统计导入期间从 GUI 共享连接读取 list_entries 的最长耗时（主界面/快捷键菜单的读取）。
+"""
+import json
+import os
+import sys
+import time
+
+from benchmarks._common import print_table, qt_app, temp_db_path
+
+app = qt_app()
+
+from PyQt5.QtCore import QTimer
+
+import vault_io
+from database import PasswordDatabase, SharedConnection
+from db_worker import DatabaseExecutor
+
+SIZES = (10000, 50000)
+TICK_MS = 5
+
+
+class StallMeter:
+    def __init__(self, db):
+        self.db = db
+        self.last = None
+        self.max_gap = 0.0
+        self.max_read = 0.0
+        self.timer = QTimer()
+        self.timer.setInterval(TICK_MS)
+        self.timer.timeout.connect(self.tick)
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last is not None:
+            self.max_gap = max(self.max_gap, now - self.last)
+        started = time.perf_counter()
+        self.db.list_entries_page(None, 100)
+        self.max_read = max(self.max_read, time.perf_counter() - started)
+        self.last = time.perf_counter()
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+
+def write_json(path, size):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{'group': f'g{i % 50}', 'name': f'site-{i}', 'username': f'user{i}', 'password': f'pw{i}',
+                    'note': '备注' * 20} for i in range(size)], f, ensure_ascii=False)
+
+
+def bench_sync(path, json_path):
+    db = PasswordDatabase(path)
+    meter = StallMeter(db)
+    meter.start()
+    app.processEvents()
+    started = time.perf_counter()
+    # 同步导入期间事件循环无法运行，卡顿时间就是导入耗时
+    vault_io.import_json(db, json_path)
+    elapsed = time.perf_counter() - started
+    app.processEvents()
+    meter.tick()
+    meter.timer.stop()
+    return elapsed, meter.max_gap, meter.max_read
+
+
+def bench_async(path, json_path):
+    db = PasswordDatabase(path)
+    executor = DatabaseExecutor(db)
+    meter = StallMeter(db)
+    meter.start()
+    started = time.perf_counter()
+    future = executor.submit(vault_io.import_json, json_path)
+    while not future.done():
+        app.processEvents()
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    meter.timer.stop()
+    executor.shutdown()
+    return elapsed, meter.max_gap, meter.max_read
+
+
+def bench_size(size):
+    rows = []
+    with temp_db_path() as path:
+        json_path = os.path.join(os.path.dirname(path), 'import.json')
+        write_json(json_path, size)
+        for label, func in (('sync', bench_sync), ('executor', bench_async)):
+            db_path = os.path.join(os.path.dirname(path), f'{label}.db')
+            elapsed, gap, read = func(db_path, json_path)
+            rows.append((size, label, f'{elapsed * 1000:.0f}', f'{gap * 1000:.1f}', f'{read * 1000:.2f}'))
+            SharedConnection.close_all()
+    return rows
+
+
+def main(sizes=SIZES):
+    rows = [row for size in sizes for row in bench_size(size)]
+    print('单位 ms；stall 为 GUI 事件循环最长停顿，read 为导入期间 GUI 连接读取一页的最长耗时')
+    print_table(('entries', 'mode', 'import', 'stall', 'read'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,90 @@
+"""单条新增/修改/删除后刷新列表的耗时（QT_QPA_PLATFORM=offscreen）。
+
+reload 为旧流程：写入后 load_passwords 重新读取并比对整张列表；
+row 为写方法返回变化的记录，模型按 (分组, 名称) 二分定位后只插入/移动/删除这一行。
+两者都包含数据库写入本身。
+"""
+import sys
+import time
+
+from benchmarks._common import prefill, print_table, qt_app, temp_db_path
+
+app = qt_app()
+
+from PyQt5.QtWidgets import QTableView
+
+from database import PasswordDatabase, SharedConnection
+from password_model import PasswordTableModel, PasswordFilterProxyModel
+
+SIZES = (1000, 10000, 100000)
+REPEAT = 20
+
+
+def make_view(db):
+    model = PasswordTableModel()
+    proxy = PasswordFilterProxyModel()
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.setModel(proxy)
+    view.show()
+    model.set_source(db)
+    model.fetch_all()
+    app.processEvents()
+    return model, view
+
+
+def timed(func):
+    started = time.perf_counter()
+    for i in range(REPEAT):
+        func(i)
+        app.processEvents()
+    return (time.perf_counter() - started) / REPEAT * 1000
+
+
+def bench_size(size):
+    with temp_db_path() as path:
+        db = PasswordDatabase(path)
+        prefill(db.conn, size)
+        model, view = make_view(db)
+        rows = []
+
+        def reload_add(i):
+            db.add_password(f'reload-{i}', 'u', 'p', 'group-1')
+            model.refresh()
+
+        def reload_update(i):
+            db.update_password(1 + i, f'renamed-reload-{i}', 'u', 'p', 'group-2')
+            model.refresh()
+
+        def reload_delete(i):
+            db.delete_password(1000 + i)
+            model.refresh()
+
+        def row_add(i):
+            model.insert_record(db.add_password(f'row-{i}', 'u', 'p', 'group-1'))
+
+        def row_update(i):
+            old = db.get_entry(100 + i)
+            model.replace_record(old, db.update_password(100 + i, f'renamed-row-{i}', 'u', 'p', 'group-2'))
+
+        def row_delete(i):
+            model.remove_record(db.delete_password(500 + i))
+
+        for label, (reload_func, row_func) in (('add', (reload_add, row_add)),
+                                               ('update', (reload_update, row_update)),
+                                               ('delete', (reload_delete, row_delete))):
+            rows.append((size, label, f'{timed(reload_func):.2f}', f'{timed(row_func):.2f}'))
+        assert list(zip(model.ids, model.groups, model.names)) == db.list_entries()
+        view.deleteLater()
+        SharedConnection.close_all()
+    return rows
+
+
+def main(sizes=SIZES):
+    rows = [row for size in sizes for row in bench_size(size)]
+    print('每次写入 + 刷新列表的平均耗时，单位 ms')
+    print_table(('entries', 'op', 'reload', 'row'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
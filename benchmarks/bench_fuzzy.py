@@ -0,0 +1,37 @@
+"""快捷键菜单模糊搜索的逐键耗时（纯 Python，不依赖 Qt）"""
+import sys
+import time
+
+from fuzzy import FuzzyMatcher
+from benchmarks._common import print_table
+from benchmarks.bench_search import make_columns
+
+SIZES = (1000, 10000, 100000)
+QUERIES = ('github', 'gml', 'wx12', '微信3', 'bank-99')
+
+
+def bench_size(size):
+    groups, names = make_columns(size)
+    started = time.perf_counter()
+    matcher = FuzzyMatcher(zip(range(size), groups, names))
+    build = time.perf_counter() - started
+
+    timings = []
+    for query in QUERIES:
+        matcher.search('')
+        for end in range(1, len(query) + 1):
+            started = time.perf_counter()
+            matcher.search(query[:end])
+            timings.append(time.perf_counter() - started)
+    return (f'{build * 1000:.1f}', f'{sum(timings) / len(timings) * 1000:.2f}',
+            f'{max(timings) * 1000:.2f}')
+
+
+def main(sizes=SIZES):
+    rows = [(size, *bench_size(size)) for size in sizes]
+    print(f'逐字输入 {", ".join(QUERIES)}，取前 10 条；单位 ms')
+    print_table(('entries', 'rebuild', 'avg/keystroke', 'max/keystroke'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,48 @@
+"""列表查询：get_all_passwords（全部字段）与 list_entries（只取 id/分组/名称）的耗时和内存峰值。
+
+每条记录带 note_size 字节的备注，观察两者随备注长度的变化。
+"""
+import sys
+import time
+import tracemalloc
+
+from database import PasswordDatabase, SharedConnection
+from benchmarks._common import print_table, temp_db_path
+
+SIZE = 10000
+NOTE_SIZES = (0, 1024, 8192)
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    return f'{elapsed * 1000:.1f}ms/{peak / 2 ** 20:.1f}MB'
+
+
+def bench_note_size(size, note_size):
+    with temp_db_path() as path:
+        db = PasswordDatabase(path)
+        note = '备' * (note_size // 3)
+        db.conn.executemany(
+            'INSERT INTO passwords (id, name, username, password, group_name, note) VALUES (?, ?, ?, ?, ?, ?)',
+            ((i, f'site-{i}', f'user{i}', f'pw{i}', f'group-{i % 50}', note) for i in range(1, size + 1))
+        )
+        db.conn.commit()
+        result = (measure(db.get_all_passwords), measure(db.list_entries))
+        SharedConnection.close_all()
+    return result
+
+
+def main(size=SIZE):
+    rows = [(note_size, *bench_note_size(size, note_size)) for note_size in NOTE_SIZES]
+    print(f'{size} 条记录，耗时/Python 内存峰值')
+    print_table(('note bytes', 'get_all_passwords', 'list_entries'), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else SIZE)
@@ -0,0 +1,117 @@
+"""快捷键菜单从触发到可见的耗时（QT_QPA_PLATFORM=offscreen）。
+
+- rebuild+50ms：旧流程，每次弹出都新建 PasswordMenu，再等固定 50ms 定时器后显示
+- persistent：常驻菜单，密码库未变化，弹出只是 popup
+- persistent+patch：常驻菜单，弹出前有一条记录被修改，需要增量修补
+
+另外统计菜单构建耗时与 QObject 数量：lazy 为初次构建（只有分组子菜单），
+groups 为展开全部分组后，eager 为再展开全部条目后（相当于旧版一次性构建的规模）。
+"""
+import sys
+import time
+
+from benchmarks._common import print_table, qt_app
+
+app = qt_app()
+
+from PyQt5.QtCore import QEventLoop, QObject, QPoint, QTimer
+from PyQt5.QtWidgets import QMenu
+
+from menu import PasswordMenu
+
+SIZES = (100, 1000)
+BUILD_SIZES = (1000, 10000)
+REPEAT = 5
+
+
+def make_rows(size, group_count=20):
+    return sorted(((i, f'group-{i % group_count}', f'site-{i}') for i in range(size)), key=lambda r: (r[1], r[2]))
+
+
+def wait_visible(menu):
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.timeout.connect(lambda: menu.isVisible() and loop.quit())
+    timer.start(0)
+    loop.exec_()
+    timer.stop()
+
+
+def legacy_popup(rows, point, holder):
+    started = time.perf_counter()
+    if holder:
+        holder[0].hide()
+        holder[0].deleteLater()
+    menu = PasswordMenu(rows)
+    holder[:] = [menu]
+    QTimer.singleShot(50, lambda: menu.popup(point))
+    wait_visible(menu)
+    return time.perf_counter() - started
+
+
+def persistent_popup(menu, rows, point):
+    started = time.perf_counter()
+    menu.update_passwords(rows)
+    menu.popup(point)
+    wait_visible(menu)
+    return time.perf_counter() - started
+
+
+def bench_size(size):
+    point = QPoint(100, 100)
+    rows = make_rows(size)
+    holder = []
+    legacy = []
+    for _ in range(REPEAT):
+        legacy.append(legacy_popup(rows, point, holder))
+        holder[0].hide()
+
+    menu = PasswordMenu(rows)
+    unchanged = []
+    patched = []
+    for i in range(REPEAT):
+        unchanged.append(persistent_popup(menu, rows, point))
+        menu.hide()
+        changed = list(rows)
+        changed[i] = changed[i][:2] + (f'renamed-{i}',)
+        patched.append(persistent_popup(menu, changed, point))
+        menu.hide()
+    return [f'{min(v) * 1000:.1f}' for v in (legacy, unchanged, patched)]
+
+
+def count_objects(menu):
+    return len(menu.findChildren(QObject)) + 1
+
+
+def bench_build(size):
+    rows = make_rows(size, group_count=max(size // 50, 1))
+    started = time.perf_counter()
+    menu = PasswordMenu(rows)
+    lazy = (time.perf_counter() - started, count_objects(menu))
+
+    started = time.perf_counter()
+    for group_menu in list(menu._group_menus.values()):
+        group_menu.aboutToShow.emit()
+    groups = (time.perf_counter() - started, count_objects(menu))
+
+    started = time.perf_counter()
+    for group_menu in menu._group_menus.values():
+        for entry_menu in group_menu.findChildren(QMenu):
+            entry_menu.aboutToShow.emit()
+    eager = (lazy[0] + groups[0] + time.perf_counter() - started, count_objects(menu))
+    menu.deleteLater()
+    return [f'{t * 1000:.0f}ms/{n}' for t, n in (lazy, groups, eager)]
+
+
+def main(sizes=SIZES, build_sizes=BUILD_SIZES):
+    rows = [(size, *bench_size(size)) for size in sizes]
+    print('触发到菜单可见的耗时(ms，取最小值)')
+    print_table(('entries', 'rebuild+50ms', 'persistent', 'persistent+patch'), rows)
+    print()
+    rows = [(size, *bench_build(size)) for size in build_sizes]
+    print('菜单构建 耗时/QObject数量（每 50 条一个分组）')
+    print_table(('entries', 'lazy', 'groups', 'eager'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""备注自动保存的写入次数：旧流程（每次失去焦点 UPDATE + COMMIT）与延迟写入队列对比。
+
+模拟在 RECORDS 条记录间来回切换编辑：每次查看一条记录时输入 KEYSTROKES 个字符，
+期间失去焦点 FOCUS_OUTS 次（其中一半发生在没有新输入时），最后退出。
+commits 为数据库实际执行的 COMMIT 次数，gui 为 GUI 线程上每次按键的平均处理耗时。
+"""
+import sys
+import time
+
+from benchmarks._common import prefill, print_table, qt_app, temp_db_path
+from benchmarks.bench_write_latency import CommitCounter
+
+app = qt_app()
+
+from database import PasswordDatabase, SharedConnection
+from db_worker import DatabaseExecutor
+from note_autosave import NoteWriteBehind
+
+RECORDS = 5
+VISITS = 40
+KEYSTROKES = 30
+FOCUS_OUTS = 4
+
+
+def session():
+    """产生 (记录ID, 事件, 内容) 序列，事件为 'view'、'key' 或 'blur'"""
+    notes = {i: '' for i in range(1, RECORDS + 1)}
+    for visit in range(VISITS):
+        record_id = 1 + visit % RECORDS
+        yield record_id, 'view', notes[record_id]
+        for key in range(KEYSTROKES):
+            notes[record_id] += '字'
+            yield record_id, 'key', notes[record_id]
+            if key % (KEYSTROKES // FOCUS_OUTS) == 0:
+                yield record_id, 'blur', notes[record_id]
+                yield record_id, 'blur', notes[record_id]
+
+
+def bench_legacy(db):
+    counter = CommitCounter(db.conn)
+    started = time.perf_counter()
+    keys = 0
+    for record_id, event, text in session():
+        if event == 'blur':
+            db.update_note(record_id, text)
+        elif event == 'key':
+            keys += 1
+    return counter.count, (time.perf_counter() - started) / keys
+
+
+def bench_write_behind(db):
+    executor = DatabaseExecutor(db)
+    counter = executor.submit(lambda worker_db: CommitCounter(worker_db.conn)).result()
+    autosave = NoteWriteBehind(executor)
+    started = time.perf_counter()
+    keys = 0
+    for record_id, event, text in session():
+        if event == 'view':
+            autosave.flush()
+            if autosave.pending_text(record_id) is None:
+                autosave.loaded(record_id, text)
+        elif event == 'key':
+            autosave.note_changed(record_id, text)
+            keys += 1
+        else:
+            autosave.flush()
+    elapsed = (time.perf_counter() - started) / keys
+    autosave.flush(wait=True)
+    executor.shutdown()
+    return counter.count, elapsed
+
+
+def main():
+    rows = []
+    for label, func in (('legacy', bench_legacy), ('write-behind', bench_write_behind)):
+        with temp_db_path() as path:
+            db = PasswordDatabase(path)
+            prefill(db.conn, RECORDS)
+            commits, per_key = func(db)
+            final = [db.get_note(i) for i in range(1, RECORDS + 1)]
+            SharedConnection.close_all()
+        rows.append((label, commits, f'{per_key * 1e6:.1f}', sum(map(len, final))))
+    print(f'{RECORDS} 条记录，{VISITS} 次切换，每次 {KEYSTROKES} 个字符；gui 单位 µs/按键')
+    print_table(('mode', 'commits', 'gui', 'saved chars'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""分页读取与列表首次打开耗时（QT_QPA_PLATFORM=offscreen）。
+
+- offset / keyset：读取位于 depth 处的一页（PAGE_SIZE 条），OFFSET 需要先扫过前面的行，
+  keyset 从上一页最后一条的 (分组, 名称) 直接定位
+- open full：list_entries 全量读取后 set_records（旧的 load_passwords）
+- open lazy：set_source 只读取第一页，其余在滚动到底部时按需读取
+"""
+import sys
+import time
+
+from benchmarks._common import prefill, print_table, qt_app, temp_db_path
+
+app = qt_app()
+
+from database import PasswordDatabase, SharedConnection
+from password_model import PasswordTableModel
+
+SIZES = (100000, 1000000)
+PAGE_SIZE = PasswordTableModel.PAGE_SIZE
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def offset_page(db, offset):
+    return db.conn.execute(
+        'SELECT id, group_name, name FROM passwords ORDER BY group_name, name LIMIT ? OFFSET ?',
+        (PAGE_SIZE, offset)
+    ).fetchall()
+
+
+def bench_size(size):
+    with temp_db_path() as path:
+        db = PasswordDatabase(path)
+        prefill(db.conn, size)
+        rows = []
+        for depth in (0, size // 2, size - PAGE_SIZE):
+            # keyset 所需的起点：depth 前一条记录的排序键
+            after = offset_page(db, depth - 1)[0][1:] if depth else None
+            rows.append((size, f'page@{depth}', f'{timed(lambda: offset_page(db, depth)):.2f}',
+                         f'{timed(lambda: db.list_entries_page(after, PAGE_SIZE)):.2f}'))
+
+        full = timed(lambda: PasswordTableModel().set_records(db.list_entries()))
+        lazy = timed(lambda: PasswordTableModel().set_source(db))
+        rows.append((size, 'open', f'{full:.1f}', f'{lazy:.1f}'))
+        SharedConnection.close_all()
+    return rows
+
+
+def main(sizes=SIZES):
+    rows = [row for size in sizes for row in bench_size(size)]
+    print('单位 ms；page 行为 offset 与 keyset，open 行为全量加载与按需加载')
+    print_table(('entries', 'case', 'offset/full', 'keyset/lazy'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,63 @@
+"""批量更换密码的耗时。
+
+- legacy：旧的生成方式（random.choice 逐字符）加逐条 update_password，每条一个事务
+- batch：password_gen.rotate_passwords，一次 os.urandom 抽取 + 拒绝采样，旧密码写入历史，整批一个事务
+- batch+enc：同上，数据库已启用加密，新密码逐条加密，历史中原样保存旧密文
+- generate：只生成密码、不写库的耗时
+
+用法：python -m benchmarks.bench_rotation [条目数...]
+"""
+import random
+import string
+import sys
+import time
+
+import password_gen
+import vault_crypto
+from benchmarks._common import prefill, print_table, temp_db_path
+from database import PasswordDatabase, SharedConnection
+
+SIZES = (1000, 10000)
+
+
+def legacy_rotate(db, ids):
+    chars = string.ascii_letters + string.digits + "!@#$%^&*"
+    for password_id in ids:
+        _, name, username, _, group_name, note = db.get_password_by_id(password_id)
+        password = ''.join(random.choice(chars) for _ in range(16))
+        db.update_password(password_id, name, username, password, group_name, note)
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def bench(size, mode):
+    with temp_db_path() as path:
+        db = PasswordDatabase(path)
+        prefill(db.conn, size)
+        if mode == 'batch+enc':
+            db.enable_encryption('benchmark')
+        ids = [row[0] for row in db.list_entries()]
+        if mode == 'legacy':
+            elapsed = timed(lambda: legacy_rotate(db, ids))
+        else:
+            elapsed = timed(lambda: password_gen.rotate_passwords(db, ids, password_gen.DEFAULT_POLICY))
+        SharedConnection.close_all()
+    return elapsed
+
+
+def main(sizes=SIZES):
+    modes = ['legacy', 'batch'] + (['batch+enc'] if vault_crypto.CRYPTO_AVAILABLE else [])
+    rows = []
+    for size in sizes:
+        generate = timed(lambda: password_gen.generate_batch(password_gen.DEFAULT_POLICY, size))
+        rows.append((size, f'{generate:.1f}', *(f'{bench(size, mode):.1f}' for mode in modes)))
+    print('耗时(ms)')
+    print_table(('entries', 'generate', *modes), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
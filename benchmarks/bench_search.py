@@ -0,0 +1,61 @@
+"""SearchIndex 逐键输入的耗时（纯 Python，不依赖 Qt）。
+
+模拟在名称搜索框中逐字输入关键字，统计每次按键的过滤耗时；
+legacy 为旧实现的做法：每次按键对每一行重新 lower() 后做子串判断。
+"""
+import random
+import sys
+import time
+
+from search_index import SearchIndex
+from benchmarks._common import print_table
+
+SIZES = (1000, 10000, 100000)
+QUERIES = ('github', 'mail.163', 'site-12345', '微信')
+WORDS = ('github', 'gitlab', 'gmail', 'mail.163', 'qq', '微信', '微博', '抖音', 'aliyun', 'bank', 'steam', 'site')
+
+
+def make_columns(size, seed=1):
+    rng = random.Random(seed)
+    groups = [f'分组{rng.randrange(200)}' for _ in range(size)]
+    names = [f'{rng.choice(WORDS)}-{i}' for i in range(size)]
+    return groups, names
+
+
+def legacy_search(groups, names, group_filter, name_filter):
+    return [row for row in range(len(names))
+            if group_filter in groups[row].lower() and name_filter in names[row].lower()]
+
+
+def type_query(func, query):
+    timings = []
+    for end in range(1, len(query) + 1):
+        started = time.perf_counter()
+        func(query[:end])
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def bench_size(size):
+    groups, names = make_columns(size)
+    started = time.perf_counter()
+    index = SearchIndex(groups, names)
+    build = time.perf_counter() - started
+
+    new, old = [], []
+    for query in QUERIES:
+        index.search('', '')
+        new += type_query(lambda q: index.search('', q), query)
+        old += type_query(lambda q: legacy_search(groups, names, '', q), query)
+    ms = lambda values: f'{sum(values) / len(values) * 1000:.2f}/{max(values) * 1000:.2f}'
+    return f'{build * 1000:.1f}', ms(new), ms(old)
+
+
+def main(sizes=SIZES):
+    rows = [(size, *bench_size(size)) for size in sizes]
+    print(f'逐字输入 {", ".join(QUERIES)}；每次按键耗时 平均/最大 (ms)')
+    print_table(('entries', 'index build', 'SearchIndex', 'legacy scan'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,86 @@
+"""冷启动耗时：每次在新的子进程中运行 main.py --profile-startup（QT_QPA_PLATFORM=offscreen）。
+
+对比两种启动方式：
+- window：启动即创建并显示主界面（双击启动）
+- tray：只安装快捷键和托盘图标，主界面第一次打开时才创建（开机自启动）
+
+wall 为从启动解释器到进程退出的总耗时（含解释器自身启动），其余列为 main.py 内 StartupProfiler
+记录的各阶段耗时，均取 RUNS 次的中位数。
+
+用法：python -m benchmarks.bench_startup [--json 输出路径] [条目数...]
+回归对比使用 benchmarks.suite 中的 startup.* 用例（同样调用 run_once），结果可由 benchmarks.results 比较。
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks._common import prefill, print_table, temp_db_path
+from database import PasswordDatabase, SharedConnection
+
+SIZES = (0, 10000)
+MODES = ('tray', 'window')
+RUNS = 5
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+PHASES = ('import_qt', 'import_core', 'hotkey', 'import_window', 'window', 'total')
+
+
+def prepare(path, size):
+    # 在子进程外建好数据库（含迁移），避免把首次建库计入启动耗时
+    db = PasswordDatabase(path)
+    if size:
+        prefill(db.conn, size)
+    SharedConnection.close_all()
+
+
+def run_once(work_dir, mode):
+    profile_path = os.path.join(work_dir, 'profile.json')
+    args = [sys.executable, MAIN, '--profile-startup', '--profile-json', profile_path]
+    if mode == 'tray':
+        args.append('--tray')
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    start = time.perf_counter()
+    # main.py 使用当前目录下的 passwords.db
+    subprocess.run(args, cwd=work_dir, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wall = (time.perf_counter() - start) * 1000
+    with open(profile_path, encoding='utf-8') as f:
+        profile = json.load(f)
+    return dict(profile['phases_ms'], total=profile['total_ms'], wall=wall)
+
+
+def bench(size, mode):
+    with temp_db_path('passwords.db') as path:
+        prepare(path, size)
+        runs = [run_once(os.path.dirname(path), mode) for _ in range(RUNS)]
+    return {key: round(statistics.median(run.get(key, 0.0) for run in runs), 1)
+            for key in ('wall',) + PHASES}
+
+
+def main():
+    argv = sys.argv[1:]
+    json_path = None
+    if '--json' in argv:
+        i = argv.index('--json')
+        json_path = argv[i + 1]
+        del argv[i:i + 2]
+    sizes = [int(a) for a in argv] or SIZES
+
+    results = {}
+    rows = []
+    for size in sizes:
+        for mode in MODES:
+            result = bench(size, mode)
+            results[f'{mode}-{size}'] = result
+            rows.append((size, mode, *(result[key] for key in ('wall',) + PHASES)))
+    print_table(('entries', 'mode', 'wall ms', *(f'{p} ms' for p in PHASES)), rows)
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == '__main__':
+    main()
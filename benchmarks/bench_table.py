@@ -0,0 +1,86 @@
+"""主界面列表的加载与过滤耗时（QT_QPA_PLATFORM=offscreen）。
+
+legacy 复现旧实现：QTableWidget.setRowCount + 每行两个 QTableWidgetItem，过滤时逐行 setRowHidden；
+model 为 PasswordTableModel + PasswordFilterProxyModel。
+reload 为数据不变时再次加载，filter 为输入一个名称关键字后的过滤耗时。
+"""
+import sys
+import time
+
+from benchmarks._common import print_table, qt_app
+
+app = qt_app()
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QTableView, QTableWidget, QTableWidgetItem
+
+from password_model import PasswordTableModel, PasswordFilterProxyModel
+
+SIZES = (1000, 10000, 100000)
+
+
+def make_records(size, group_count=200):
+    return sorted(((i, f'group-{i % group_count}', f'site-{i}') for i in range(size)), key=lambda r: (r[1], r[2]))
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    app.processEvents()
+    return time.perf_counter() - started
+
+
+def bench_legacy(records):
+    table = QTableWidget()
+    table.setColumnCount(2)
+    table.resize(800, 500)
+    table.show()
+
+    def load():
+        table.setRowCount(len(records))
+        for row, (record_id, group_name, name) in enumerate(records):
+            group_item = QTableWidgetItem(group_name)
+            group_item.setData(Qt.UserRole, record_id)
+            name_item = QTableWidgetItem(name)
+            name_item.setData(Qt.UserRole, record_id)
+            table.setItem(row, 0, group_item)
+            table.setItem(row, 1, name_item)
+
+    def search(name_filter):
+        for row in range(table.rowCount()):
+            name_text = table.item(row, 1).text().lower()
+            table.setRowHidden(row, bool(name_filter) and name_filter not in name_text)
+
+    result = (timed(load), timed(load), timed(lambda: search('site-1')))
+    table.deleteLater()
+    return result
+
+
+def bench_model(records):
+    model = PasswordTableModel()
+    proxy = PasswordFilterProxyModel()
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.setModel(proxy)
+    view.resize(800, 500)
+    view.show()
+    result = (timed(lambda: model.set_records(records)),
+              timed(lambda: model.set_records(records)),
+              timed(lambda: proxy.set_filters('', 'site-1')))
+    view.deleteLater()
+    return result
+
+
+def main(sizes=SIZES):
+    rows = []
+    for size in sizes:
+        records = make_records(size)
+        cells = [f'{t * 1000:.0f}' for t in bench_legacy(records) + bench_model(records)]
+        rows.append((size, *cells))
+    print('耗时(ms)')
+    print_table(('entries', 'legacy load', 'legacy reload', 'legacy filter',
+                 'model load', 'model reload', 'model filter'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,104 @@
+"""快捷键触发链路的分阶段延迟（合成事件源 + QT_QPA_PLATFORM=offscreen，可在 Linux CI 中运行）。
+
+每次触发经过的阶段：
+- hook：事件源收到输入到状态机做出决定
+- dispatch：排队投递到 GUI 线程处理
+- fetch：读取密码库快照（未变化时直接命中缓存）
+- patch：增量修补菜单（未变化时跳过）
+- popup：在鼠标位置弹出菜单
+
+每 CHANGE_EVERY 次触发修改一条记录，使 fetch/patch 走一次重新加载的路径。
+
+用法：python -m benchmarks.bench_trigger [--json 输出路径] [--max-p90-ms 阈值] [条目数...]
+指定 --max-p90-ms 时，若任一规模的 total p90 超过阈值则以退出码 1 结束，供 CI 检测回归。
+"""
+import os
+import sys
+
+from benchmarks._common import prefill, print_table, qt_app, temp_db_path
+
+app = qt_app()
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from database import PasswordDatabase, SharedConnection
+from hotkey_manager import HotkeyManager
+from trigger import SyntheticEventSource
+
+SIZES = (100, 1000, 10000)
+TRIGGERS = 200
+CHANGE_EVERY = 20
+
+
+class WindowSignals(QObject):
+    """HotkeyManager 只依赖主窗口的 input_backend_changed 信号"""
+    input_backend_changed = pyqtSignal(str)
+
+
+def bench_size(size):
+    with temp_db_path() as path:
+        cwd = os.getcwd()
+        # HotkeyManager 使用当前目录下的 passwords.db
+        os.chdir(os.path.dirname(path))
+        try:
+            db = PasswordDatabase()
+            prefill(db.conn, size)
+            window = WindowSignals()
+            manager = HotkeyManager(window, SyntheticEventSource)
+            source = manager.event_source
+            for i in range(TRIGGERS):
+                if i % CHANGE_EVERY == 0:
+                    db.update_note(1 + i % size, f'note-{i}')
+                source.click(100, 100)
+                # 排队中的重复触发应被合并
+                source.click(100, 100)
+                app.processEvents()
+                manager.menu.hide()
+            summary = manager.tracer.summary()
+            manager.close()
+            manager.fill_worker.stop(1)
+            manager.menu.deleteLater()
+        finally:
+            SharedConnection.close_all()
+            os.chdir(cwd)
+    return summary
+
+
+def main(argv):
+    json_path = None
+    max_p90_ms = None
+    sizes = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--json':
+            json_path = next(args)
+        elif arg == '--max-p90-ms':
+            max_p90_ms = float(next(args))
+        else:
+            sizes.append(int(arg))
+
+    results = {}
+    rows = []
+    for size in sizes or SIZES:
+        summary = results[size] = bench_size(size)
+        for stage, stats in summary.items():
+            rows.append((size, stage, stats['count'], stats['p50_us'], stats['p90_us'], stats['p99_us'],
+                         stats['max_us']))
+    print(f'每种规模触发 {TRIGGERS} 次（每次连续两次点击），单位 µs')
+    print_table(('entries', 'stage', 'count', 'p50', 'p90', 'p99', 'max'), rows)
+
+    if json_path:
+        import json
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({str(k): v for k, v in results.items()}, f, ensure_ascii=False, indent=4)
+
+    if max_p90_ms is not None:
+        slow = [size for size, summary in results.items() if summary['total']['p90_us'] > max_p90_ms * 1000]
+        if slow:
+            print(f'total p90 超过 {max_p90_ms}ms: {slow}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
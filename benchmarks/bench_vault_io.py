@@ -0,0 +1,78 @@
+"""JSON 导入/导出的峰值内存随库大小的变化。
+
+用 tracemalloc 统计 Python 堆峰值：旧实现（fetchall + json.dump / json.load）随条数线性增长，
+流式实现应基本保持不变。参数为条数列表，例如: python -m benchmarks.bench_vault_io 1000 1000000
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import vault_io
+from database import PasswordDatabase, SharedConnection
+from benchmarks._common import temp_db_path, print_table
+
+SIZES = (1000, 100000)
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def legacy_export(db, path):
+    export_list = [{"group": g, "name": n, "username": u, "password": p, "note": note}
+                   for _, n, u, p, g, note in db.get_all_passwords()]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(export_list, f, indent=4, ensure_ascii=False)
+
+
+def legacy_load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return len(json.load(f))
+
+
+def write_source(path, size):
+    """用流式写法生成待导入文件，避免生成过程本身占用大量内存"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i in range(size):
+            f.write(',\n' if i else '\n')
+            f.write(vault_io._format_item({"group": f"分组{i % 200}", "name": f"站点{i}", "username": f"user{i}",
+                                           "password": f"pw{i}", "note": "备注" * 20}))
+        f.write('\n]')
+
+
+def bench_size(size):
+    with temp_db_path() as db_path:
+        src = os.path.join(os.path.dirname(db_path), 'src.json')
+        out = os.path.join(os.path.dirname(db_path), 'out.json')
+        write_source(src, size)
+        db = PasswordDatabase(db_path)
+        results = [
+            measure(lambda: legacy_load(src)),
+            measure(lambda: vault_io.import_json(db, src)),
+            measure(lambda: legacy_export(db, out)),
+            measure(lambda: vault_io.export_json(db, out)),
+        ]
+        SharedConnection.close_all()
+    return results
+
+
+def main(sizes=SIZES):
+    rows = []
+    for size in sizes:
+        cells = [f'{t:.2f}s/{mb:.1f}MB' for t, mb in bench_size(size)]
+        rows.append((size, *cells))
+    print('每项为 耗时/Python堆峰值')
+    print_table(('entries', 'json.load', 'import_json', 'legacy_export', 'export_json'), rows)
+
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or SIZES)
@@ -0,0 +1,69 @@
+"""单条写入延迟与提交次数：旧的默认连接 vs 共享调优连接 vs 事务合并。
+
+Python 无法直接统计 fsync 系统调用，这里用 trace 回调统计实际执行的 COMMIT 次数，
+再按 SQLite 文档给出的每次提交刷盘次数估算 fsync：
+回滚日志(DELETE) + synchronous=FULL 每次提交约 3 次；WAL + synchronous=NORMAL 提交时为 0，
+只在自动检查点（默认每 1000 页）时刷盘 2 次。
+"""
+import sqlite3
+import sys
+
+from database import PasswordDatabase, SharedConnection
+from benchmarks._common import temp_db_path, time_per_call, print_table
+
+WRITES = 500
+
+
+class CommitCounter:
+    def __init__(self, conn):
+        self.count = 0
+        conn.set_trace_callback(self)
+
+    def __call__(self, statement):
+        if statement.strip().upper().startswith('COMMIT'):
+            self.count += 1
+
+
+def bench_legacy(path, writes):
+    """复现旧实现：默认 journal_mode/synchronous，每次写入后立即 commit"""
+    PasswordDatabase(path)
+    SharedConnection.close_all()
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=DELETE')
+    counter = CommitCounter(conn)
+
+    def write(i):
+        conn.execute('INSERT INTO passwords (name, username, password, group_name) VALUES (?, ?, ?, ?)',
+                     (f'legacy-{i}', 'u', 'p', 'g'))
+        conn.commit()
+    us = time_per_call(write, writes)
+    conn.close()
+    return us, counter.count, counter.count * 3
+
+
+def bench_shared(path, writes, batched):
+    db = PasswordDatabase(path)
+    counter = CommitCounter(db.conn)
+    if batched:
+        with db.transaction():
+            us = time_per_call(lambda i: db.add_password(f'batch-{i}', 'u', 'p'), writes)
+    else:
+        us = time_per_call(lambda i: db.add_password(f'single-{i}', 'u', 'p'), writes)
+    SharedConnection.close_all()
+    return us, counter.count, 0
+
+
+def main(writes=WRITES):
+    rows = []
+    for label, func in (('legacy DELETE/FULL', lambda p: bench_legacy(p, writes)),
+                        ('shared WAL/NORMAL', lambda p: bench_shared(p, writes, False)),
+                        ('WAL + transaction()', lambda p: bench_shared(p, writes, True))):
+        with temp_db_path() as path:
+            us, commits, fsyncs = func(path)
+        rows.append((label, f'{us:.0f}', commits, f'~{fsyncs} (+checkpoints)' if not fsyncs else f'~{fsyncs}'))
+    print(f'{writes} 次写入，SQLite {sqlite3.sqlite_version}')
+    print_table(('mode', 'us/write', 'commits', 'fsync(est.)'), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else WRITES)
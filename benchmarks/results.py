@@ -0,0 +1,120 @@
+"""基准结果的 JSON 格式，以及两次运行之间的对比。
+
+结果文件：
+    {"format": 1, "meta": {...运行环境...}, "results": {"<用例>@<规模>": {"median_ms": ..., "min_ms": ..., "repeat": ...}}}
+
+对比：python -m benchmarks.results 基线.json 本次.json [--threshold 1.25] [--min-delta-ms 0.05]
+中位数变慢超过 threshold 倍且绝对差超过 min-delta-ms 的用例记为回归，有回归时以退出码 1 结束。
+"""
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 1.25
+# 低于该差值的变化视为计时噪声（毫秒）
+DEFAULT_MIN_DELTA_MS = 0.05
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchResults:
+    def __init__(self):
+        self.meta = {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'commit': _git_commit(),
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self.results = {}
+
+    def measure(self, name, func, repeat=1, setup=None):
+        """调用 func(i) repeat 次并记录每次耗时，返回最后一次的返回值。setup(i) 在每次调用前执行，不计时"""
+        samples = []
+        value = None
+        for i in range(repeat):
+            if setup is not None:
+                setup(i)
+            started = time.perf_counter()
+            value = func(i)
+            samples.append(time.perf_counter() - started)
+        self.record(name, samples)
+        return value
+
+    def record(self, name, samples):
+        self.results[name] = {
+            'median_ms': round(statistics.median(samples) * 1000, 4),
+            'min_ms': round(min(samples) * 1000, 4),
+            'repeat': len(samples),
+        }
+
+    def to_dict(self):
+        return {'format': FORMAT_VERSION, 'meta': self.meta, 'results': self.results}
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{path}: 不支持的结果格式 {data.get('format')}")
+    return data
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """逐用例对比中位数，返回 [(用例, 基线ms, 本次ms, 比值, 是否回归)]，只包含两边都有的用例"""
+    rows = []
+    for name, old in baseline['results'].items():
+        new = current['results'].get(name)
+        if new is None:
+            continue
+        old_ms, new_ms = old['median_ms'], new['median_ms']
+        ratio = new_ms / old_ms if old_ms else float('inf') if new_ms else 1.0
+        regressed = ratio > threshold and new_ms - old_ms > min_delta_ms
+        rows.append((name, old_ms, new_ms, ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    import argparse
+    from benchmarks._common import print_table
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.results')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument('--all', action='store_true', help="显示全部用例（默认只显示有明显变化的）")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    rows = compare(baseline, current, args.threshold, args.min_delta_ms)
+    shown = [r for r in rows if args.all or r[4] or r[3] < 1 / args.threshold]
+    if shown:
+        print_table(('case', 'baseline ms', 'current ms', 'ratio', ''),
+                    [(name, f'{old:.3f}', f'{new:.3f}', f'{ratio:.2f}x', 'REGRESSION' if bad else '')
+                     for name, old, new, ratio, bad in shown])
+    missing = sorted(set(baseline['results']) - set(current['results']))
+    if missing:
+        print(f"本次缺少的用例: {', '.join(missing)}")
+    regressions = sum(1 for r in rows if r[4])
+    print(f"{len(rows)} 个用例，{regressions} 个回归（阈值 {args.threshold}x）")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
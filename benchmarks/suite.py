@@ -0,0 +1,275 @@
+"""回归基准：在 vault_gen 生成的合成库上计时，结果写成 JSON 供 benchmarks.results 对比。
+
+每个规模在独立的临时目录中运行，依次覆盖：
+- startup.*：在生成的库上冷启动 main.py（子进程，托盘与窗口两种模式，见 bench_startup）
+- db.*：PasswordDatabase 的每个公开方法（只读用例在前，写入用例在后，加密相关最后）
+- io.*：JSON 导出、导入到空库、再次导入同一文件（全部未变化）
+- window.* / table.*：主界面创建、load_passwords、按分组/名称/全文过滤（QT_QPA_PLATFORM=offscreen）
+- menu.*：快捷键菜单初次构建、无变化修补、单条改名后修补
+
+未被任何用例覆盖的 PasswordDatabase 公开方法会打印出来，新增方法时记得补上用例。
+
+用法：
+    python -m benchmarks.suite [--json 输出路径] [--repeat 倍数] [条目数...]
+    python -m benchmarks.results 基线.json 本次.json
+"""
+import argparse
+import os
+
+from benchmarks._common import print_table, qt_app, temp_db_path
+
+app = qt_app()
+
+import password_gen
+import vault_crypto
+import vault_io
+from database import PasswordDatabase, SharedConnection
+from menu import PasswordMenu
+from password_manager import PasswordManagerWindow
+from benchmarks import bench_startup, vault_gen
+from benchmarks.results import BenchResults
+
+PASSPHRASE = 'benchmark passphrase'
+# 不是普通方法、或由其它用例一并覆盖的公开成员
+COVERED_ELSEWHERE = {'close': 'open_thread_connection', 'write_generation': 'transaction'}
+
+
+def sample_ids(db, k=1000):
+    """按固定步长从全部ID中取样，保证不同运行取到相同的记录"""
+    ids = [row[0] for row in db.list_entries()]
+    step = max(1, len(ids) // k)
+    return ids[::step][:k]
+
+
+def db_cases(db, count, scale):
+    """[(用例名, 重复次数, func(i))]。用例名的方括号部分区分同一方法的不同参数"""
+    ids = sample_ids(db)
+    entries = db.list_entries()
+    middle = entries[len(entries) // 2]
+    group = middle[1]
+    pick = lambda i: ids[i % len(ids)]
+    n = lambda base: max(1, int(base * scale))
+
+    def consume(iterable):
+        for _ in iterable:
+            pass
+
+    added = []
+
+    def add(i):
+        added.append(db.add_password(f'bench-新增-{i}', 'user', 'secret', group, ''))
+
+    def update(i):
+        _, name, username, password, group_name, note = db.get_password_by_id(pick(i))
+        db.update_password(pick(i), name, username, password + 'x', group_name, note)
+
+    def open_thread_connection(i):
+        db.open_thread_connection().close()
+
+    return [
+        ('data_version', n(1000), lambda i: db.data_version()),
+        ('count_passwords', n(100), lambda i: db.count_passwords()),
+        ('get_all_groups', n(20), lambda i: db.get_all_groups()),
+        ('list_entries', n(5), lambda i: db.list_entries()),
+        ('list_entries[until]', n(5), lambda i: db.list_entries(until=middle[1:])),
+        ('list_entries_page[first]', n(200), lambda i: db.list_entries_page()),
+        ('list_entries_page[middle]', n(200), lambda i: db.list_entries_page(after=middle[1:])),
+        ('iter_entries', n(5), lambda i: consume(db.iter_entries())),
+        ('get_all_passwords', n(3), lambda i: db.get_all_passwords()),
+        ('iter_passwords', n(3), lambda i: consume(db.iter_passwords())),
+        ('iter_all_passwords', n(3), lambda i: consume(db.iter_all_passwords())),
+        ('get_passwords_by_group', n(200), lambda i: db.get_passwords_by_group(group)),
+        ('get_entry', n(1000), lambda i: db.get_entry(pick(i))),
+        ('get_password_by_id', n(1000), lambda i: db.get_password_by_id(pick(i))),
+        ('get_credentials', n(1000), lambda i: db.get_credentials(pick(i))),
+        ('get_username', n(1000), lambda i: db.get_username(pick(i))),
+        ('get_password', n(1000), lambda i: db.get_password(pick(i))),
+        ('get_note', n(1000), lambda i: db.get_note(pick(i))),
+        ('get_password_id', n(1000), lambda i: db.get_password_id(group, middle[2])),
+        ('check_name_exists', n(1000), lambda i: db.check_name_exists(middle[2], group)),
+        ('search[cjk]', n(50), lambda i: db.search('银行')),
+        ('search[latin]', n(50), lambda i: db.search('github')),
+        ('search[multi]', n(50), lambda i: db.search('招商银行 user1')),
+        ('fts_tokenizer', n(200), lambda i: db.fts_tokenizer()),
+        ('get_setting', n(1000), lambda i: db.get_setting('missing')),
+        ('encryption_enabled', n(1000), lambda i: db.encryption_enabled()),
+        ('is_unlocked', n(1000), lambda i: db.is_unlocked()),
+        ('decrypt_field[plain]', n(1000), lambda i: db.decrypt_field('plain')),
+        ('create_table', n(100), lambda i: db.create_table()),
+        ('transaction', n(200), lambda i: _empty_transaction(db)),
+        ('open_thread_connection', n(50), open_thread_connection),
+        ('set_setting', n(200), lambda i: db.set_setting('bench', str(i))),
+        ('add_group', n(200), lambda i: db.add_group(f'bench-分组-{i}')),
+        ('delete_group', n(200), lambda i: db.delete_group(f'bench-分组-{i}')),
+        ('add_password', n(200), add),
+        ('update_password', n(200), update),
+        ('update_note', n(200), lambda i: db.update_note(pick(i), f'备注 {i}')),
+        ('update_notes', n(5), lambda i: db.update_notes((pid, f'批量备注 {i}') for pid in ids)),
+        ('rotate_passwords', n(3), lambda i: password_gen.rotate_passwords(db, ids, password_gen.DEFAULT_POLICY)),
+        ('last_rotation', n(200), lambda i: db.last_rotation()),
+        ('get_password_history', n(1000), lambda i: db.get_password_history(pick(i))),
+        ('restore_rotation', n(3), lambda i: db.restore_rotation(db.last_rotation()[0])),
+        ('purge_password_history', n(3), lambda i: db.purge_password_history()),
+        ('bulk_upsert[unchanged]', n(3), lambda i: vault_gen.populate(db, min(count, 10000))),
+        ('delete_password', n(200), lambda i: db.delete_password(added[i][0]) if i < len(added) else None),
+        ('rebuild_search_index', 1, lambda i: db.rebuild_search_index(db.fts_tokenizer())),
+    ]
+
+
+def _empty_transaction(db):
+    with db.transaction():
+        pass
+
+
+def crypto_cases(db, scale):
+    """加密相关用例会把测试库转成加密库，放在最后执行"""
+    if not vault_crypto.CRYPTO_AVAILABLE:
+        return []
+    ids = sample_ids(db)
+    pick = lambda i: ids[i % len(ids)]
+    n = lambda base: max(1, int(base * scale))
+    token = []
+
+    def enable(i):
+        db.enable_encryption(PASSPHRASE)
+        token.append(db.get_password(ids[0], decrypt=False))
+
+    return [
+        ('enable_encryption', 1, enable),
+        ('lock', n(1000), lambda i: db.lock()),
+        ('unlock', 1, lambda i: db.unlock(PASSPHRASE)),
+        ('get_credentials[encrypted]', n(1000), lambda i: db.get_credentials(pick(i))),
+        ('decrypt_field[encrypted]', n(1000), lambda i: db.decrypt_field(token[0])),
+    ]
+
+
+def run_startup(results, count, work_dir, scale):
+    """每次启动一个新进程：wall 为子进程总耗时，其余为 main.py 内 StartupProfiler 记录的阶段耗时"""
+    runs = max(1, int(bench_startup.RUNS * scale))
+    for mode in bench_startup.MODES:
+        profiles = []
+        results.measure(f'startup.{mode}[wall]@{count}',
+                        lambda i: profiles.append(bench_startup.run_once(work_dir, mode)), runs)
+        for phase in bench_startup.PHASES:
+            samples = [profile[phase] / 1000 for profile in profiles if phase in profile]
+            if samples:
+                results.record(f'startup.{mode}[{phase}]@{count}', samples)
+
+
+def run_io(results, db, count, work_dir):
+    export_path = os.path.join(work_dir, 'export.json')
+    results.measure(f'io.export_json@{count}', lambda i: vault_io.export_json(db, export_path))
+    # 导入目标库放在同一临时目录中，由 bench_size 结束时的 close_all 关闭
+    target = PasswordDatabase(os.path.join(work_dir, 'import.db'))
+    results.measure(f'io.import_json[empty]@{count}', lambda i: vault_io.import_json(target, export_path))
+    results.measure(f'io.import_json[unchanged]@{count}', lambda i: vault_io.import_json(target, export_path))
+
+
+def run_qt(results, db, count, scale):
+    n = lambda base: max(1, int(base * scale))
+
+    def create(i):
+        window = PasswordManagerWindow()
+        window.show()
+        app.processEvents()
+        return window
+
+    window = results.measure(f'window.create@{count}', create)
+
+    def processed(func):
+        def run(i):
+            func(i)
+            app.processEvents()
+        return run
+
+    results.measure(f'window.load_passwords@{count}', processed(lambda i: window.load_passwords()), n(20))
+    results.measure(f'table.fetch_all@{count}', processed(lambda i: window.password_model.fetch_all()))
+
+    def search(group_text='', name_text='', fulltext=''):
+        def run(i):
+            window.search_group_input.setText(group_text)
+            window.search_name_input.setText(name_text)
+            window.search_all_input.setText(fulltext)
+            window.search_passwords()
+            app.processEvents()
+        return run
+
+    # 每次计时前先清空过滤条件（不计时），测的是从未过滤到过滤完成的耗时
+    clear = search()
+    results.measure(f'table.filter[group]@{count}', search(group_text='工作'), n(10), setup=clear)
+    results.measure(f'table.filter[name]@{count}', search(name_text='github'), n(10), setup=clear)
+    results.measure(f'table.filter[fulltext]@{count}', search(fulltext='银行'), n(10), setup=clear)
+    results.measure(f'table.filter[clear]@{count}', clear, n(10), setup=search(name_text='github'))
+    window.shutdown()
+    window.close()
+    window.deleteLater()
+
+    entries = db.list_entries()
+    menu = results.measure(f'menu.build@{count}', lambda i: PasswordMenu(entries))
+    results.measure(f'menu.update[unchanged]@{count}', lambda i: menu.update_passwords(entries), n(20))
+    renamed = list(entries)
+    record_id, group_name, name = renamed[len(renamed) // 2]
+    renamed[len(renamed) // 2] = (record_id, group_name, name + '-改')
+
+    def update_one(i):
+        menu.update_passwords(renamed if i % 2 == 0 else entries)
+
+    results.measure(f'menu.update[one changed]@{count}', update_one, n(20))
+    menu.deleteLater()
+    app.processEvents()
+
+
+def public_methods():
+    return {name for name in dir(PasswordDatabase) if not name.startswith('_')}
+
+
+def bench_size(results, count, scale):
+    with temp_db_path('passwords.db') as path:
+        work_dir = os.path.dirname(path)
+        cwd = os.getcwd()
+        # 主界面使用当前目录下的 passwords.db
+        os.chdir(work_dir)
+        try:
+            db = PasswordDatabase()
+            results.measure(f'gen.populate@{count}', lambda i: vault_gen.populate(db, count))
+            # 在用例修改数据库（最后还会启用加密）之前测冷启动
+            run_startup(results, count, work_dir, scale)
+            covered = set()
+            for name, repeat, func in db_cases(db, count, scale):
+                results.measure(f'db.{name}@{count}', func, repeat)
+                covered.add(name.split('[')[0])
+            run_io(results, db, count, work_dir)
+            run_qt(results, db, count, scale)
+            for name, repeat, func in crypto_cases(db, scale):
+                results.measure(f'db.{name}@{count}', func, repeat)
+                covered.add(name.split('[')[0])
+        finally:
+            SharedConnection.close_all()
+            os.chdir(cwd)
+    covered |= {name for name, via in COVERED_ELSEWHERE.items() if via in covered}
+    return public_methods() - covered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    parser.add_argument('sizes', nargs='*', type=int, default=list(vault_gen.SIZES))
+    parser.add_argument('--json', metavar='PATH', help="把结果写入 JSON 文件")
+    parser.add_argument('--repeat', type=float, default=1.0, help="各用例重复次数的倍数，CI 中可调小")
+    args = parser.parse_args(argv)
+
+    results = BenchResults()
+    uncovered = set()
+    for count in args.sizes:
+        uncovered |= bench_size(results, count, args.repeat)
+
+    print_table(('case', 'median ms', 'min ms', 'repeat'),
+                [(name, f"{r['median_ms']:.3f}", f"{r['min_ms']:.3f}", r['repeat'])
+                 for name, r in results.results.items()])
+    if uncovered:
+        print(f"未覆盖的 PasswordDatabase 方法: {', '.join(sorted(uncovered))}")
+    if args.json:
+        results.dump(args.json)
+
+
+if __name__ == '__main__':
+    main()
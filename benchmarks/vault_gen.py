@@ -0,0 +1,57 @@
+"""确定性的合成密码库，供基准使用。同一 (count, seed) 总是生成完全相同的记录。
+
+记录格式与导出的 JSON 一致（group, name, username, password, note），可以直接交给
+PasswordDatabase.bulk_upsert 或写成导入文件。名称约六成为中文，分组数随规模增长
+（每 100 条一个分组，至少 10 个），备注大多为空或一两句话，约 5% 为数千字的长备注。
+"""
+import random
+import string
+
+SIZES = (1000, 10000, 100000)
+
+CJK_WORDS = ('工商银行', '招商银行', '建设银行', '支付宝', '淘宝', '京东', '微信', '网易邮箱', '百度网盘',
+             '哔哩哔哩', '知乎', '豆瓣', '携程旅行', '美团', '小红书', '钉钉', '飞书', '腾讯云', '阿里云',
+             '华为帐号', '中国移动', '国家电网', '社保查询', '住房公积金', '学信网', '个人所得税', '铁路购票')
+LATIN_WORDS = ('github', 'gitlab', 'google', 'outlook', 'aws-console', 'azure', 'slack', 'notion',
+               'figma', 'steam', 'spotify', 'dropbox', 'jira', 'docker-hub', 'pypi', 'vpn')
+GROUP_WORDS = ('工作', '个人', '金融', '购物', '社交', '开发', '家庭', '旅行', '服务器', 'Work', 'Personal')
+NOTE_SENTENCES = ('安全问题答案是小学班主任的名字。', '绑定的手机号已经更换，登录需要短信验证。',
+                  '备用邮箱见个人分组。', '每九十天强制修改一次密码。', '二次验证使用手机上的验证器应用。',
+                  'Recovery codes are stored offline.', 'Shared with the on-call team, rotate after use.',
+                  '客服电话：400-000-0000，工作日 9:00-18:00。', 'API token scope: read-only.')
+PASSWORD_CHARS = string.ascii_letters + string.digits + '!@#$%^&*'
+
+
+def group_count(count):
+    return max(10, count // 100)
+
+
+def _note(rng):
+    roll = rng.random()
+    if roll < 0.5:
+        return ''
+    if roll < 0.95:
+        return ''.join(rng.choices(NOTE_SENTENCES, k=rng.randint(1, 3)))
+    # 长备注：约 4000 个字符
+    return '\n'.join(''.join(rng.choices(NOTE_SENTENCES, k=8)) for _ in range(25))
+
+
+def generate(count, seed=0):
+    """生成 count 条记录的迭代器"""
+    rng = random.Random(seed)
+    groups = [f'{rng.choice(GROUP_WORDS)}-{i:04d}' for i in range(group_count(count))]
+    for i in range(count):
+        word = rng.choice(CJK_WORDS) if rng.random() < 0.6 else rng.choice(LATIN_WORDS)
+        yield {
+            'group': rng.choice(groups),
+            # 序号保证同一分组内名称唯一
+            'name': f'{word}-{i}',
+            'username': f'user{rng.randrange(10 ** 6)}@example.com',
+            'password': ''.join(rng.choices(PASSWORD_CHARS, k=rng.randint(12, 24))),
+            'note': _note(rng),
+        }
+
+
+def populate(db, count, seed=0):
+    """把生成的记录写入 db，返回 bulk_upsert 的 (新增数, 更新数, 未变化数)"""
+    return db.bulk_upsert(generate(count, seed))
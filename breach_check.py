@@ -0,0 +1,276 @@
+"""离线密码泄露检测：在本地的 Pwned Passwords SHA-1 哈希文件中查找密码，不访问网络。
+
+哈希文件为 haveibeenpwned 提供的“按哈希排序”版本，每行 `40位大写SHA1:出现次数`，以 \\r\\n 或 \\n 结尾，
+完整文件有几十 GB。文件只做内存映射，由操作系统按需换页，查找一次只触及二分路径上的几十个页。
+
+可选索引（默认路径为哈希文件名加 .sepidx）在一次顺序扫描中建立：
+- 前缀表：每个 PREFIX_BITS 位哈希前缀在文件中的起始偏移，查找时二分范围直接缩小到一个前缀的几百 KB 内；
+- Bloom 过滤器：每条哈希约 BLOOM_BITS_PER_ENTRY 位，不在过滤器中的哈希直接判定未泄露，完全不读哈希文件。
+索引按本机字节序保存，只在建立它的机器上使用。文件头记录建立时哈希文件的大小和首末两条哈希，
+哈希文件被替换或更新后自动找到的旧索引会被忽略（退回整文件二分），显式指定的则直接报错。
+建立：python -m breach_check index 哈希文件
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+HASH_LENGTH = 40
+INDEX_SUFFIX = '.sepidx'
+INDEX_MAGIC = b'SEPHIDX2'
+# 文件头：魔数、前缀位数、Bloom 哈希函数个数、Bloom 位数、条目数、哈希文件大小、首条哈希、末条哈希
+INDEX_HEADER = struct.Struct('=8sIIQQQ40s40s')
+PREFIX_BITS = 20
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 7
+# 保存哈希文件路径的设置键
+SETTING_KEY = 'breach_hash_file'
+
+
+def sha1_hex(password):
+    return hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+
+
+def _bloom_positions(hash_hex, bits, hashes):
+    # SHA-1 本身均匀分布，直接从哈希值中取两段做双重哈希，不需要再计算别的哈希函数
+    h1 = int(hash_hex[:16], 16)
+    h2 = int(hash_hex[16:32], 16) | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class IndexMismatch(ValueError):
+    """索引文件损坏、版本不符，或不是为当前哈希文件建立的"""
+
+
+def _dump_bounds(mm, size):
+    """哈希文件的首末两条哈希（ASCII 字节）；空文件返回两个空串"""
+    if not size:
+        return b'', b''
+    last = mm.rfind(b'\n', 0, size - 1) + 1
+    return bytes(mm[:HASH_LENGTH]), bytes(mm[last:last + HASH_LENGTH])
+
+
+class HashIndex:
+    """前缀表 + Bloom 过滤器，见模块说明。整个索引文件同样只做内存映射"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < INDEX_HEADER.size:
+                raise IndexMismatch(f"{path} 不是有效的泄露检测索引")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.prefix_bits, self.hashes, self.bits, self.count,
+         self.dump_size, self.first_hash, self.last_hash) = INDEX_HEADER.unpack_from(self._mm)
+        table_size = (1 << self.prefix_bits) + 1 if self.prefix_bits <= 32 else 0
+        end = INDEX_HEADER.size + table_size * 8 + (self.bits + 7) // 8
+        if magic != INDEX_MAGIC or not table_size or not self.bits or end != size:
+            self._mm.close()
+            raise IndexMismatch(f"{path} 不是有效的泄露检测索引（或由旧版本建立，需要重建）")
+        start = INDEX_HEADER.size
+        self._view = memoryview(self._mm)
+        self._offsets = self._view[start:start + table_size * 8].cast('Q')
+        self._bloom = self._view[start + table_size * 8:end]
+        if self._offsets[0] != 0 or self._offsets[-1] != self.dump_size:
+            self.close()
+            raise IndexMismatch(f"{path} 的前缀表已损坏")
+
+    def check(self, size, bounds):
+        """确认索引是为大小为 size、首末哈希为 bounds 的哈希文件建立的，不符时抛出 IndexMismatch"""
+        if size != self.dump_size or bounds != (self.first_hash.rstrip(b'\0'), self.last_hash.rstrip(b'\0')):
+            raise IndexMismatch("泄露检测索引与哈希文件不匹配，哈希文件可能已更新，需要重建索引")
+
+    def might_contain(self, hash_hex):
+        bloom = self._bloom
+        return all(bloom[pos >> 3] & (1 << (pos & 7)) for pos in _bloom_positions(hash_hex, self.bits, self.hashes))
+
+    def range_of(self, hash_hex):
+        """该哈希所在前缀在哈希文件中的 [起点, 终点) 偏移；前缀表中不合理的区间返回 None"""
+        prefix = int(hash_hex[:8], 16) >> (32 - self.prefix_bits)
+        lo, hi = self._offsets[prefix], self._offsets[prefix + 1]
+        return (lo, hi) if lo <= hi <= self.dump_size else None
+
+    def close(self):
+        # 先释放导出的 memoryview，否则 mmap 无法关闭
+        for view in (self._offsets, self._bloom, self._view):
+            view.release()
+        self._mm.close()
+
+
+class PwnedHashFile:
+    """内存映射的排序哈希文件，lookup 返回泄露次数（未泄露为 0）。
+    
+    index_path 为 None 时自动使用同名 .sepidx 索引，索引无效或与哈希文件不匹配时忽略它；
+    显式指定的索引不匹配时抛出 IndexMismatch。
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b''
+        self.index = None
+        explicit = index_path is not None
+        if not explicit and os.path.exists(path + INDEX_SUFFIX):
+            index_path = path + INDEX_SUFFIX
+        if index_path:
+            try:
+                self.index = self._open_index(index_path)
+            except IndexMismatch:
+                if explicit:
+                    self.close()
+                    raise
+
+    def _open_index(self, index_path):
+        index = HashIndex(index_path)
+        try:
+            index.check(self._size, _dump_bounds(self._mm, self._size))
+        except IndexMismatch:
+            index.close()
+            raise
+        return index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        if self._size:
+            self._mm.close()
+        self._file.close()
+
+    def lookup(self, hash_hex):
+        hash_hex = hash_hex.upper()
+        lo, hi = 0, self._size
+        if self.index is not None:
+            if not self.index.might_contain(hash_hex):
+                return 0
+            lo, hi = self.index.range_of(hash_hex) or (lo, hi)
+        return self._search(hash_hex.encode('ascii'), lo, hi)
+
+    def _search(self, target, lo, hi):
+        """在 [lo, hi) 内二分查找。lo 必须是行首；每次取中点所在的整行比较"""
+        mm = self._mm
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = max(mm.rfind(b'\n', lo, mid) + 1, lo)
+            key = mm[start:start + HASH_LENGTH]
+            if key < target:
+                end = mm.find(b'\n', start, hi)
+                lo = hi if end < 0 else end + 1
+            elif key > target:
+                hi = start
+            else:
+                end = mm.find(b'\n', start)
+                line = mm[start:end if end >= 0 else self._size]
+                return int(line[HASH_LENGTH + 1:].strip() or 0)
+        return 0
+
+
+def build_index(path, index_path=None, prefix_bits=PREFIX_BITS, bits_per_entry=BLOOM_BITS_PER_ENTRY,
+                hashes=BLOOM_HASHES, progress=None):
+    """顺序扫描哈希文件一次，写出前缀表和 Bloom 过滤器。progress(已扫描字节数, 总字节数)"""
+    index_path = index_path or path + INDEX_SUFFIX
+    size = os.path.getsize(path)
+    # 条目数按平均行长（40位哈希 + 冒号 + 次数 + 换行，约 45 字节）估算，用于确定 Bloom 大小
+    estimated = max(1, size // 45)
+    bits = max(64, estimated * bits_per_entry)
+    bloom = bytearray((bits + 7) // 8)
+    offsets = array('Q', bytes(8 * ((1 << prefix_bits) + 1)))
+    shift = 32 - prefix_bits
+    next_prefix = 0
+    count = 0
+    offset = 0
+    with open(path, 'rb') as f:
+        if size:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                first_hash, last_hash = _dump_bounds(mm, size)
+            finally:
+                mm.close()
+        else:
+            first_hash = last_hash = b''
+        for line in f:
+            prefix = int(line[:8], 16) >> shift
+            # 前缀表记录每个前缀第一行的偏移；跳过的（不存在的）前缀指向同一位置，范围为空
+            while next_prefix <= prefix:
+                offsets[next_prefix] = offset
+                next_prefix += 1
+            for pos in _bloom_positions(line[:HASH_LENGTH].decode('ascii'), bits, hashes):
+                bloom[pos >> 3] |= 1 << (pos & 7)
+            offset += len(line)
+            count += 1
+            if progress and count % 1000000 == 0:
+                progress(offset, size)
+    while next_prefix < len(offsets):
+        offsets[next_prefix] = offset
+        next_prefix += 1
+    with open(index_path, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, prefix_bits, hashes, bits, count, size, first_hash, last_hash))
+        offsets.tofile(f)
+        f.write(bloom)
+    if progress:
+        progress(size, size)
+    return index_path
+
+
+def collect_hashes(db, progress=None, batch_size=1000):
+    """读取全部密码并计算 SHA-1，返回 {哈希: [记录ID, ...]}。在数据库线程中调用。
+
+    启用加密时逐条解密，明文只在这里停留到算出哈希为止；之后的查找只接触哈希。
+    """
+    total = db.count_passwords()
+    hashes = {}
+    done = 0
+    for password_id, _, _, password, _, _ in db.iter_passwords(batch_size):
+        password = db.decrypt_field(password)
+        if password:
+            hashes.setdefault(sha1_hex(password), []).append(password_id)
+        done += 1
+        if progress and done % batch_size == 0:
+            progress(done, total)
+    return hashes
+
+
+def check_hashes(hash_file, hashes, progress=None, cancelled=None):
+    """逐个查找 collect_hashes 的结果，返回 {记录ID: 泄露次数}，只包含泄露的记录。
+
+    相同的密码只查一次。cancelled 为 threading.Event 时，置位后尽快返回已得到的部分结果。
+    """
+    flagged = {}
+    total = len(hashes)
+    for done, (hash_hex, password_ids) in enumerate(hashes.items(), 1):
+        if cancelled is not None and cancelled.is_set():
+            break
+        count = hash_file.lookup(hash_hex)
+        if count:
+            for password_id in password_ids:
+                flagged[password_id] = count
+        if progress and (done % 100 == 0 or done == total):
+            progress(done, total)
+    return flagged
+
+
+def main(argv):
+    if len(argv) >= 2 and argv[0] == 'index':
+        def report(done, total):
+            print(f"\r{done * 100 // total if total else 100}%", end='', flush=True)
+        print(f"\n索引已写入 {build_index(argv[1], progress=report)}")
+        return 0
+    if len(argv) >= 2 and argv[0] == 'check':
+        with PwnedHashFile(argv[1]) as hash_file:
+            for password in argv[2:] or [line.rstrip('\n') for line in sys.stdin]:
+                print(hash_file.lookup(sha1_hex(password)))
+        return 0
+    print("用法: python -m breach_check index 哈希文件\n      python -m breach_check check 哈希文件 [密码...]")
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
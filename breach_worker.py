@@ -0,0 +1,56 @@
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import breach_check
+
+
+class BreachScanWorker(QObject):
+    """在后台线程中用本地哈希文件检查密码哈希，GUI 线程只负责启动和接收结果。
+    
+    输入为 breach_check.collect_hashes 的结果（只有哈希，不含明文）；同一时间只运行一次扫描。
+    进度与结果通过信号回到 GUI 线程（跨线程信号自动排队投递）。
+    """
+    scan_progress = pyqtSignal(int, int)
+    # 参数为 {记录ID: 泄露次数}
+    scan_finished = pyqtSignal(object)
+    scan_failed = pyqtSignal(str)
+    scan_cancelled = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def start(self, hash_path, hashes):
+        """开始扫描，已有扫描在进行时返回 False"""
+        if self.is_running():
+            return False
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(hash_path, hashes, self._cancelled),
+                                        name='breach-scan', daemon=True)
+        self._thread.start()
+        return True
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=None):
+        self.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, hash_path, hashes, cancelled):
+        try:
+            with breach_check.PwnedHashFile(hash_path) as hash_file:
+                flagged = breach_check.check_hashes(hash_file, hashes, self.scan_progress.emit, cancelled)
+        except Exception as e:
+            self.scan_failed.emit(str(e))
+            return
+        if cancelled.is_set():
+            self.scan_cancelled.emit()
+        else:
+            self.scan_finished.emit(flagged)
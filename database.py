@@ -1,80 +1,596 @@
 import sqlite3
 import os
+import atexit
+import threading
+from contextlib import contextmanager
+import vault_crypto
+from vault_crypto import VaultCipher, VaultLockedError
+
+
+# ---- 数据库结构迁移 ----
+# 每个函数对应一个 schema 版本，版本号记录在 PRAGMA user_version 中。
+# 启动时只执行尚未应用的步骤，已是最新版本的数据库不做任何扫描。
+# 新增迁移时只能追加到 MIGRATIONS 末尾，不要修改已发布的步骤。
+
+def _migrate_base_tables(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS passwords (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        username TEXT NOT NULL,
+        password TEXT NOT NULL,
+        group_name TEXT DEFAULT '未分组',
+        note TEXT DEFAULT ''
+    )
+    ''')
+    
+    # 早期版本的数据库没有 note 列
+    cursor.execute("PRAGMA table_info(passwords)")
+    columns = [column[1] for column in cursor.fetchall()]
+    if 'note' not in columns:
+        cursor.execute("ALTER TABLE passwords ADD COLUMN note TEXT DEFAULT ''")
+    
+    # 创建独立的普通分组表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS groups (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''')
+    
+    # 确保默认分组存在
+    cursor.execute("INSERT OR IGNORE INTO groups (name) VALUES ('未分组')")
+    
+    # 将现有的所有不同分组同步到 groups 表中
+    cursor.execute("INSERT OR IGNORE INTO groups (name) SELECT DISTINCT group_name FROM passwords WHERE group_name != ''")
+
+
+def _migrate_free_ids(cursor):
+    """空闲ID表：由 delete_password 维护，add_password 从中取最小值复用"""
+    cursor.execute('CREATE TABLE IF NOT EXISTS free_ids (id INTEGER PRIMARY KEY)')
+    # 一次性扫描现有ID，把中间的空洞登记到 free_ids
+    cursor.execute('SELECT id FROM passwords ORDER BY id')
+    expected = 1
+    gaps = []
+    for (row_id,) in cursor.fetchall():
+        if row_id > expected:
+            gaps.extend(range(expected, row_id))
+        expected = row_id + 1
+    cursor.executemany('INSERT OR IGNORE INTO free_ids (id) VALUES (?)', ((i,) for i in gaps))
+
+
+def _unused_name(cursor, group_name, name, row_id):
+    """给记录挑一个同组内未被占用的名称：先试 '名称 (ID)'，再试 '名称 (ID-2)'、'名称 (ID-3)'……"""
+    candidate = f'{name} ({row_id})'
+    attempt = 2
+    while cursor.execute('SELECT 1 FROM passwords WHERE group_name IS ? AND name = ?',
+                         (group_name, candidate)).fetchone():
+        candidate = f'{name} ({row_id}-{attempt})'
+        attempt += 1
+    return candidate
+
+
+def _migrate_unique_group_name(cursor):
+    """同一分组下名称唯一。
+    
+    这个索引同时服务于 bulk_upsert 的 ON CONFLICT、check_name_exists/get_password_id 的等值查找，
+    以及 get_all_passwords 的 ORDER BY group_name, name（按索引顺序扫描，无需额外排序）。
+    """
+    # 旧版本仅在界面层校验重名，建唯一索引前给重复记录的名称追加ID后缀，避免丢数据。
+    # 追加后的名称也可能正好已被占用（如 'a' 重复、同组里又恰好有 'a (2)'），逐条挑一个未使用的名称
+    cursor.execute('''
+    SELECT id, group_name, name FROM passwords
+    WHERE id NOT IN (SELECT MIN(id) FROM passwords GROUP BY group_name, name)
+    ORDER BY id
+    ''')
+    for row_id, group_name, name in cursor.fetchall():
+        cursor.execute('UPDATE passwords SET name = ? WHERE id = ?', (_unused_name(cursor, group_name, name, row_id), row_id))
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_passwords_group_name ON passwords (group_name, name)')
+
+
+# 全文搜索分词器。trigram 按三字符切分，对中日韩文本也能做子串匹配（需 SQLite 3.34+），
+# 不可用时自动退回 unicode61（按词切分，支持前缀查询）。
+FTS_TOKENIZER = 'trigram'
+FTS_FALLBACK_TOKENIZER = 'unicode61'
+# 全文索引覆盖的列及 bm25 权重：名称最重要，其次分组、用户名、备注
+FTS_COLUMNS = ('name', 'group_name', 'username', 'note')
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+
+def _fts5_tokenizer_available(cursor, tokenizer):
+    try:
+        cursor.execute(f"CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='{tokenizer}')")
+    except sqlite3.OperationalError:
+        return False
+    cursor.execute('DROP TABLE temp.fts_probe')
+    return True
+
+
+def _drop_fts(cursor):
+    for suffix in ('ai', 'ad', 'au'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS passwords_fts_{suffix}')
+    cursor.execute('DROP TABLE IF EXISTS passwords_fts')
+
+
+def _create_fts(cursor, tokenizer=None):
+    """创建外部内容 FTS5 表及同步触发器，并从 passwords 重建索引。
+    
+    返回实际使用的分词器；SQLite 未编译 FTS5 时返回 None，此时 search 退回 LIKE 查询。
+    """
+    for candidate in (tokenizer or FTS_TOKENIZER, FTS_FALLBACK_TOKENIZER):
+        if _fts5_tokenizer_available(cursor, candidate):
+            tokenizer = candidate
+            break
+    else:
+        return None
+    
+    columns = ', '.join(FTS_COLUMNS)
+    new_values = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+    old_values = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+    cursor.execute(f"""
+    CREATE VIRTUAL TABLE passwords_fts USING fts5(
+        {columns}, content='passwords', content_rowid='id', tokenize='{tokenizer}'
+    )
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER passwords_fts_ai AFTER INSERT ON passwords BEGIN
+        INSERT INTO passwords_fts (rowid, {columns}) VALUES (new.id, {new_values});
+    END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER passwords_fts_ad AFTER DELETE ON passwords BEGIN
+        INSERT INTO passwords_fts (passwords_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+    END
+    """)
+    # 只修改密码时不需要重建索引
+    cursor.execute(f"""
+    CREATE TRIGGER passwords_fts_au AFTER UPDATE OF {columns} ON passwords BEGIN
+        INSERT INTO passwords_fts (passwords_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        INSERT INTO passwords_fts (rowid, {columns}) VALUES (new.id, {new_values});
+    END
+    """)
+    cursor.execute("INSERT INTO passwords_fts (passwords_fts) VALUES ('rebuild')")
+    return tokenizer
+
+
+def _migrate_fulltext_index(cursor):
+    _drop_fts(cursor)
+    _create_fts(cursor)
+
+
+def _migrate_settings(cursor):
+    """键值设置表，保存界面和行为相关的选项（如自动填充的输入后端）"""
+    cursor.execute('CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)')
+
+
+def _migrate_password_history(cursor):
+    """密码历史：批量更换前的旧密码（存储形式，启用加密时为密文），同一次更换共用一个批次号，可整体恢复"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS password_history (
+        id INTEGER PRIMARY KEY,
+        password_id INTEGER NOT NULL,
+        rotation INTEGER NOT NULL,
+        password TEXT NOT NULL,
+        changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_password_history_rotation ON password_history (rotation, password_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_password_history_password ON password_history (password_id)')
+
+
+def _migrate_history_replacement(cursor):
+    """密码历史补充两列：replacement 为这一批写入的新值（存储形式），撤销前据此判断记录之后是否又被手动修改；
+    undoes 为撤销操作对应的原批次号（普通批量更换为 NULL），界面据此区分“撤销”和“重做”。
+    """
+    cursor.execute('ALTER TABLE password_history ADD COLUMN replacement TEXT')
+    cursor.execute('ALTER TABLE password_history ADD COLUMN undoes INTEGER')
+
+
+def _migrate_null_groups(cursor):
+    """早期导入留下的 NULL 分组改为“未分组”。
+    
+    NULL 参与 (group_name, name) 行值比较的结果是 NULL，keyset 分页会在这些行处提前结束；
+    菜单和列表按字符串排序分组时也无法与 None 比较。唯一索引把 NULL 视为互不相同，
+    改分组前先给与“未分组”中已有名称（或彼此之间）重名的记录换一个未使用的名称。
+    """
+    cursor.execute('SELECT id, name FROM passwords WHERE group_name IS NULL ORDER BY id')
+    for row_id, name in cursor.fetchall():
+        if cursor.execute("SELECT 1 FROM passwords WHERE group_name = '未分组' AND name = ?", (name,)).fetchone():
+            name = _unused_name(cursor, '未分组', name, row_id)
+        cursor.execute("UPDATE passwords SET group_name = '未分组', name = ? WHERE id = ?", (name, row_id))
+    cursor.execute("INSERT OR IGNORE INTO groups (name) VALUES ('未分组')")
+
+
+MIGRATIONS = [
+    _migrate_base_tables,
+    _migrate_free_ids,
+    _migrate_unique_group_name,
+    _migrate_fulltext_index,
+    _migrate_settings,
+    _migrate_password_history,
+    _migrate_history_replacement,
+    _migrate_null_groups,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# 字段加密相关的设置键：主密码派生用的盐、派生参数、以及用于校验主密码的密文
+CRYPTO_SALT_KEY = 'crypto_salt'
+CRYPTO_PARAMS_KEY = 'crypto_params'
+CRYPTO_VERIFIER_KEY = 'crypto_verifier'
+
+# 密码历史保留最近的批次数，更早的批次在新的更换或撤销时删除
+HISTORY_KEEP_ROTATIONS = 5
+
+
+def _iter_batches(cursor, batch_size):
+    """用 fetchmany 分批取出游标结果并逐行产出"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+class _KeyState:
+    def __init__(self):
+        self.encrypted = False
+        self.cipher = None
+
+
+class SharedConnection:
+    """进程内按数据库文件共享的 SQLite 连接。
+    
+    主窗口和快捷键管理器各自创建 PasswordDatabase，但底层只打开一个连接，
+    迁移也只执行一次。连接启用 WAL + synchronous=NORMAL：普通提交只追加 WAL，
+    不再每次 fsync 主库和回滚日志，持久性由检查点保证。
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+    
+    BUSY_TIMEOUT_MS = 5000
+    CACHED_STATEMENTS = 256
+    
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, cached_statements=self.CACHED_STATEMENTS)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(f'PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}')
+        self.migrated = False
+        # 全文索引实际使用的分词器（None 表示 SQLite 不支持 FTS5）
+        self.fts_tokenizer = None
+        # 当前事务嵌套层数，只有最外层负责提交
+        self.depth = 0
+        # 本进程内成功提交的写事务计数，供缓存层判断数据是否变化
+        self.write_generation = 0
+        # 加密状态：是否已启用字段加密、解锁后的密钥；所有 PasswordDatabase 实例以及
+        # 其它线程的同库连接（见 sibling）共用同一个对象
+        self.key_state = _KeyState()
+        # sibling 打开的线程私有连接，不在 _instances 中
+        self.private = False
+        # SQL 中比较加密字段的明文（bulk_upsert 判断记录是否变化），只对冲突行调用
+        self.conn.create_function('vault_open', 1, self._open_field, deterministic=True)
+    
+    @property
+    def encrypted(self):
+        return self.key_state.encrypted
+    
+    @encrypted.setter
+    def encrypted(self, value):
+        self.key_state.encrypted = value
+    
+    @property
+    def cipher(self):
+        return self.key_state.cipher
+    
+    @cipher.setter
+    def cipher(self, value):
+        self.key_state.cipher = value
+    
+    def sibling(self):
+        """在当前线程为同一数据库文件打开另一个连接（sqlite3 连接不能跨线程使用）。
+        
+        新连接不登记到 _instances，由调用方负责关闭；迁移不再重复执行，加密状态与本连接共用。
+        ':memory:' 数据库无法共享，不能使用。
+        """
+        shared = SharedConnection(self.db_file)
+        shared.migrated = self.migrated
+        shared.fts_tokenizer = self.fts_tokenizer
+        shared.key_state = self.key_state
+        shared.private = True
+        return shared
+    
+    def _open_field(self, value):
+        # 是否加密以整个库为准（见 PasswordDatabase.decrypt_field），不按内容猜测
+        if not self.encrypted:
+            return value
+        return self.cipher.decrypt(value)
+    
+    @classmethod
+    def get(cls, db_file):
+        key = db_file if db_file == ':memory:' else os.path.abspath(db_file)
+        with cls._instances_lock:
+            shared = cls._instances.get(key)
+            if shared is None:
+                shared = cls._instances[key] = cls(db_file)
+            return shared
+    
+    @classmethod
+    def close_all(cls):
+        with cls._instances_lock:
+            for shared in cls._instances.values():
+                shared.conn.close()
+            cls._instances.clear()
+
+
+atexit.register(SharedConnection.close_all)
+
 
 class PasswordDatabase:
-    def __init__(self, db_file='passwords.db'):
+    def __init__(self, db_file='passwords.db', reuse_ids=True, shared=None):
         self.db_file = db_file
-        self.conn = sqlite3.connect(self.db_file)
-        self.create_table()
+        # reuse_ids=True 为兼容模式：优先复用已删除记录留下的最小空闲ID；
+        # 设为 False 时直接使用 SQLite rowid 分配（max(id)+1），不再填补空洞
+        self.reuse_ids = reuse_ids
+        self._shared = shared or SharedConnection.get(db_file)
+        self.conn = self._shared.conn
+        if not self._shared.migrated:
+            self.create_table()
+            self._shared.fts_tokenizer = self.fts_tokenizer()
+            self._shared.encrypted = self.get_setting(CRYPTO_VERIFIER_KEY) is not None
+            self._shared.migrated = True
+    
+    def open_thread_connection(self):
+        """返回使用独立连接的 PasswordDatabase，供其它线程使用；必须在将要使用它的线程中调用，用完后 close()"""
+        return PasswordDatabase(self.db_file, self.reuse_ids, shared=self._shared.sibling())
+    
+    def close(self):
+        """关闭 open_thread_connection 打开的连接（共享连接由 SharedConnection.close_all 统一关闭）"""
+        if self._shared.private:
+            self.conn.close()
+    
+    @contextmanager
+    def transaction(self):
+        """事务上下文。可以嵌套，只有最外层在退出时提交一次（异常时整体回滚）。
+        
+        用法: with db.transaction(): db.add_password(...); db.update_note(...)
+        """
+        shared = self._shared
+        if shared.depth == 0 and not self.conn.in_transaction:
+            self.conn.execute('BEGIN')
+        shared.depth += 1
+        try:
+            yield self.conn.cursor()
+        except BaseException:
+            shared.depth -= 1
+            if shared.depth == 0:
+                self.conn.rollback()
+            raise
+        shared.depth -= 1
+        if shared.depth == 0:
+            self.conn.commit()
+            shared.write_generation += 1
+    
+    @property
+    def write_generation(self):
+        """本进程通过共享连接提交的写事务次数"""
+        return self._shared.write_generation
+    
+    def data_version(self):
+        """PRAGMA data_version：其他连接（如另一个进程）提交后会变化，只读取内存计数器，不访问数据页"""
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
     
     def create_table(self):
+        """按 user_version 执行尚未应用的迁移步骤，每一步在独立事务中完成"""
         cursor = self.conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS passwords (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            username TEXT NOT NULL,
-            password TEXT NOT NULL,
-            group_name TEXT DEFAULT '未分组',
-            note TEXT DEFAULT ''
-        )
-        ''')
-        
-        # 检查是否需要迁移（添加note列）
-        cursor.execute("PRAGMA table_info(passwords)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'note' not in columns:
-            cursor.execute("ALTER TABLE passwords ADD COLUMN note TEXT DEFAULT ''")
-        
-        # 创建独立的普通分组表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS groups (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE
-        )
-        ''')
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+        for step in range(version, SCHEMA_VERSION):
+            with self.transaction() as cursor:
+                MIGRATIONS[step](cursor)
+                cursor.execute(f'PRAGMA user_version = {step + 1}')
+    
+    def _allocate_id(self, cursor):
+        """分配新记录的ID。free_ids 以主键存储，取最小值只需一次索引查找"""
+        while self.reuse_ids:
+            cursor.execute('SELECT MIN(id) FROM free_ids')
+            free_id = cursor.fetchone()[0]
+            if free_id is None:
+                break
+            cursor.execute('DELETE FROM free_ids WHERE id = ?', (free_id,))
+            # 非兼容模式下 rowid 可能已经用掉了这个ID，跳过即可
+            cursor.execute('SELECT 1 FROM passwords WHERE id = ?', (free_id,))
+            if cursor.fetchone() is None:
+                return free_id
+        # 没有可复用的空洞时交给 rowid：SQLite 通过主键B树末尾直接得到 max(id)+1
+        return None
+    
+    def add_password(self, name, username, password, group_name='未分组', note=''):
+        """新增一条记录，返回 list_entries 格式的 (id, group_name, name)，供界面直接插入该行"""
+        with self.transaction() as cursor:
+            next_id = self._allocate_id(cursor)
+            cursor.execute(
+                'INSERT INTO passwords (id, name, username, password, group_name, note) VALUES (?, ?, ?, ?, ?, ?)',
+                (next_id, name, username, self._seal(password), group_name, note)
+            )
+        return (cursor.lastrowid, group_name, name)
+    
+    def bulk_upsert(self, records):
+        """在一个事务内批量新增或更新记录（按 分组+名称 匹配）。
         
-        # 确保默认分组存在
-        cursor.execute("INSERT OR IGNORE INTO groups (name) VALUES ('未分组')")
+        records 为可迭代的字典，字段与导出的 JSON 一致：group, name, username, password, note。
+        缺少必要字段的条目会被跳过。返回 (新增数, 更新数, 未变化数)。
+        启用加密时密码按明文比较是否变化（每次加密的 nonce 不同，密文总是不同）。
+        """
+        seal = self._sealer()
+        groups = set()
+        total = 0
         
-        # 迁移：将现有的所有不同分组同步到 create groups 表中
-        cursor.execute('SELECT DISTINCT group_name FROM passwords')
-        existing_groups = [row[0] for row in cursor.fetchall()]
-        for grp in existing_groups:
-            if grp:
-                cursor.execute("INSERT OR IGNORE INTO groups (name) VALUES (?)", (grp,))
+        def rows():
+            nonlocal total
+            for item in records:
+                if not all(k in item for k in ('group', 'name', 'username', 'password')):
+                    continue
+                total += 1
+                # 导入文件中的 null 分组/备注按默认值处理，库里不留 NULL（界面按字符串比较和检索）
+                group = item['group'] if item['group'] is not None else '未分组'
+                groups.add(group)
+                note = item.get('note')
+                yield (item['name'], item['username'], seal(item['password']), group, note if note is not None else '')
         
-        self.conn.commit()
-    
-    def add_password(self, name, username, password, group_name='未分组', note=''):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT MIN(t1.id + 1) FROM passwords t1 LEFT JOIN passwords t2 ON t1.id + 1 = t2.id WHERE t2.id IS NULL')
-        next_id = cursor.fetchone()[0]
-        if next_id is None:
-            next_id = 1
-            
-        cursor.execute(
-            'INSERT INTO passwords (id, name, username, password, group_name, note) VALUES (?, ?, ?, ?, ?, ?)',
-            (next_id, name, username, password, group_name, note)
-        )
-        self.conn.commit()
-        return next_id
+        with self.transaction() as cursor:
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM passwords')
+            max_id_before = cursor.fetchone()[0]
+            # 内容完全相同的记录不会命中 DO UPDATE 的 WHERE 条件，rowcount 里也就不计入
+            cursor.executemany('''
+            INSERT INTO passwords (name, username, password, group_name, note) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (group_name, name) DO UPDATE SET
+                username = excluded.username,
+                password = excluded.password,
+                note = excluded.note
+            WHERE username IS NOT excluded.username
+               OR vault_open(password) IS NOT vault_open(excluded.password)
+               OR note IS NOT excluded.note
+            ''', rows())
+            changed = cursor.rowcount
+            # 批量插入走 rowid 分配，新记录的ID都大于插入前的最大ID
+            cursor.execute('SELECT COUNT(*) FROM passwords WHERE id > ?', (max_id_before,))
+            added = cursor.fetchone()[0]
+            cursor.executemany('INSERT OR IGNORE INTO groups (name) VALUES (?)', ((g,) for g in groups))
+        return added, changed - added, total - changed
     
     def update_password(self, password_id, name, username, password, group_name='未分组', note=''):
+        """更新一条记录，返回更新后的 (id, group_name, name)；记录不存在时返回 None"""
+        with self.transaction() as cursor:
+            cursor.execute(
+                'UPDATE passwords SET name=?, username=?, password=?, group_name=?, note=? WHERE id=?',
+                (name, username, self._seal(password), group_name, note, password_id)
+            )
+        return (password_id, group_name, name) if cursor.rowcount > 0 else None
+    
+    def update_note(self, password_id, note):
+        with self.transaction() as cursor:
+            cursor.execute(
+                'UPDATE passwords SET note=? WHERE id=?',
+                (note, password_id)
+            )
+
+    def update_notes(self, notes):
+        """在一个事务中批量更新备注，notes 为 (id, 备注) 的可迭代对象"""
+        with self.transaction() as cursor:
+            cursor.executemany('UPDATE passwords SET note=? WHERE id=?', ((note, i) for i, note in notes))
+
+    def rotate_passwords(self, updates):
+        """批量更换密码。updates 为 (id, 新密码) 的可迭代对象，同一ID只取最后一个。
+        
+        在一个事务内先把每条记录的当前密码原样（启用加密时为密文）连同新密码写入 password_history，再写入新密码；
+        password 不在全文索引的列中，更新不会触发索引维护。只保留最近 HISTORY_KEEP_ROTATIONS 批历史。
+        返回 (批次号, 更换条数)，批次号可交给 restore_rotation。
+        """
+        seal = self._sealer()
+        updates = {password_id: seal(password) for password_id, password in updates}
+        with self.transaction() as cursor:
+            rotation = self._next_rotation(cursor)
+            cursor.executemany(
+                'INSERT INTO password_history (password_id, rotation, password, replacement) '
+                'SELECT id, ?, password, ? FROM passwords WHERE id = ?',
+                ((rotation, password, password_id) for password_id, password in updates.items())
+            )
+            cursor.executemany('UPDATE passwords SET password = ? WHERE id = ?',
+                               ((password, password_id) for password_id, password in updates.items()))
+            changed = cursor.rowcount
+            self._prune_history(cursor, HISTORY_KEEP_ROTATIONS)
+        return rotation, changed
+    
+    def restore_rotation(self, rotation):
+        """把某一批次更换过的记录恢复为更换前的密码。
+        
+        只恢复当前密码仍是该批次写入值的记录；之后又被手动修改过的记录跳过，不会被悄悄改回。
+        恢复前的当前密码作为新的一批写入历史（undoes 指向原批次），因此恢复本身也可以再恢复。
+        启用加密时比较需要解密，库必须已解锁。返回 (新批次号, 恢复条数, 跳过的记录ID列表)；没有可恢复的记录时新批次号为 None。
+        """
+        with self.transaction() as cursor:
+            cursor.execute(
+                'SELECT h.password_id, h.password, h.replacement, p.password '
+                'FROM password_history h JOIN passwords p ON p.id = h.password_id WHERE h.rotation = ?',
+                (rotation,)
+            )
+            restore, skipped = [], []
+            for password_id, previous, replacement, current in cursor.fetchall():
+                # replacement 为 NULL 的是记录新值之前的旧历史，无法判断，按原样恢复
+                if replacement is None or self._same_secret(current, replacement):
+                    restore.append((password_id, previous, current))
+                else:
+                    skipped.append(password_id)
+            if not restore:
+                return None, 0, skipped
+            new_rotation = self._next_rotation(cursor)
+            cursor.executemany(
+                'INSERT INTO password_history (password_id, rotation, password, replacement, undoes) '
+                'VALUES (?, ?, ?, ?, ?)',
+                ((password_id, new_rotation, current, previous, rotation)
+                 for password_id, previous, current in restore)
+            )
+            cursor.executemany('UPDATE passwords SET password = ? WHERE id = ?',
+                               ((previous, password_id) for password_id, previous, _ in restore))
+            self._prune_history(cursor, HISTORY_KEEP_ROTATIONS)
+        return new_rotation, len(restore), skipped
+    
+    def _same_secret(self, stored, other):
+        """两个存储形式的密码是否相同；密文每次加密的 nonce 不同，字符串不等时再比较明文"""
+        return stored == other or (self._shared.encrypted and self.decrypt_field(stored) == self.decrypt_field(other))
+    
+    def _prune_history(self, cursor, keep):
+        """只保留最近 keep 批历史（keep 为 0 时全部删除），返回删除的条数。
+        
+        未加密的库中历史是明文旧密码，删除时打开 secure_delete，被删除的内容在库文件中用零覆盖。
+        """
+        cursor.execute('PRAGMA secure_delete = ON')
+        try:
+            cursor.execute(
+                'DELETE FROM password_history WHERE rotation <= (SELECT MAX(rotation) FROM password_history) - ?',
+                (keep,)
+            )
+            return cursor.rowcount
+        finally:
+            cursor.execute('PRAGMA secure_delete = OFF')
+    
+    def purge_password_history(self):
+        """删除全部密码历史，返回删除的条数。之后无法再撤销批量更换"""
+        with self.transaction() as cursor:
+            purged = self._prune_history(cursor, 0)
+        # 删除前的页面还留在 WAL 文件中，立即检查点并截断
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return purged
+    
+    def _next_rotation(self, cursor):
+        cursor.execute('SELECT COALESCE(MAX(rotation), 0) + 1 FROM password_history')
+        return cursor.fetchone()[0]
+    
+    def last_rotation(self):
+        """最近一批历史的 (批次号, 时间, 条数, 撤销的批次号)，没有历史时返回 None。
+        
+        最后一个字段不为 None 时这一批是一次撤销，再“撤销”它等于重新应用被撤销的那次更换。
+        """
         cursor = self.conn.cursor()
         cursor.execute(
-            'UPDATE passwords SET name=?, username=?, password=?, group_name=?, note=? WHERE id=?',
-            (name, username, password, group_name, note, password_id)
+            'SELECT rotation, MIN(changed_at), COUNT(*), MAX(undoes) FROM password_history '
+            'WHERE rotation = (SELECT MAX(rotation) FROM password_history)'
         )
-        self.conn.commit()
+        row = cursor.fetchone()
+        return row if row[0] is not None else None
     
-    def update_note(self, password_id, note):
+    def get_password_history(self, password_id, decrypt=True):
+        """一条记录的历史密码，按时间从新到旧返回 [(批次号, 时间, 密码)]"""
         cursor = self.conn.cursor()
         cursor.execute(
-            'UPDATE passwords SET note=? WHERE id=?',
-            (note, password_id)
+            'SELECT rotation, changed_at, password FROM password_history WHERE password_id = ? ORDER BY rotation DESC',
+            (password_id,)
         )
-        self.conn.commit()
+        rows = cursor.fetchall()
+        if decrypt:
+            rows = [(rotation, changed_at, self.decrypt_field(password)) for rotation, changed_at, password in rows]
+        return rows
 
     def get_all_groups(self):
         """获取所有分组（包括空分组）"""
@@ -83,13 +599,9 @@ class PasswordDatabase:
         return [row[0] for row in cursor.fetchall()]
     
     def add_group(self, group_name):
-        cursor = self.conn.cursor()
-        try:
-            cursor.execute("INSERT INTO groups (name) VALUES (?)", (group_name,))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False # 分组已存在
+        with self.transaction() as cursor:
+            cursor.execute("INSERT OR IGNORE INTO groups (name) VALUES (?)", (group_name,))
+        return cursor.rowcount > 0 # 为0表示分组已存在
 
     def delete_group(self, group_name):
         """删除分组。注意：如果有密码属于该分组，需要决定如何处理。目前策略是仅删除分组定义，不影响密码（虽然UI上可能会有显示问题，建议UI层限制）"""
@@ -103,8 +615,8 @@ class PasswordDatabase:
         if count > 0:
             return False, f"分组'{group_name}'不为空，无法删除！"
             
-        cursor.execute('DELETE FROM groups WHERE name = ?', (group_name,))
-        self.conn.commit()
+        with self.transaction() as cursor:
+            cursor.execute('DELETE FROM groups WHERE name = ?', (group_name,))
         return True, "删除成功"
     
     def get_passwords_by_group(self, group_name):
@@ -120,23 +632,117 @@ class PasswordDatabase:
         cursor.execute('SELECT id, name, username, password, group_name, note FROM passwords ORDER BY group_name, name')
         return cursor.fetchall()
     
-    def get_password_by_id(self, password_id):
+    def list_entries(self, until=None):
+        """列表视图用的轻量查询：按 分组+名称 排序的 (id, group_name, name)。
+        
+        只读 idx_passwords_group_name 覆盖索引（索引项自带 rowid），不触及存放用户名、密码和备注的数据页，
+        耗时与内存都不随备注长度增长。其它字段按需通过 get_username/get_password/get_note 读取。
+        until 为 (group_name, name) 时只返回排序键不大于它的记录（刷新已分页载入的范围）。
+        """
+        cursor = self.conn.cursor()
+        if until is None:
+            cursor.execute('SELECT id, group_name, name FROM passwords ORDER BY group_name, name')
+        else:
+            cursor.execute(
+                'SELECT id, group_name, name FROM passwords WHERE (group_name, name) <= (?, ?) '
+                'ORDER BY group_name, name',
+                until
+            )
+        return cursor.fetchall()
+    
+    def list_entries_page(self, after=None, limit=1000):
+        """keyset 分页：返回排序键 (group_name, name) 大于 after 的前 limit 条 (id, group_name, name)。
+        
+        after 为上一页最后一条的 (group_name, name)，None 表示第一页；limit 为 None 时返回其后全部记录。
+        起点由唯一索引直接定位，翻到第 N 页的开销与 N 无关（不像 OFFSET 需要先扫过前面的行）。
+        """
+        limit = -1 if limit is None else limit
+        cursor = self.conn.cursor()
+        if after is None:
+            cursor.execute('SELECT id, group_name, name FROM passwords ORDER BY group_name, name LIMIT ?', (limit,))
+        else:
+            cursor.execute(
+                'SELECT id, group_name, name FROM passwords WHERE (group_name, name) > (?, ?) '
+                'ORDER BY group_name, name LIMIT ?',
+                (*after, limit)
+            )
+        return cursor.fetchall()
+    
+    def iter_entries(self, batch_size=1000):
+        """逐批读取 list_entries 的生成器，每次只从游标取 batch_size 行"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT id, group_name, name FROM passwords ORDER BY group_name, name')
+        yield from _iter_batches(cursor, batch_size)
+    
+    def _get_field(self, column, password_id):
+        cursor = self.conn.cursor()
+        cursor.execute(f'SELECT {column} FROM passwords WHERE id = ?', (password_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def get_username(self, password_id):
+        return self._get_field('username', password_id)
+    
+    def get_password(self, password_id, decrypt=True):
+        """读取一条记录的密码；decrypt=False 时返回存储形式（启用加密时为密文）"""
+        password = self._get_field('password', password_id)
+        return self.decrypt_field(password) if decrypt and password is not None else password
+    
+    def get_note(self, password_id):
+        return self._get_field('note', password_id)
+    
+    def iter_passwords(self, batch_size=1000):
+        """与 get_all_passwords 相同的结果，但每次只从游标取 batch_size 行，不一次性载入内存"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT id, name, username, password, group_name, note FROM passwords ORDER BY group_name, name')
+        yield from _iter_batches(cursor, batch_size)
+    
+    def iter_all_passwords(self):
+        return self.iter_passwords()
+    
+    def count_passwords(self):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM passwords')
+        return cursor.fetchone()[0]
+    
+    def get_entry(self, password_id):
+        """按ID读取 list_entries 格式的 (id, group_name, name)"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT id, group_name, name FROM passwords WHERE id = ?', (password_id,))
+        return cursor.fetchone()
+    
+    def get_password_by_id(self, password_id, decrypt=True):
+        """按ID读取一条记录。decrypt=False 时密码字段保持存储形式（启用加密时为密文）"""
         cursor = self.conn.cursor()
         cursor.execute(
             'SELECT id, name, username, password, group_name, note FROM passwords WHERE id = ?',
             (password_id,)
         )
-        return cursor.fetchone()
+        row = cursor.fetchone()
+        if row and decrypt:
+            row = row[:3] + (self.decrypt_field(row[3]),) + row[4:]
+        return row
     
-    def delete_password(self, password_id):
+    def get_credentials(self, password_id):
+        """自动填充用：只读取并解密这一条记录的 (用户名, 密码)"""
         cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM passwords WHERE id = ?', (password_id,))
-        self.conn.commit()
+        cursor.execute('SELECT username, password FROM passwords WHERE id = ?', (password_id,))
+        row = cursor.fetchone()
+        return (row[0], self.decrypt_field(row[1])) if row else None
+    
+    def delete_password(self, password_id):
+        """删除一条记录，返回被删除的 (id, group_name, name)；记录不存在时返回 None"""
+        with self.transaction() as cursor:
+            cursor.execute('SELECT id, group_name, name FROM passwords WHERE id = ?', (password_id,))
+            entry = cursor.fetchone()
+            if entry is not None:
+                cursor.execute('DELETE FROM passwords WHERE id = ?', (password_id,))
+                # ID 可能被复用，旧记录的密码历史不能留给新记录
+                cursor.execute('DELETE FROM password_history WHERE password_id = ?', (password_id,))
+                # 登记空闲ID，供兼容模式下的 add_password 复用
+                cursor.execute('INSERT OR IGNORE INTO free_ids (id) VALUES (?)', (password_id,))
+        return entry
     
-    def __del__(self):
-        if hasattr(self, 'conn'):
-            self.conn.close()
-            
     def check_name_exists(self, name, group_name, exclude_id=None):
         cursor = self.conn.cursor()
         if exclude_id is None:
@@ -153,6 +759,154 @@ class PasswordDatabase:
             )
         return cursor.fetchone()[0] > 0
         
+    def fts_tokenizer(self):
+        """当前全文索引使用的分词器，未建立 FTS5 索引时返回 None"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='passwords_fts'")
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        for tokenizer in (FTS_TOKENIZER, FTS_FALLBACK_TOKENIZER, 'porter', 'ascii'):
+            if f"tokenize='{tokenizer}'" in row[0]:
+                return tokenizer
+        return FTS_FALLBACK_TOKENIZER
+    
+    def rebuild_search_index(self, tokenizer=None):
+        """按指定分词器重建全文索引，返回实际使用的分词器"""
+        with self.transaction() as cursor:
+            _drop_fts(cursor)
+            tokenizer = _create_fts(cursor, tokenizer)
+        self._shared.fts_tokenizer = tokenizer
+        return tokenizer
+    
+    def search(self, query, limit=50):
+        """在名称、分组、用户名和备注中全文搜索，按 bm25 相关度返回前 limit 条 (id, name, group_name)。
+        
+        查询按空白拆分为多个关键字，全部命中才算匹配。trigram 分词下关键字按子串匹配，
+        不足三个字符的关键字无法走索引，改用 LIKE 在候选结果上过滤；
+        unicode61 分词下关键字按前缀匹配。
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        tokenizer = self._shared.fts_tokenizer
+        
+        if tokenizer == FTS_TOKENIZER:
+            indexed = [t for t in terms if len(t) >= 3]
+            like_terms = [t for t in terms if len(t) < 3]
+            match = ' AND '.join('"' + t.replace('"', '""') + '"' for t in indexed)
+        elif tokenizer is not None:
+            like_terms = []
+            match = ' AND '.join('"' + t.replace('"', '""') + '"*' for t in terms)
+        else:
+            like_terms, match = terms, ''
+        
+        like_sql = ' AND '.join(
+            '(' + ' OR '.join(f"p.{c} LIKE ? ESCAPE '\\'" for c in FTS_COLUMNS) + ')' for _ in like_terms)
+        like_params = []
+        for term in like_terms:
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            like_params.extend([pattern] * len(FTS_COLUMNS))
+        
+        cursor = self.conn.cursor()
+        if match:
+            weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+            cursor.execute(
+                'SELECT p.id, p.name, p.group_name FROM passwords_fts f JOIN passwords p ON p.id = f.rowid '
+                f'WHERE passwords_fts MATCH ? {"AND " + like_sql if like_sql else ""} '
+                f'ORDER BY bm25(passwords_fts, {weights}) LIMIT ?',
+                (match, *like_params, limit)
+            )
+        else:
+            cursor.execute(
+                f'SELECT p.id, p.name, p.group_name FROM passwords p WHERE {like_sql} '
+                'ORDER BY p.group_name, p.name LIMIT ?',
+                (*like_params, limit)
+            )
+        return cursor.fetchall()
+    
+    def get_setting(self, key, default=None):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        return row[0] if row else default
+    
+    def set_setting(self, key, value):
+        with self.transaction() as cursor:
+            cursor.execute(
+                'INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value',
+                (key, value)
+            )
+    
+    # ---- 字段加密 ----
+    # 启用后 passwords.password 以 "enc1:" 开头的 AES-256-GCM 密文存储。列表、菜单和搜索只用到
+    # 分组/名称/用户名/备注，不需要解密；只有真正要输入或显示的那一个字段才经 decrypt_field 解密。
+    # 加密状态按整个库记录（settings 中存在校验密文即为已加密），启用时在同一事务中加密全部密码和历史，
+    # 因此加密库中的每个值都是密文、明文库中的每个值都是明文，从不根据值的前缀判断。
+    
+    def encryption_enabled(self):
+        return self._shared.encrypted
+    
+    def is_unlocked(self):
+        return self._shared.cipher is not None
+    
+    def unlock(self, passphrase):
+        """用主密码派生密钥并校验，成功后密钥保存在共享连接上直到 lock()。返回是否成功"""
+        salt = bytes.fromhex(self.get_setting(CRYPTO_SALT_KEY))
+        params = vault_crypto.load_params(self.get_setting(CRYPTO_PARAMS_KEY))
+        cipher = VaultCipher(vault_crypto.derive_key(passphrase, salt, params))
+        try:
+            valid = cipher.decrypt(self.get_setting(CRYPTO_VERIFIER_KEY)) == vault_crypto.VERIFIER_PLAINTEXT
+        except Exception:
+            valid = False
+        if valid:
+            self._shared.cipher = cipher
+        return valid
+    
+    def lock(self):
+        self._shared.cipher = None
+    
+    def enable_encryption(self, passphrase):
+        """启用加密：保存盐和校验密文，并在同一事务中加密现有的全部明文密码。返回加密的条数"""
+        if self.encryption_enabled():
+            raise ValueError("数据库已启用加密")
+        salt = vault_crypto.new_salt()
+        cipher = VaultCipher(vault_crypto.derive_key(passphrase, salt))
+        with self.transaction() as cursor:
+            self.set_setting(CRYPTO_SALT_KEY, salt.hex())
+            self.set_setting(CRYPTO_PARAMS_KEY, vault_crypto.dump_params())
+            self.set_setting(CRYPTO_VERIFIER_KEY, cipher.encrypt(vault_crypto.VERIFIER_PLAINTEXT))
+            cursor.execute('SELECT id, password FROM passwords')
+            updates = [(cipher.encrypt(password), row_id) for row_id, password in cursor.fetchall()]
+            cursor.executemany('UPDATE passwords SET password = ? WHERE id = ?', updates)
+            # 批量更换留下的旧密码同样加密
+            cursor.execute('SELECT id, password, replacement FROM password_history')
+            history = [(cipher.encrypt(password), None if replacement is None else cipher.encrypt(replacement), row_id)
+                       for row_id, password, replacement in cursor.fetchall()]
+            cursor.executemany('UPDATE password_history SET password = ?, replacement = ? WHERE id = ?', history)
+        self._shared.encrypted = True
+        self._shared.cipher = cipher
+        return len(updates)
+    
+    def _sealer(self):
+        """返回写入密码字段前的转换函数：未启用加密时原样写入，已启用但未解锁时拒绝写入"""
+        if not self._shared.encrypted:
+            return lambda value: value
+        if self._shared.cipher is None:
+            raise VaultLockedError("数据库已加密，请先解锁")
+        return self._shared.cipher.encrypt
+    
+    def _seal(self, value):
+        return self._sealer()(value)
+    
+    def decrypt_field(self, value):
+        """解密单个字段：未启用加密时原样返回（即使内容恰好以 "enc1:" 开头），已启用时总是解密"""
+        if not self._shared.encrypted:
+            return value
+        if self._shared.cipher is None:
+            raise VaultLockedError("数据库已加密，请先解锁")
+        return self._shared.cipher.decrypt(value)
+    
     def get_password_id(self, group_name, name):
         cursor = self.conn.cursor()
         cursor.execute('SELECT id FROM passwords WHERE group_name = ? AND name = ?', (group_name, name))
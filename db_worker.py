@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class DatabaseExecutor(QObject):
+    """在独立线程中执行数据库请求，GUI 线程提交后立即返回。
+    
+    线程持有自己的 SQLite 连接（PasswordDatabase.open_thread_connection），与 GUI 线程的共享连接
+    同库同加密状态；WAL 模式下 GUI 线程和快捷键菜单的读取不会被这里的写事务阻塞。
+    请求按提交顺序串行执行。
+    
+    submit 返回 concurrent.futures.Future；也可以传入 on_done/on_error/progress 回调，
+    它们通过信号排队回到 GUI 线程执行，可以直接操作界面。
+    没有指定 on_error 的请求出错时发出 operation_failed(错误信息)，由界面提示用户，不会被静默丢弃。
+    """
+    operation_failed = pyqtSignal(str)
+    _finished = pyqtSignal(object)
+    _progressed = pyqtSignal(object, int, int)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self._primary = db
+        self._db = None
+        self._callbacks = {}
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='database', initializer=self._open)
+        # 信号在数据库线程中发出，连接到本对象（GUI 线程）后自动排队投递
+        self._finished.connect(self._on_finished)
+        self._progressed.connect(self._on_progress)
+
+    def _open(self):
+        self._db = self._primary.open_thread_connection()
+
+    def submit(self, func, *args, on_done=None, on_error=None, progress=None, **kwargs):
+        """在数据库线程中执行 func(db, *args, **kwargs)，返回 Future。
+        
+        on_done(结果) / on_error(异常) 在 GUI 线程中调用。指定 progress 时 func 会额外收到关键字参数
+        progress(已完成, 总数)，在数据库线程中调用它，progress 回调随后在 GUI 线程中执行。
+        """
+        if progress is not None:
+            kwargs['progress'] = lambda done, total: self._progressed.emit(progress, done, total)
+        future = self._pool.submit(lambda: func(self._db, *args, **kwargs))
+        # 不带回调的请求也要回到 GUI 线程检查结果，否则出错时异常只留在没人读取的 Future 里
+        self._callbacks[future] = (on_done, on_error)
+        future.add_done_callback(self._finished.emit)
+        return future
+
+    def call(self, method, *args, **kwargs):
+        """在数据库线程中调用 PasswordDatabase 的方法，其余参数同 submit"""
+        return self.submit(lambda db, *a, **k: getattr(db, method)(*a, **k), *args, **kwargs)
+
+    def _on_finished(self, future):
+        on_done, on_error = self._callbacks.pop(future)
+        error = future.exception()
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                self.operation_failed.emit(str(error))
+        elif on_done is not None:
+            on_done(future.result())
+
+    def _on_progress(self, callback, done, total):
+        callback(done, total)
+
+    def shutdown(self):
+        """等待已提交的请求执行完毕后关闭连接和线程"""
+        if self._pool is None:
+            return
+        self._pool.submit(lambda: self._db is not None and self._db.close())
+        self._pool.shutdown(wait=True)
+        self._pool = None
@@ -0,0 +1,87 @@
+import itertools
+import queue
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class FillJob:
+    """一次自动填充：延时 delay 秒（等待目标窗口拿回焦点）后用 backend 输入 steps"""
+
+    def __init__(self, job_id, backend, steps, delay):
+        self.id = job_id
+        self.backend = backend
+        self.steps = steps
+        self.delay = delay
+        self.cancelled = threading.Event()
+
+
+class FillWorker(QObject):
+    """在独立线程中按顺序执行自动填充，GUI 线程只负责入队。
+    
+    cancel() 取消所有排队中和正在等待/输入中的任务：等待阶段立即结束，
+    逐步输入的后端在步骤之间停止，一次性提交的后端（SendInput）在提交前停止。
+    结果通过信号回到 GUI 线程（跨线程信号自动排队投递）；信号发出时任务已不计入 is_busy()。
+    """
+    fill_queued = pyqtSignal(int)
+    fill_finished = pyqtSignal(int)
+    fill_failed = pyqtSignal(int, str)
+    fill_cancelled = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._thread = threading.Thread(target=self._run, name='autofill', daemon=True)
+        self._thread.start()
+
+    def submit(self, backend, steps, delay=0.0):
+        """入队一个填充任务，立即返回任务ID"""
+        job = FillJob(next(self._ids), backend, steps, delay)
+        with self._lock:
+            self._pending[job.id] = job
+        self._queue.put(job)
+        self.fill_queued.emit(job.id)
+        return job.id
+
+    def cancel(self):
+        """取消全部未完成的任务，返回被取消的任务数"""
+        with self._lock:
+            jobs = list(self._pending.values())
+        for job in jobs:
+            job.cancelled.set()
+        return len(jobs)
+
+    def is_busy(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def stop(self, timeout=None):
+        """取消剩余任务并结束工作线程"""
+        self.cancel()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            error = None
+            try:
+                # 用 Event.wait 代替 sleep，取消时不必等满延时
+                if not job.cancelled.wait(job.delay):
+                    job.backend.send(job.steps, job.cancelled)
+            except Exception as e:
+                error = str(e)
+            # 先移出待办再发信号，GUI 线程收到信号时 is_busy() 已反映最新状态
+            with self._lock:
+                self._pending.pop(job.id, None)
+            if error is not None:
+                self.fill_failed.emit(job.id, error)
+            elif job.cancelled.is_set():
+                self.fill_cancelled.emit(job.id)
+            else:
+                self.fill_finished.emit(job.id)
@@ -0,0 +1,125 @@
+import heapq
+import operator
+import re
+from itertools import chain, compress, repeat
+
+# 打分参数（参考 fzf v1）：每个命中字符得基础分，连续命中、词首命中另加分，间隔扣分
+SCORE_MATCH = 16
+BONUS_CONSECUTIVE = 12
+BONUS_BOUNDARY = 10
+BONUS_FIRST_CHAR = 8
+PENALTY_GAP = 1
+BOUNDARY_CHARS = frozenset(' /-_.@:')
+
+
+class FuzzyMatcher:
+    """快捷键菜单搜索框使用的 fzf 风格模糊匹配器（纯 Python，不依赖 Qt）。
+    
+    密码库变化时调用 rebuild 预先计算小写文本；查询时把关键字编译成
+    a[^b]*b[^c]*c 形式的正则（无回溯爆炸），逐条判定经 map/compress 全部在 C 层完成，
+    Python 只对命中的候选取命中位置并打分。新关键字以上一次关键字为前缀时（连续输入），
+    只在上一次命中的候选中继续匹配。
+    """
+
+    # 没有词首命中时，最多精确打分的候选数
+    SCORE_LIMIT = 300
+
+    def __init__(self, entries=()):
+        self.rebuild(entries)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def rebuild(self, entries):
+        """entries 为 (记录ID, 分组, 名称) 的可迭代对象，匹配文本为“分组/名称”"""
+        self._ids = []
+        self._texts = []
+        for entry_id, group_name, name in entries:
+            self._ids.append(entry_id)
+            self._texts.append(f'{group_name}/{name}'.lower())
+        self._last_query = None
+        self._last_hits = None
+
+    @staticmethod
+    def _compile(query):
+        parts = []
+        for i, char in enumerate(query):
+            if i:
+                parts.append('[^' + re.escape(char) + ']*')
+            parts.append('(' + re.escape(char) + ')')
+        return re.compile(''.join(parts))
+
+    @staticmethod
+    def _score(text, spans):
+        """spans 为 match.regs：第 0 项是整体匹配，其后依次是每个关键字字符的命中位置"""
+        score = 0
+        prev = -2
+        for pos, _ in spans[1:]:
+            if pos == prev + 1:
+                score += SCORE_MATCH + BONUS_CONSECUTIVE
+            else:
+                score += SCORE_MATCH
+                if prev >= 0:
+                    score -= PENALTY_GAP * (pos - prev - 1)
+                if pos == 0:
+                    score += BONUS_FIRST_CHAR + BONUS_BOUNDARY
+                elif text[pos - 1] in BOUNDARY_CHARS:
+                    score += BONUS_BOUNDARY
+            prev = pos
+        # 同分时更短的文本更靠前
+        return score * 256 - len(text)
+
+    def _rank_boundary(self, preferred, query, limit):
+        """给词首连续命中的候选打分并取前 limit 个。
+        
+        关键字在词首连续出现时各字符的得分是固定的（与 _score 对这种对齐的计算相同），只差文本开头的加分和文本长度，
+        不需要逐字符计算，同样经 map/compress 在 C 层完成，因此可以对全部候选打分。
+        """
+        get_text = self._texts.__getitem__
+        base = (SCORE_MATCH + BONUS_BOUNDARY + (len(query) - 1) * (SCORE_MATCH + BONUS_CONSECUTIVE)) * 256
+        at_start = list(map(str.startswith, map(get_text, preferred), repeat(query)))
+        groups = []
+        for value, members in ((base + BONUS_FIRST_CHAR * 256, compress(preferred, at_start)),
+                               (base, compress(preferred, map(operator.not_, at_start)))):
+            members = list(members)
+            groups.append(zip(map(operator.sub, repeat(value), map(len, map(get_text, members))), members))
+        top = heapq.nlargest(limit, chain(*groups))
+        return [(value, self._ids[i]) for value, i in top]
+
+    def _prescreen(self, hits, search):
+        """按廉价的预估分挑出 SCORE_LIMIT 个候选：命中跨度越窄（间隔扣分越少）、文本越短越靠前"""
+        texts = self._texts
+        spans = map(re.Match.span, map(search, map(texts.__getitem__, hits)))
+        keys = [(end - start, len(texts[i]), i) for (start, end), i in zip(spans, hits)]
+        return [i for _, _, i in heapq.nsmallest(self.SCORE_LIMIT, keys)]
+
+    def search(self, query, limit=10):
+        """返回得分最高的最多 limit 个 (得分, 记录ID)，按得分从高到低排列"""
+        query = query.lower()
+        if not query:
+            self._last_query = self._last_hits = None
+            return []
+
+        search = self._compile(query).search
+        texts = self._texts
+        # map/compress 让逐条匹配全部在 C 层完成
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_hits
+            hits = list(compress(candidates, map(search, map(texts.__getitem__, candidates))))
+        else:
+            hits = list(compress(range(len(texts)), map(search, texts)))
+        self._last_query, self._last_hits = query, hits
+
+        if len(hits) > self.SCORE_LIMIT:
+            # 命中过多（通常是只输入了一两个字符）时，只对关键字在词首连续出现的候选打分，这类候选得分最高，
+            # 全部参与打分，不会因为在库中的位置靠后而被漏掉；没有这类候选时按预估分挑出 SCORE_LIMIT 个
+            boundary = re.compile('(?:^|[' + re.escape(''.join(sorted(BOUNDARY_CHARS))) + '])'
+                                  + re.escape(query)).search
+            preferred = list(compress(hits, map(boundary, map(texts.__getitem__, hits))))
+            if preferred:
+                return self._rank_boundary(preferred, query, limit)
+            hits = self._prescreen(hits, search)
+
+        score = self._score
+        top = heapq.nlargest(limit, [(score(texts[i], search(texts[i]).regs), i) for i in hits])
+        return [(value, self._ids[i]) for value, i in top]
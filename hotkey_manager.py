@@ -1,107 +1,108 @@
 
-import win32con
-import win32api
-import win32gui
-import ctypes
-from PyQt5.QtCore import QObject, QPoint, QTimer, pyqtSignal
+from PyQt5.QtCore import Qt, QObject, QPoint, pyqtSignal
 from menu import PasswordMenu
 from database import PasswordDatabase
+from vault_cache import VaultCache
+from fill_worker import FillWorker
+from trigger import TriggerStateMachine, LatencyTracer, default_event_source
+import autofill
 
 
-# 定义回调函数类型
-CMPFUNC = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_void_p))
-
 class HotkeyManager(QObject):
-    show_menu_signal = pyqtSignal(QPoint)
+    # 参数：弹出位置、本次触发的 trace
+    show_menu_signal = pyqtSignal(QPoint, object)
+    # 需要提示用户的错误（标题, 内容）。打包后没有控制台，由托盘气泡或消息框显示
+    message_requested = pyqtSignal(str, str)
     
     
-    def __init__(self, password_manager):
+    def __init__(self, password_manager=None, event_source_factory=None):
         super().__init__()
-        self.password_manager = password_manager
+        self.password_manager = None
         self.db = PasswordDatabase()
-        self.menu = None
-        self.show_timer = QTimer(self)
-        self.show_timer.setSingleShot(True)
-        self.show_timer.timeout.connect(self.delayed_show_menu)
-        
-        # 创建回调函数
-        self._hook_proc = CMPFUNC(self._mouse_hook_proc)
-        
-        # 添加鼠标钩子
-        self.hook = ctypes.windll.user32.SetWindowsHookExW(
-            win32con.WH_MOUSE_LL,
-            self._hook_proc,
-            None,
-            0
-        )
+        # 密码库未变化时，弹出菜单直接复用内存快照
+        self.vault = VaultCache(self.db)
+        # 菜单常驻复用，只在密码库变化时增量修补
+        input_backend = autofill.create_backend(self.db.get_setting(autofill.SETTING_KEY))
+        # 自动填充在工作线程中执行，新的快捷键触发或按 Esc 会取消尚未完成的填充
+        self.fill_worker = FillWorker(self)
+        self.fill_worker.fill_queued.connect(self.update_key_watch)
+        self.fill_worker.fill_finished.connect(self.update_key_watch)
+        self.fill_worker.fill_cancelled.connect(self.update_key_watch)
+        self.fill_worker.fill_failed.connect(self.on_fill_failed)
+        self.menu = PasswordMenu(credential_provider=self.get_credentials, input_backend=input_backend,
+                                 fill_worker=self.fill_worker)
+        # 托盘启动时主界面尚未创建，等第一次打开时再由 attach_window 关联
+        if password_manager is not None:
+            self.attach_window(password_manager)
+        self.menu_version = None
+        # 最近一次从输入事件到菜单可见的耗时（秒）
+        self.last_popup_latency = None
         
-        if not self.hook:
-            raise Exception('Failed to set mouse hook')
-        
-        self.show_menu_signal.connect(self.show_password_menu_in_main_thread)
+        # 触发链路：事件源 -> 状态机 -> show_menu_signal -> GUI 线程弹出菜单，各阶段耗时计入 tracer
+        self.trigger = TriggerStateMachine()
+        self.tracer = LatencyTracer()
+        # 排队投递：钩子回调立即返回，菜单在下一轮事件循环中弹出（期间重复触发由状态机合并）
+        self.show_menu_signal.connect(self.show_password_menu_in_main_thread, Qt.QueuedConnection)
+        # 未指定事件源时使用 Win32 全局钩子（仅 Windows）；测试中可传入 SyntheticEventSource 工厂
+        self.event_source = (event_source_factory or default_event_source)(self.on_input_event)
+        self.update_key_watch()
     
-    def _mouse_hook_proc(self, nCode, wParam, lParam):
-        try:
-            if nCode >= 0:
-                if wParam == win32con.WM_RBUTTONDOWN:
-                    # 检查CTRL键状态 (最高位为1表示按下)
-                    if win32api.GetKeyState(win32con.VK_CONTROL) & 0x8000:
-                        # 获取鼠标位置并显示菜单
-                        cursor_pos = win32gui.GetCursorPos()
-                        point = QPoint(cursor_pos[0], cursor_pos[1])
-                        self.show_menu_signal.emit(point)
-                        # 阻止事件传递 (消费掉这个点击)
-                        return 1
-        except:
-            pass
-        # 继续传递事件
-        return ctypes.windll.user32.CallNextHookEx(self.hook, nCode, wParam, lParam)
+    def attach_window(self, password_manager):
+        self.password_manager = password_manager
+        password_manager.input_backend_changed.connect(self.set_input_backend)
+    
+    def set_input_backend(self, name):
+        self.menu.set_input_backend(autofill.create_backend(name))
     
-    def __del__(self):
-        if hasattr(self, 'hook') and self.hook:
-            try:
-                ctypes.windll.user32.UnhookWindowsHookEx(self.hook)
-            except:
-                pass
+    def on_input_event(self, event):
+        """事件源回调（Win32 钩子中为 GUI 线程的钩子回调），返回是否拦截该输入"""
+        decision = self.trigger.handle(event, filling=self.fill_worker.is_busy())
+        if decision.cancel_fill:
+            self.fill_worker.cancel()
+        if decision.show is not None:
+            trace = self.tracer.start(event.timestamp)
+            trace.mark('hook')
+            self.show_menu_signal.emit(QPoint(*decision.show), trace)
+        return decision.consume
     
-    def on_right_click(self):
-        if self.ctrl_pressed:
-            try:
-                # 获取当前鼠标位置
-                cursor_pos = win32gui.GetCursorPos()
-                point = QPoint(cursor_pos[0], cursor_pos[1])
-                self.show_menu_signal.emit(point)
-            except Exception as e:
-                print(f"鼠标事件处理错误: {e}")
+    def close(self):
+        if self.event_source is not None:
+            self.event_source.close()
+            self.event_source = None
     
-    def show_password_menu_in_main_thread(self, point):
+    def get_credentials(self, password_id):
+        """菜单动作触发时才按ID读取用户名和密码"""
+        return self.db.get_credentials(password_id)
+    
+    def update_key_watch(self, job_id=None):
+        """只在有填充任务时监听键盘（用于 Esc 取消），其余时间不让每次按键都经过钩子"""
+        if self.event_source is not None:
+            self.event_source.set_key_watch(self.fill_worker.is_busy())
+    
+    def on_fill_failed(self, job_id, message):
+        self.update_key_watch()
+        self.message_requested.emit("自动填充失败", message)
+    
+    def show_password_menu_in_main_thread(self, point, trace=None):
+        if trace is None:
+            trace = self.tracer.start()
         try:
-            passwords = self.db.get_all_passwords()
-            
-            if self.menu:
-                try:
-                    self.menu.hide()
-                    self.menu.deleteLater()
-                except:
-                    pass
+            trace.mark('dispatch')
+            entries = self.vault.get_entries()
+            trace.mark('fetch')
             
-            # 创建新菜单
-            self.menu = PasswordMenu(point, passwords)
-            self.menu.setParent(None)  # 设置为顶级窗口
+            if self.vault.version != self.menu_version:
+                self.menu.update_passwords(entries)
+                self.menu_version = self.vault.version
+            trace.mark('patch')
             
-            # 使用定时器延迟显示菜单
-            self.show_timer.start(50)
+            # 直接在鼠标位置弹出，不再等待固定延时
+            self.menu.popup(point)
+            self.menu.activateWindow()
+            trace.mark('popup')
+            self.last_popup_latency = self.tracer.finish(trace)
             
         except Exception as e:
-            print(f"显示密码菜单时出错: {e}")
-    
-    def delayed_show_menu(self):
-        try:
-            if self.menu:
-                # 重新设置位置并显示
-                cursor_pos = win32gui.GetCursorPos()
-                self.menu.move(cursor_pos[0], cursor_pos[1])
-                self.menu.show()
-                self.menu.activateWindow()
-        except Exception as e:
-            print(f"延迟显示菜单时出错: {e}")
\ No newline at end of file
+            self.message_requested.emit("显示密码菜单时出错", str(e))
+        finally:
+            self.trigger.menu_shown()
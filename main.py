@@ -1,23 +1,163 @@
+import argparse
+import os
 import sys
-from PyQt5.QtWidgets import QApplication
-from password_manager import PasswordManagerWindow
-from hotkey_manager import HotkeyManager
+from startup_profiler import StartupProfiler
+
+# 在导入 PyQt5 之前创建，导入耗时也计入启动分析
+profiler = StartupProfiler()
+
+with profiler.phase('import_qt'):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtGui import QIcon
+    from PyQt5.QtWidgets import (QApplication, QInputDialog, QLineEdit, QMenu, QMessageBox,
+                                 QStyle, QSystemTrayIcon)
+# 主界面（password_manager 及其样式表、表格模型、数据库线程）不在这里导入，第一次打开时才加载
+with profiler.phase('import_core'):
+    from database import PasswordDatabase
+    from hotkey_manager import HotkeyManager
+    import vault_crypto
+
+ICON_FILE = 'RuxiPass.ico'
+
+
+def unlock_vault(db, parent=None):
+    """数据库已加密时反复询问主密码直到解锁成功；用户取消时返回 False"""
+    if not db.encryption_enabled() or db.is_unlocked():
+        return True
+    if not vault_crypto.CRYPTO_AVAILABLE:
+        QMessageBox.critical(parent, "无法解锁", "数据库已加密，但未安装 cryptography 库。")
+        return False
+    prompt = "请输入主密码:"
+    while True:
+        passphrase, ok = QInputDialog.getText(parent, "解锁密码库", prompt, QLineEdit.Password)
+        if not ok:
+            return False
+        if db.unlock(passphrase):
+            return True
+        prompt = "主密码错误，请重新输入:"
+
+
+def app_icon(app):
+    # 打包后图标随程序解压到 sys._MEIPASS，源码运行时在脚本所在目录
+    base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(base_dir, ICON_FILE)
+    if os.path.exists(path):
+        return QIcon(path)
+    return app.style().standardIcon(QStyle.SP_ComputerIcon)
+
+
+class Launcher:
+    """托盘图标与主界面的按需创建。
+
+    快捷键钩子在主界面之前安装；主界面第一次通过托盘（或窗口模式启动时）打开时才导入并构建，
+    之后关闭窗口只是隐藏，再次打开复用同一个窗口。
+    """
+
+    def __init__(self, app, hotkey_manager, profiler):
+        self.app = app
+        self.hotkey_manager = hotkey_manager
+        self.profiler = profiler
+        self.window = None
+        self.tray = None
+        hotkey_manager.message_requested.connect(self.show_message)
+
+    def show_tray(self):
+        tray = QSystemTrayIcon(app_icon(self.app), self.app)
+        tray.setToolTip("SuperEasyPass")
+        menu = QMenu()
+        menu.addAction("打开主界面", self.show_window)
+        menu.addSeparator()
+        menu.addAction("退出", self.app.quit)
+        tray.setContextMenu(menu)
+        # 单击或双击托盘图标打开主界面
+        tray.activated.connect(self.on_tray_activated)
+        tray.show()
+        self.tray = tray
+        self.tray_menu = menu
+
+    def show_message(self, title, text):
+        """后台（快捷键菜单、自动填充）出错时提示用户：有托盘时用托盘气泡，否则弹出消息框"""
+        if self.tray is not None and QSystemTrayIcon.supportsMessages():
+            self.tray.showMessage(title, text, QSystemTrayIcon.Warning)
+        else:
+            QMessageBox.warning(self.window, title, text)
+
+    def on_tray_activated(self, reason):
+        if reason in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
+            self.show_window()
+
+    def show_window(self):
+        if self.window is None:
+            with self.profiler.phase('import_window'):
+                from password_manager import PasswordManagerWindow
+            with self.profiler.phase('window'):
+                self.window = PasswordManagerWindow()
+                self.window.setWindowIcon(self.tray.icon() if self.tray else app_icon(self.app))
+            self.hotkey_manager.attach_window(self.window)
+            # 退出前写完待保存的备注，并等待数据库线程处理完已提交的请求
+            self.app.aboutToQuit.connect(self.window.shutdown)
+        self.window.showNormal()
+        self.window.raise_()
+        self.window.activateWindow()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='SuperEasyPass')
+    parser.add_argument('--tray', action='store_true',
+                        help="只启动托盘图标和快捷键，主界面在第一次打开时才创建（开机自启动使用）")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="打印各启动阶段耗时，事件循环第一次空闲后退出")
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help="配合 --profile-startup，把各阶段耗时写入 JSON 文件")
+    # 其余参数（如 Qt 自身的 -platform）原样交给 QApplication
+    args, _ = parser.parse_known_args(argv[1:])
+    return args
+
 
 def main():
-    app = QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(False)  # 关闭窗口后应用继续运行
-    
-    # 创建密码管理窗口
-    password_manager = PasswordManagerWindow()
-    password_manager.show()
-    
-    # 创建全局快捷键管理器
-    hotkey_manager = HotkeyManager(password_manager)
-    
-    # 保持对hotkey_manager的引用，防止被垃圾回收
+    args = parse_args(sys.argv)
+
+    with profiler.phase('qapplication'):
+        app = QApplication(sys.argv)
+        app.setQuitOnLastWindowClosed(False)  # 关闭窗口后应用继续运行
+
+    # 数据库已加密时先解锁，密钥保存在共享连接中，窗口和快捷键菜单共用
+    with profiler.phase('database'):
+        db = PasswordDatabase()
+    with profiler.phase('unlock'):
+        if not unlock_vault(db):
+            sys.exit(0)
+
+    # 先安装全局快捷键，开机自启动时尽早可用
+    with profiler.phase('hotkey'):
+        hotkey_manager = HotkeyManager()
+
+    launcher = Launcher(app, hotkey_manager, profiler)
+    # 保持引用，防止被垃圾回收
     app.hotkey_manager = hotkey_manager
-    
+    app.launcher = launcher
+    app.aboutToQuit.connect(hotkey_manager.close)
+
+    tray_available = QSystemTrayIcon.isSystemTrayAvailable()
+    if tray_available:
+        with profiler.phase('tray'):
+            launcher.show_tray()
+    # 没有系统托盘时无法从托盘打开主界面，只能直接显示（启动分析时除外，保持托盘模式的测量口径）
+    if not args.tray or (not tray_available and not args.profile_startup):
+        launcher.show_window()
+
+    if args.profile_startup:
+        def finish_profile():
+            # 从进入事件循环到第一次空闲，包含已显示窗口的首次绘制
+            profiler.record('first_event_loop', profiler.elapsed() - loop_started)
+            print(profiler.report())
+            if args.profile_json:
+                profiler.dump(args.profile_json)
+            app.quit()
+        loop_started = profiler.elapsed()
+        QTimer.singleShot(0, finish_profile)
+
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('RuxiPass.ico', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -1,56 +1,242 @@
-from PyQt5.QtWidgets import QMenu, QAction, QApplication
+from PyQt5.QtWidgets import QMenu, QAction, QApplication, QLineEdit, QWidgetAction
 from PyQt5.QtCore import Qt, QPoint
 from PyQt5.QtGui import QPalette, QColor
-from database import PasswordDatabase
-import pyautogui
+from fuzzy import FuzzyMatcher
+import autofill
+import bisect
 import time
 
+# 条目子菜单中的动作类型，与记录ID一起存放在 QAction.data() 中
+ACTION_ONECLICK = 'oneclick'
+ACTION_USERNAME = 'username'
+ACTION_PASSWORD = 'password'
+ENTRY_ACTIONS = ((ACTION_ONECLICK, "OneClick"), (ACTION_USERNAME, "Username"), (ACTION_PASSWORD, "Password"))
+
+
 class PasswordMenu(QMenu):
-    def __init__(self, position, passwords):
+    """快捷键弹出的密码菜单。
+    
+    菜单只构建一次并常驻内存，密码库变化时由 update_passwords 按记录ID增量修补
+    （新增、删除、改名、移动分组），弹出时只需要 popup 到鼠标位置。
+    
+    顶层只创建分组子菜单；分组内的条目在该分组第一次展开（aboutToShow）时才创建，
+    条目下的三个动作同样在条目第一次展开时才创建。所有动作统一由 triggered 处理，
+    通过 QAction.data() 中的 (记录ID, 动作类型) 分发，凭据在触发时才经
+    credential_provider(记录ID) -> (用户名, 密码) 取得，菜单不持有任何明文。
+    
+    菜单顶部有搜索框：直接打字即可模糊搜索“分组/名称”，前 SEARCH_RESULT_COUNT 条结果
+    显示在搜索框下方，回车对第一条（或当前高亮的一条）执行 OneClick。
+    
+    键盘输入由 input_backend（见 autofill.py）完成，可通过 set_input_backend 随时切换。
+    传入 fill_worker 时输入在其工作线程中进行，GUI 线程不会因等待焦点切换和打字而阻塞；
+    未传入时在当前线程中同步执行。
+    """
+    SEARCH_RESULT_COUNT = 8
+    
+    def __init__(self, entries=(), credential_provider=None, input_backend=None, fill_worker=None):
         super().__init__()
-        self.position = position
-        self.passwords = passwords
+        self.credential_provider = credential_provider
+        self.input_backend = input_backend or autofill.create_backend()
+        self.fill_worker = fill_worker
+        # 分组名 -> 分组子菜单；分组名 -> 按 (名称, ID) 排序的条目键列表
+        self._group_menus = {}
+        self._group_keys = {}
+        self._group_order = []
+        # 记录ID -> (分组名, 名称)
+        self._entries = {}
+        # 已展开过的分组：分组名 -> {记录ID: 条目子菜单}
+        self._populated = {}
+        self._fuzzy = FuzzyMatcher()
         
         # 设置窗口标志和样式
         self.setup_window()
+        self.setup_search()
+        self.triggered.connect(self._on_triggered)
         # 初始化菜单
-        self.init_menu()
-    
-    def init_menu(self):
-        # 按分组整理密码
-        password_groups = {}
-        # get_all_passwords returns (id, name, username, password, group_name, note)
-        for id, name, username, password, group_name, _ in self.passwords:
-            if group_name not in password_groups:
-                password_groups[group_name] = []
-            password_groups[group_name].append((id, name, username, password))
+        self.update_passwords(entries)
+    
+    def set_input_backend(self, backend):
+        self.input_backend = backend
+    
+    def update_passwords(self, entries):
+        """与当前菜单内容比对，只对有变化的条目做增删改。entries 为 list_entries 格式的 (id, group_name, name)"""
+        latest = {entry_id: (group_name, name) for entry_id, group_name, name in entries}
         
-        # 为每个分组创建子菜单
-        for group_name, group_passwords in password_groups.items():
-            group_menu = QMenu(group_name, self)
-            
-            # 为每个密码创建子菜单
-            for id, name, username, password in group_passwords:
-                password_menu = QMenu(name, group_menu)
-                
-                oneclick_action = QAction("OneClick", password_menu)
-                username_action = QAction("Username", password_menu)
-                password_action = QAction("Password", password_menu)
-                
-                oneclick_action.triggered.connect(
-                    lambda checked, u=username, p=password: self.oneclick_action(u, p))
-                username_action.triggered.connect(
-                    lambda checked, u=username: self.username_action(u))
-                password_action.triggered.connect(
-                    lambda checked, p=password: self.password_action(p))
-                
-                password_menu.addAction(oneclick_action)
-                password_menu.addAction(username_action)
-                password_menu.addAction(password_action)
-                
-                group_menu.addMenu(password_menu)
-            
+        for entry_id in [i for i in self._entries if i not in latest]:
+            self._remove_entry(entry_id)
+        
+        for entry_id, entry in latest.items():
+            current = self._entries.get(entry_id)
+            if current == entry:
+                continue
+            if current is not None:
+                self._remove_entry(entry_id)
+            self._insert_entry(entry_id, *entry)
+        
+        # 模糊搜索的匹配文本随密码库一起预先计算
+        self._fuzzy.rebuild((entry_id, group_name, name) for entry_id, (group_name, name) in latest.items())
+    
+    def setup_search(self):
+        """在菜单顶部放置搜索框和一组复用的结果动作"""
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText('🔍 输入以搜索...')
+        self.search_edit.textChanged.connect(self._on_search_changed)
+        self.search_edit.returnPressed.connect(self._activate_search_result)
+        search_action = QWidgetAction(self)
+        search_action.setDefaultWidget(self.search_edit)
+        self.addAction(search_action)
+        
+        self._result_actions = []
+        for _ in range(self.SEARCH_RESULT_COUNT):
+            action = QAction(self)
+            action.setVisible(False)
+            self.addAction(action)
+            self._result_actions.append(action)
+        self.aboutToHide.connect(self.search_edit.clear)
+    
+    def _on_search_changed(self, text):
+        results = self._fuzzy.search(text, self.SEARCH_RESULT_COUNT)
+        for action, (_, entry_id) in zip(self._result_actions, results):
+            group_name, name = self._entries[entry_id]
+            action.setText(f'{group_name} / {name}')
+            action.setData((entry_id, ACTION_ONECLICK))
+            action.setVisible(True)
+        for action in self._result_actions[len(results):]:
+            action.setVisible(False)
+            action.setData(None)
+        # 搜索时隐藏分组子菜单，让结果紧贴搜索框
+        searching = bool(text)
+        for group_menu in self._group_menus.values():
+            group_menu.menuAction().setVisible(not searching)
+        if results:
+            self.setActiveAction(self._result_actions[0])
+    
+    def _activate_search_result(self):
+        active = self.activeAction()
+        if active not in self._result_actions or not active.isVisible():
+            active = self._result_actions[0]
+        if active.isVisible():
+            active.trigger()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 让输入法（中文输入）直接作用于搜索框
+        self.search_edit.setFocus()
+    
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key in (Qt.Key_Return, Qt.Key_Enter) and self.search_edit.text():
+            self._activate_search_result()
+            return
+        if key == Qt.Key_Backspace:
+            self.search_edit.backspace()
+            return
+        if key == Qt.Key_Escape and self.search_edit.text():
+            self.search_edit.clear()
+            return
+        text = event.text()
+        if text and text.isprintable() and not event.modifiers() & (Qt.ControlModifier | Qt.AltModifier):
+            self.search_edit.insert(text)
+            return
+        super().keyPressEvent(event)
+    
+    def _insert_group(self, group_name):
+        group_menu = QMenu(group_name, self)
+        group_menu.menuAction().setData(group_name)
+        group_menu.aboutToShow.connect(self._on_group_about_to_show)
+        pos = bisect.bisect_left(self._group_order, group_name)
+        if pos < len(self._group_order):
+            self.insertMenu(self._group_menus[self._group_order[pos]].menuAction(), group_menu)
+        else:
             self.addMenu(group_menu)
+        self._group_order.insert(pos, group_name)
+        self._group_menus[group_name] = group_menu
+        self._group_keys[group_name] = []
+        return group_menu
+    
+    def _insert_entry(self, entry_id, group_name, name):
+        if group_name not in self._group_menus:
+            self._insert_group(group_name)
+        keys = self._group_keys[group_name]
+        key = (name, entry_id)
+        pos = bisect.bisect_left(keys, key)
+        keys.insert(pos, key)
+        self._entries[entry_id] = (group_name, name)
+        
+        # 分组尚未展开过时只记录顺序，等 aboutToShow 时再创建
+        entry_menus = self._populated.get(group_name)
+        if entry_menus is not None:
+            before = entry_menus[keys[pos + 1][1]].menuAction() if pos + 1 < len(keys) else None
+            self._create_entry_menu(group_name, entry_id, name, before)
+    
+    def _create_entry_menu(self, group_name, entry_id, name, before=None):
+        group_menu = self._group_menus[group_name]
+        password_menu = QMenu(name, group_menu)
+        password_menu.menuAction().setData(entry_id)
+        password_menu.aboutToShow.connect(self._on_entry_about_to_show)
+        if before is not None:
+            group_menu.insertMenu(before, password_menu)
+        else:
+            group_menu.addMenu(password_menu)
+        self._populated[group_name][entry_id] = password_menu
+    
+    def _remove_entry(self, entry_id):
+        group_name, name = self._entries.pop(entry_id)
+        group_menu = self._group_menus[group_name]
+        entry_menus = self._populated.get(group_name)
+        if entry_menus is not None:
+            password_menu = entry_menus.pop(entry_id)
+            group_menu.removeAction(password_menu.menuAction())
+            password_menu.deleteLater()
+        
+        keys = self._group_keys[group_name]
+        keys.remove((name, entry_id))
+        if not keys:
+            # 分组已空，连同分组子菜单一起移除
+            self.removeAction(group_menu.menuAction())
+            group_menu.deleteLater()
+            self._group_order.remove(group_name)
+            del self._group_menus[group_name]
+            del self._group_keys[group_name]
+            self._populated.pop(group_name, None)
+    
+    def populate_group(self, group_name):
+        """创建分组内全部条目子菜单（已创建过则跳过）"""
+        if group_name in self._populated or group_name not in self._group_menus:
+            return
+        self._populated[group_name] = {}
+        for name, entry_id in self._group_keys[group_name]:
+            self._create_entry_menu(group_name, entry_id, name)
+    
+    def _on_group_about_to_show(self):
+        self.populate_group(self.sender().menuAction().data())
+    
+    def _on_entry_about_to_show(self):
+        password_menu = self.sender()
+        if password_menu.actions():
+            return
+        entry_id = password_menu.menuAction().data()
+        for kind, text in ENTRY_ACTIONS:
+            action = QAction(text, password_menu)
+            action.setData((entry_id, kind))
+            password_menu.addAction(action)
+    
+    def _on_triggered(self, action):
+        """所有条目动作的统一入口（子菜单中的 triggered 会沿父菜单链传到这里）"""
+        data = action.data()
+        if not isinstance(data, tuple) or self.credential_provider is None:
+            return
+        entry_id, kind = data
+        credentials = self.credential_provider(entry_id)
+        if not credentials:
+            return
+        username, password = credentials
+        if kind == ACTION_ONECLICK:
+            self.oneclick_action(username, password)
+        elif kind == ACTION_USERNAME:
+            self.username_action(username)
+        elif kind == ACTION_PASSWORD:
+            self.password_action(password)
     
     def setup_window(self):
         # 设置窗口标志
@@ -100,30 +286,24 @@ class PasswordMenu(QMenu):
             }
         """)
         
-        # 设置属性
+        # 设置属性（菜单常驻复用，关闭时只隐藏不销毁）
         self.setAttribute(Qt.WA_TranslucentBackground, False)
-        self.setAttribute(Qt.WA_DeleteOnClose)
     
-    def oneclick_action(self, username, password):
-        # 关闭菜单
+    def _fill(self, steps, delay):
+        """关闭菜单后等待 delay 秒（让焦点回到目标窗口）再输入"""
         self.close()
-        
-        # 允许短暂的时间切换焦点，但尽量缩短
-        time.sleep(0.05) 
-        
-        # 模拟键盘输入：用户名 -> Tab -> 密码 -> Enter
-        # explicit interval=0 ensures fastest typing
-        pyautogui.write(username)
-        pyautogui.press('tab')
-        pyautogui.write(password)
-        pyautogui.press('enter')
+        if self.fill_worker is not None:
+            return self.fill_worker.submit(self.input_backend, steps, delay)
+        time.sleep(delay)
+        self.input_backend.send(steps)
+        return None
+    
+    def oneclick_action(self, username, password):
+        # 模拟键盘输入：用户名 -> Tab -> 密码 -> Enter，整段序列一次提交给输入后端
+        return self._fill(autofill.login_sequence(username, password), 0.05)
     
     def username_action(self, username):
-        self.close()
-        time.sleep(0.1)
-        pyautogui.write(username)
+        return self._fill(autofill.text_sequence(username), 0.1)
     
     def password_action(self, password):
-        self.close()
-        time.sleep(0.1)
-        pyautogui.write(password)
\ No newline at end of file
+        return self._fill(autofill.text_sequence(password), 0.1)
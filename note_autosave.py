@@ -0,0 +1,108 @@
+import hashlib
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+def note_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class NoteWriteBehind(QObject):
+    """备注的延迟写入队列。
+    
+    以 记录ID -> 内容哈希 记录每条备注最近一次加载或保存的内容，编辑后只有内容真的变化才进入待写队列；
+    同一条记录的多次编辑在队列中合并为最后一次的内容。队列在输入停顿 IDLE_MS 后、切换条目时
+    （flush）以及退出时（flush(wait=True)）经 DatabaseExecutor 在一个事务中整体写入，
+    每次提交合并多条记录，没有变化时不产生任何写入。
+    
+    写入完成前 pending_text 仍能取到最新内容，切换回该条目时不会显示旧备注。
+    写入失败的内容重新排队，空闲时自动重试 MAX_RETRIES 次；仍失败时发出 save_failed 并停止自动重试，
+    内容保留在队列中，切换条目或编辑框失去焦点时再次尝试。
+    """
+    IDLE_MS = 1000
+    MAX_RETRIES = 3
+    # 参数为错误信息；自动重试用尽时发出
+    save_failed = pyqtSignal(str)
+
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self._saved = {}
+        self._pending = {}
+        self._inflight = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.IDLE_MS)
+        self._timer.timeout.connect(self.flush)
+        # 连续失败的次数，写入成功后清零
+        self._failures = 0
+        # 交给数据库线程的批次数（每批一个事务），供基准统计
+        self.flushes = 0
+
+    def loaded(self, record_id, text):
+        """记录从数据库读出（即已保存）的内容"""
+        self._saved[record_id] = note_hash(text)
+
+    def note_changed(self, record_id, text):
+        if self._saved.get(record_id) == note_hash(text):
+            # 改回了已保存的内容，之前排队的修改也不必再写
+            self._pending.pop(record_id, None)
+        else:
+            self._pending[record_id] = text
+        if self._pending:
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def pending_text(self, record_id):
+        """尚未写入数据库的最新备注；没有时返回 None"""
+        if record_id in self._pending:
+            return self._pending[record_id]
+        return self._inflight.get(record_id)
+
+    def forget(self, record_id):
+        """记录被删除时丢弃它的待写内容"""
+        self._pending.pop(record_id, None)
+        self._saved.pop(record_id, None)
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self, wait=False):
+        """把待写队列在一个事务中交给数据库线程；wait=True 时等待写入完成（退出时使用）"""
+        self._timer.stop()
+        if not self._pending:
+            return None
+        batch = self._pending
+        self._pending = {}
+        self._inflight.update(batch)
+        for record_id, text in batch.items():
+            self._saved[record_id] = note_hash(text)
+        future = self.executor.call('update_notes', list(batch.items()),
+                                    on_done=lambda _: self._on_written(batch),
+                                    on_error=lambda e: self._on_failed(batch, e))
+        self.flushes += 1
+        if wait:
+            future.result()
+        return future
+
+    def _on_written(self, batch):
+        self._failures = 0
+        for record_id, text in batch.items():
+            if self._inflight.get(record_id) is text:
+                del self._inflight[record_id]
+
+    def _on_failed(self, batch, error):
+        # 没有被更新的编辑覆盖的内容重新排队
+        for record_id, text in batch.items():
+            if self._inflight.get(record_id) is text:
+                del self._inflight[record_id]
+                self._saved.pop(record_id, None)
+                self._pending.setdefault(record_id, text)
+        self._failures += 1
+        if self._failures <= self.MAX_RETRIES:
+            if self._pending:
+                self._timer.start()
+        elif self._failures == self.MAX_RETRIES + 1:
+            # 只提示一次；之后由切换条目、失去焦点等显式的 flush 继续尝试
+            self.save_failed.emit(str(error))
@@ -0,0 +1,100 @@
+import json
+import os
+import string
+from collections import namedtuple
+
+# 生成随机密码使用的字符类别
+CHARACTER_CLASSES = (
+    ('lowercase', string.ascii_lowercase),
+    ('uppercase', string.ascii_uppercase),
+    ('digits', string.digits),
+    ('symbols', '!@#$%^&*-_=+?'),
+)
+# 保存密码策略的设置键
+SETTING_KEY = 'password_policy'
+# 每个密码的预估可用字节数不足时，下一次补充抽取的最少字节数
+MIN_REFILL = 256
+
+
+class PasswordPolicy(namedtuple('PasswordPolicy', 'length lowercase uppercase digits symbols exclude')):
+    """随机密码策略：长度、启用的字符类别（每个启用的类别至少出现一次）、排除的字符（如易混淆的 O0Il1）"""
+    __slots__ = ()
+
+    def classes(self):
+        """启用的字符类别，已去掉排除的字符"""
+        return [''.join(c for c in chars if c not in self.exclude)
+                for name, chars in CHARACTER_CLASSES if getattr(self, name)]
+
+    def alphabet(self):
+        return ''.join(self.classes())
+
+    def validate(self):
+        classes = self.classes()
+        if not classes:
+            raise ValueError("至少需要启用一种字符类别")
+        if not all(classes):
+            raise ValueError("排除字符后，某个已启用的字符类别为空")
+        if self.length < len(classes):
+            raise ValueError(f"密码长度至少为 {len(classes)}，才能包含每种已启用的字符")
+        return self
+
+    def to_json(self):
+        return json.dumps(self._asdict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        """读取保存的策略，缺失或损坏时返回默认策略"""
+        try:
+            return cls(**{**DEFAULT_POLICY._asdict(), **json.loads(text)}).validate()
+        except (TypeError, ValueError):
+            return DEFAULT_POLICY
+
+
+DEFAULT_POLICY = PasswordPolicy(length=16, lowercase=True, uppercase=True, digits=True, symbols=True, exclude='')
+
+
+def generate_batch(policy, count, urandom=os.urandom):
+    """用 CSPRNG 一次性生成 count 个符合策略的密码。
+
+    随机字节整批从 os.urandom 抽取，用 bytes.translate 做拒绝采样：只接受小于 alphabet 长度整数倍的字节，
+    再按取模映射成字符，保证每个字符等概率（没有取模偏差）。不满足“每个类别至少一个”的密码整条丢弃重抽，
+    同样不引入偏差。抽取量按接受率预估，一般一次即可，不够时再补充。
+    """
+    policy.validate()
+    alphabet = policy.alphabet()
+    classes = [frozenset(chars) for chars in policy.classes()]
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    table = bytes(ord(alphabet[b % size]) if b < limit else 0 for b in range(256))
+    rejected = bytes(range(limit, 256))
+
+    passwords = []
+    pool = ''
+    # 预估：字节接受率 limit/256，再留 25% 余量给类别检查失败的密码
+    need = count * policy.length
+    while len(passwords) < count:
+        want = max(MIN_REFILL, int(need * 256 / limit * 1.25))
+        pool += urandom(want).translate(table, rejected).decode('ascii')
+        usable = len(pool) - len(pool) % policy.length
+        for start in range(0, usable, policy.length):
+            candidate = pool[start:start + policy.length]
+            if all(not chars.isdisjoint(candidate) for chars in classes):
+                passwords.append(candidate)
+                if len(passwords) == count:
+                    break
+        pool = pool[usable:]
+        need = (count - len(passwords)) * policy.length
+    return passwords
+
+
+def generate_password(policy=DEFAULT_POLICY):
+    return generate_batch(policy, 1)[0]
+
+
+def rotate_passwords(db, password_ids, policy):
+    """为 password_ids 中的记录生成新密码并在一个事务中写入，旧密码进入历史。在数据库线程中调用。
+
+    返回 (本次更换的批次号, 更换条数)。
+    """
+    password_ids = list(password_ids)
+    return db.rotate_passwords(zip(password_ids, generate_batch(policy, len(password_ids))))
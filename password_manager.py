@@ -1,16 +1,22 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QTableWidget, QTableWidgetItem, QPushButton, 
+                            QTableWidget, QTableWidgetItem, QTableView, QPushButton, 
                             QLabel, QLineEdit, QHeaderView, QMessageBox,
                             QComboBox, QDialog, QInputDialog, QListWidget, QTextEdit,
-                            QFileDialog, QMenu, QAction)
-from PyQt5.QtCore import Qt, QPoint
+                            QFileDialog, QMenu, QAction, QProgressDialog, QSpinBox,
+                            QCheckBox, QFormLayout, QDialogButtonBox)
+from PyQt5.QtCore import Qt, QPoint, QTimer, pyqtSignal
 from database import PasswordDatabase
-import random
-import string
-import json
+from db_worker import DatabaseExecutor
+from note_autosave import NoteWriteBehind
+from breach_worker import BreachScanWorker
+from password_model import PasswordTableModel, PasswordFilterProxyModel, SearchResultsModel
+import vault_io
+import autofill
+import vault_crypto
+import password_gen
+import breach_check
 import sys
 import os
-import winreg
 
 class AutoSaveTextEdit(QTextEdit):
     def __init__(self, save_callback):
@@ -86,10 +92,70 @@ class GroupManageDialog(QDialog):
         else:
             QMessageBox.warning(self, "无法删除", msg)
 
+class RotatePasswordsDialog(QDialog):
+    """批量更换密码：选择范围并设置密码策略。scopes 为 [(显示文本, 范围)]，范围由调用方解释"""
+    CLASS_LABELS = {'lowercase': "小写字母", 'uppercase': "大写字母", 'digits': "数字", 'symbols': "符号"}
+    
+    def __init__(self, scopes, policy, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("批量更换密码")
+        layout = QFormLayout(self)
+        
+        self.scope_combo = QComboBox()
+        for label, scope in scopes:
+            self.scope_combo.addItem(label, scope)
+        layout.addRow("范围:", self.scope_combo)
+        
+        self.length_spin = QSpinBox()
+        self.length_spin.setRange(4, 128)
+        self.length_spin.setValue(policy.length)
+        layout.addRow("长度:", self.length_spin)
+        
+        self.class_checks = {}
+        for name, _ in password_gen.CHARACTER_CLASSES:
+            check = QCheckBox(self.CLASS_LABELS[name])
+            check.setChecked(getattr(policy, name))
+            self.class_checks[name] = check
+            layout.addRow("", check)
+        
+        self.exclude_input = QLineEdit(policy.exclude)
+        self.exclude_input.setPlaceholderText("例如 O0Il1")
+        layout.addRow("排除字符:", self.exclude_input)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+    
+    def scope(self):
+        return self.scope_combo.currentData()
+    
+    def policy(self):
+        return password_gen.PasswordPolicy(
+            length=self.length_spin.value(),
+            exclude=self.exclude_input.text(),
+            **{name: check.isChecked() for name, check in self.class_checks.items()}
+        )
+
 class PasswordManagerWindow(QMainWindow):
+    # 自动填充输入后端切换后发出，参数为后端名称
+    input_backend_changed = pyqtSignal(str)
+    SEARCH_DEBOUNCE_MS = 80
+    FULLTEXT_LIMIT = 200
+    # 加密的密码在详情中显示固定长度的掩码，不为取长度而解密
+    ENCRYPTED_MASK_LENGTH = 8
+    
     def __init__(self):
         super().__init__()
         self.db = PasswordDatabase()
+        # 备注保存、导入导出等写操作在数据库线程中执行，不阻塞界面和快捷键菜单
+        self.db_executor = DatabaseExecutor(self.db, self)
+        self.db_executor.operation_failed.connect(self.on_database_error)
+        # 备注编辑先进入延迟写入队列，空闲、切换条目和退出时批量写入
+        self.note_autosave = NoteWriteBehind(self.db_executor, self)
+        self.note_autosave.save_failed.connect(self.on_note_save_failed)
+        # 泄露检测在独立线程中查找哈希文件，不占用数据库线程
+        self.breach_worker = BreachScanWorker(self)
         self.current_viewing_id = None
         self.init_ui()
         self.load_data()
@@ -108,7 +174,7 @@ class PasswordManagerWindow(QMainWindow):
                 font-size: 16px; 
                 color: #24292e;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #ffffff;
                 border: 1px solid #e1e4e8;
                 border-radius: 8px;
@@ -116,11 +182,11 @@ class PasswordManagerWindow(QMainWindow):
                 outline: none;
                 font-size: 16px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 12px;
                 border-bottom: 1px solid #eaecef;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #f1f8ff;
                 color: #0366d6;
             }
@@ -219,28 +285,48 @@ class PasswordManagerWindow(QMainWindow):
         right_layout.addWidget(QLabel("📝 备注 (点击外部自动保存):"))
         self.note_edit = AutoSaveTextEdit(self.save_current_note)
         self.note_edit.setPlaceholderText("在此输入备注信息...")
+        self.note_edit.textChanged.connect(self.on_note_changed)
         right_layout.addWidget(self.note_edit)
         
         # 修改表格设置，添加双击编辑功能
-        self.table = QTableWidget()
-        self.table.setColumnCount(2)
-        self.table.setHorizontalHeaderLabels(['分组', '名称'])
+        # 模型/视图：模型只保存 ID/分组/名称，代理模型负责搜索过滤
+        self.password_model = PasswordTableModel(self)
+        self.password_proxy = PasswordFilterProxyModel(self)
+        self.password_proxy.setSourceModel(self.password_model)
+        # 列表按需分页加载，滚动到底部时再读取下一页
+        self.password_model.set_source(self.db)
+        # 全文搜索结果按相关度单独显示，搜索时表格切换到这个模型
+        self.search_results = SearchResultsModel(self.password_model, self)
+        
+        self.table = QTableView()
+        self.table.setModel(self.password_proxy)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.cellClicked.connect(self.show_password_details)
-        self.table.cellDoubleClicked.connect(self.edit_password)  # 添加双击事件
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.clicked.connect(self.show_password_details)
+        self.table.doubleClicked.connect(self.edit_password)  # 添加双击事件
         
         # 搜索区域
         search_layout = QHBoxLayout()
         
+        # 搜索防抖：连续快速输入时只在停顿后过滤一次
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_passwords)
+        
         self.search_group_input = QLineEdit()
         self.search_group_input.setPlaceholderText('🔍 搜索分组...')
-        self.search_group_input.textChanged.connect(self.search_passwords)
+        self.search_group_input.textChanged.connect(self.search_timer.start)
         
         self.search_name_input = QLineEdit()
         self.search_name_input.setPlaceholderText('🔍 搜索名称...')
-        self.search_name_input.textChanged.connect(self.search_passwords)
+        self.search_name_input.textChanged.connect(self.search_timer.start)
+        
+        # 全文搜索：走数据库 FTS 索引，可搜到用户名和备注
+        self.search_all_input = QLineEdit()
+        self.search_all_input.setPlaceholderText('🔍 全文搜索(含备注)...')
+        self.search_all_input.textChanged.connect(self.search_timer.start)
         
         # 更多选项按钮（导出/导入）
         self.menu_btn = QPushButton("☰")
@@ -250,6 +336,7 @@ class PasswordManagerWindow(QMainWindow):
         
         search_layout.addWidget(self.search_group_input)
         search_layout.addWidget(self.search_name_input)
+        search_layout.addWidget(self.search_all_input)
         search_layout.addWidget(self.menu_btn)
         
         left_layout.addLayout(search_layout)
@@ -290,7 +377,7 @@ class PasswordManagerWindow(QMainWindow):
         # 随机密码生成按钮
         self.gen_pwd_btn = QPushButton("🎲")
         self.gen_pwd_btn.setFixedWidth(50)
-        self.gen_pwd_btn.setToolTip("生成8位随机复杂密码")
+        self.gen_pwd_btn.setToolTip("按密码策略生成随机密码（策略在批量更换密码中设置）")
         self.gen_pwd_btn.clicked.connect(self.generate_random_password)
         self.gen_pwd_btn.setStyleSheet("""
             QPushButton {
@@ -349,12 +436,74 @@ class PasswordManagerWindow(QMainWindow):
         startup_action.triggered.connect(self.toggle_startup)
         menu.addAction(startup_action)
         
+        # 数据库加密
+        if self.db.encryption_enabled():
+            encryption_action = QAction("🔒 已启用加密", self)
+            encryption_action.setEnabled(False)
+        else:
+            encryption_action = QAction("🔒 启用加密...", self)
+            encryption_action.setEnabled(vault_crypto.CRYPTO_AVAILABLE)
+            encryption_action.triggered.connect(self.enable_encryption)
+        menu.addAction(encryption_action)
+        
+        # 批量更换密码及撤销
+        rotate_action = QAction("🔁 批量更换密码...", self)
+        rotate_action.triggered.connect(self.rotate_passwords)
+        menu.addAction(rotate_action)
+        last = self.db.last_rotation()
+        # 最近一批是撤销时，再执行一次等于重新应用被撤销的更换
+        undo_rotation_action = QAction(
+            "↪️ 重新应用被撤销的批量更换" if last is not None and last[3] is not None else "↩️ 撤销上次批量更换", self)
+        undo_rotation_action.setEnabled(last is not None)
+        undo_rotation_action.triggered.connect(self.undo_rotation)
+        menu.addAction(undo_rotation_action)
+        purge_history_action = QAction("🧹 清除密码历史...", self)
+        purge_history_action.setEnabled(last is not None)
+        purge_history_action.triggered.connect(self.purge_password_history)
+        menu.addAction(purge_history_action)
+        
+        # 离线泄露检测
+        breach_menu = menu.addMenu("🛡️ 泄露检测")
+        breach_menu.addAction("检查全部密码", self.check_breaches)
+        breach_menu.addAction("选择哈希文件...", self.choose_breach_file)
+        
+        # 自动填充输入方式
+        backend_menu = menu.addMenu("⌨️ 输入方式")
+        current_backend = self.db.get_setting(autofill.SETTING_KEY, autofill.DEFAULT_BACKEND)
+        for name in autofill.SELECTABLE_BACKENDS:
+            backend_action = backend_menu.addAction(autofill.BACKENDS[name].label)
+            backend_action.setCheckable(True)
+            backend_action.setChecked(name == current_backend)
+            backend_action.triggered.connect(lambda checked, n=name: self.set_input_backend(n))
+        
         # 在按钮位置显示菜单
         menu.exec_(self.menu_btn.mapToGlobal(QPoint(0, self.menu_btn.height())))
     
+    def enable_encryption(self):
+        passphrase, ok = QInputDialog.getText(self, "启用加密", "设置主密码:", QLineEdit.Password)
+        if not ok or not passphrase:
+            return
+        confirm, ok = QInputDialog.getText(self, "启用加密", "再次输入主密码:", QLineEdit.Password)
+        if not ok:
+            return
+        if confirm != passphrase:
+            QMessageBox.warning(self, "启用加密", "两次输入的主密码不一致！")
+            return
+        try:
+            count = self.db.enable_encryption(passphrase)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"启用加密失败: {str(e)}")
+            return
+        QMessageBox.information(self, "启用加密", f"已加密 {count} 条密码。\n请牢记主密码，遗失后无法恢复！")
+    
+    def set_input_backend(self, name):
+        self.db.set_setting(autofill.SETTING_KEY, name)
+        self.input_backend_changed.emit(name)
+    
     def is_startup_enabled(self):
         """检查是否已设置开机自启动"""
         try:
+            import winreg
             key = winreg.OpenKey(
                 winreg.HKEY_CURRENT_USER,
                 r"Software\Microsoft\Windows\CurrentVersion\Run",
@@ -371,6 +520,7 @@ class PasswordManagerWindow(QMainWindow):
     def toggle_startup(self):
         """切换开机自启动状态"""
         try:
+            import winreg
             key = winreg.OpenKey(
                 winreg.HKEY_CURRENT_USER,
                 r"Software\Microsoft\Windows\CurrentVersion\Run",
@@ -390,6 +540,8 @@ class PasswordManagerWindow(QMainWindow):
                     startup_cmd = f'"{python_path}" "{app_path}"'
                 else:
                     startup_cmd = f'"{app_path}"'
+                # 开机时只启动托盘和快捷键，主界面在第一次打开时才创建
+                startup_cmd += ' --tray'
                     
                 winreg.SetValueEx(key, "SuperEasyPass", 0, winreg.REG_SZ, startup_cmd)
                 QMessageBox.information(self, "开机自启动", "已设置开机自启动")
@@ -398,80 +550,261 @@ class PasswordManagerWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "错误", f"设置失败: {str(e)}")
 
+    def _make_progress_dialog(self, title):
+        """创建导入/导出用的进度对话框，返回 (对话框, 进度回调)"""
+        dialog = QProgressDialog(title, None, 0, 1000, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(300)
+        
+        def on_progress(done, total):
+            dialog.setValue(int(done * 1000 / total) if total else 1000)
+        
+        return dialog, on_progress
+
     def export_data(self):
         file_path, _ = QFileDialog.getSaveFileName(self, "导出密码数据", "", "JSON Files (*.json)")
         if not file_path:
             return
             
-        try:
-            passwords = self.db.get_all_passwords()
-            export_list = []
-            for id, name, username, password, group_name, note in passwords:
-                export_list.append({
-                    "group": group_name,
-                    "name": name,
-                    "username": username,
-                    "password": password,
-                    "note": note
-                })
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(export_list, f, indent=4, ensure_ascii=False)
-                
-            QMessageBox.information(self, "导出成功", f"成功导出 {len(export_list)} 条记录！")
-        except Exception as e:
+        dialog, on_progress = self._make_progress_dialog("正在导出...")
+        
+        def on_done(count):
+            dialog.close()
+            QMessageBox.information(self, "导出成功", f"成功导出 {count} 条记录！")
+        
+        def on_error(e):
+            dialog.close()
             QMessageBox.critical(self, "导出失败", str(e))
+        
+        # 边读游标边写文件，大库导出时内存占用保持恒定；在数据库线程中执行，界面保持响应
+        self.db_executor.submit(vault_io.export_json, file_path,
+                                on_done=on_done, on_error=on_error, progress=on_progress)
 
     def import_data(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "导入密码数据", "", "JSON Files (*.json)")
         if not file_path:
             return
             
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list):
-                raise ValueError("JSON格式错误：根元素必须是列表")
-            
-            added_count = 0
-            updated_count = 0
-            
-            for item in data:
-                # 简单验证必要字段
-                if not all(k in item for k in ("group", "name", "username", "password")):
-                    continue
-                
-                group = item.get("group", "未分组")
-                name = item.get("name")
-                username = item.get("username")
-                password = item.get("password")
-                note = item.get("note", "")
-                
-                # 确保分组存在
-                self.db.add_group(group)
-                
-                # 检查是否存在，存在则更新，不存在则添加
-                existing_id = self.db.get_password_id(group, name)
-                
-                if existing_id:
-                    self.db.update_password(existing_id, name, username, password, group, note)
-                    updated_count += 1
-                else:
-                    self.db.add_password(name, username, password, group, note)
-                    added_count += 1
-            
+        dialog, on_progress = self._make_progress_dialog("正在导入...")
+        
+        def on_done(counts):
+            dialog.close()
+            self.password_model.clear_breach_flags()
+            self.load_data()
+            added_count, updated_count, unchanged_count = counts
+            QMessageBox.information(self, "导入成功", f"导入完成！\n新增: {added_count}\n更新: {updated_count}\n未变化: {unchanged_count}")
+        
+        def on_error(e):
+            dialog.close()
             self.load_data()
-            QMessageBox.information(self, "导入成功", f"导入完成！\n新增: {added_count}\n更新: {updated_count}")
-            
-        except Exception as e:
             QMessageBox.critical(self, "导入失败", f"错误详情: {str(e)}")
+        
+        # 逐个元素解析，按批写入数据库；在数据库线程中执行，界面保持响应
+        self.db_executor.submit(vault_io.import_json, file_path,
+                                on_done=on_done, on_error=on_error, progress=on_progress)
 
+    def on_database_error(self, message):
+        """数据库线程中没有指定错误回调的请求失败时提示用户"""
+        QMessageBox.critical(self, "数据库操作失败", message)
+    
+    def password_policy(self):
+        return password_gen.PasswordPolicy.from_json(
+            self.db.get_setting(password_gen.SETTING_KEY, password_gen.DEFAULT_POLICY.to_json()))
+    
     def generate_random_password(self):
-        """生成8位复杂密码（字母+数字+符号）"""
-        chars = string.ascii_letters + string.digits + "!@#$%^&*"
-        pwd = ''.join(random.choice(chars) for _ in range(8))
-        self.password_input.setText(pwd)
+        """按保存的密码策略生成随机密码（CSPRNG）"""
+        self.password_input.setText(password_gen.generate_password(self.password_policy()))
+    
+    def rotation_scopes(self):
+        """批量更换可选的范围：选中的条目、当前筛选结果、全部、各分组"""
+        scopes = []
+        selected = [index.data(Qt.UserRole) for index in self.table.selectionModel().selectedRows()]
+        if selected:
+            scopes.append((f"选中的条目 ({len(selected)} 条)", ('ids', selected)))
+        # 有过滤条件时代理模型已载入全部记录（全文搜索时表格显示的是完整的结果列表），可见行就是完整的筛选结果
+        model = self.table.model()
+        if model.rowCount() and any(w.text().strip() for w in (
+                self.search_group_input, self.search_name_input, self.search_all_input)):
+            visible = [model.index(row, 0).data(Qt.UserRole) for row in range(model.rowCount())]
+            scopes.append((f"当前筛选结果 ({len(visible)} 条)", ('ids', visible)))
+        scopes.append((f"全部 ({self.db.count_passwords()} 条)", ('all', None)))
+        scopes.extend((f"分组: {group}", ('group', group)) for group in self.db.get_all_groups())
+        return scopes
+    
+    def rotate_passwords(self):
+        dialog = RotatePasswordsDialog(self.rotation_scopes(), self.password_policy(), self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        policy = dialog.policy()
+        try:
+            policy.validate()
+        except ValueError as e:
+            QMessageBox.warning(self, "批量更换密码", str(e))
+            return
+        kind, value = dialog.scope()
+        if kind == 'group':
+            password_ids = [row[0] for row in self.db.get_passwords_by_group(value)]
+        elif kind == 'all':
+            password_ids = [row[0] for row in self.db.list_entries()]
+        else:
+            password_ids = value
+        if not password_ids:
+            QMessageBox.information(self, "批量更换密码", "所选范围内没有记录。")
+            return
+        reply = QMessageBox.question(
+            self, "批量更换密码",
+            f"将为 {len(password_ids)} 条记录生成新密码。\n旧密码会保存在历史中，可通过“撤销上次批量更换”恢复。\n确定继续？",
+            QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        self.db.set_setting(password_gen.SETTING_KEY, policy.to_json())
+        
+        def on_done(result):
+            self.password_model.clear_breach_flags()
+            QMessageBox.information(self, "批量更换密码", f"已更换 {result[1]} 条密码。")
+            self.refresh_password_details()
+        
+        def on_error(e):
+            QMessageBox.critical(self, "批量更换密码失败", str(e))
+        
+        # 生成与写入都在数据库线程中完成，写入为一个事务
+        self.db_executor.submit(password_gen.rotate_passwords, password_ids, policy,
+                                on_done=on_done, on_error=on_error)
+    
+    def undo_rotation(self):
+        last = self.db.last_rotation()
+        if last is None:
+            return
+        rotation, changed_at, count, undoes = last
+        if undoes is None:
+            title = "撤销批量更换"
+            prompt = f"将 {changed_at} 更换的 {count} 条密码恢复为更换前的值，确定继续？"
+        else:
+            title = "重新应用批量更换"
+            prompt = f"{changed_at} 撤销了一次批量更换（{count} 条），将这些密码重新改为更换后的值，确定继续？"
+        reply = QMessageBox.question(
+            self, title, prompt + "\n之后又手动修改过的密码会保持不变。", QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        
+        def on_done(result):
+            _, restored, skipped = result
+            self.password_model.clear_breach_flags()
+            message = f"已恢复 {restored} 条密码。"
+            if skipped:
+                entries = [self.db.get_entry(password_id) for password_id in skipped]
+                names = [f"{entry[1]} / {entry[2]}" for entry in entries if entry is not None]
+                message += f"\n以下 {len(skipped)} 条在更换后又被修改过，已跳过：\n" + "\n".join(names[:20])
+                if len(names) > 20:
+                    message += f"\n……等 {len(names)} 条"
+            QMessageBox.information(self, title, message)
+            self.refresh_password_details()
+        
+        def on_error(e):
+            QMessageBox.critical(self, "撤销失败", str(e))
+        
+        self.db_executor.call('restore_rotation', rotation, on_done=on_done, on_error=on_error)
+    
+    def purge_password_history(self):
+        reply = QMessageBox.question(
+            self, "清除密码历史", "将删除全部批量更换前保存的旧密码，之后无法再撤销。确定继续？",
+            QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        
+        def on_done(purged):
+            QMessageBox.information(self, "清除密码历史", f"已删除 {purged} 条历史密码。")
+        
+        def on_error(e):
+            QMessageBox.critical(self, "清除失败", str(e))
+        
+        self.db_executor.call('purge_password_history', on_done=on_done, on_error=on_error)
+    
+    def choose_breach_file(self):
+        """选择本地 Pwned Passwords 哈希文件（SHA-1、按哈希排序），返回路径；取消时返回 None"""
+        current = self.db.get_setting(breach_check.SETTING_KEY, '')
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择 Pwned Passwords 哈希文件 (SHA-1，按哈希排序)", os.path.dirname(current),
+            "Text Files (*.txt);;All Files (*)")
+        if not file_path:
+            return None
+        self.db.set_setting(breach_check.SETTING_KEY, file_path)
+        return file_path
+    
+    def check_breaches(self):
+        """先在数据库线程中读取并计算全部密码的哈希，再在后台线程中逐个查找哈希文件"""
+        if self.breach_worker.is_running():
+            return
+        hash_path = self.db.get_setting(breach_check.SETTING_KEY)
+        if not hash_path or not os.path.exists(hash_path):
+            hash_path = self.choose_breach_file()
+            if hash_path is None:
+                return
+        
+        dialog = QProgressDialog("正在读取密码...", "取消", 0, 1000, self)
+        dialog.setWindowTitle("泄露检测")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(300)
+        
+        def on_progress(done, total):
+            dialog.setValue(int(done * 1000 / total) if total else 1000)
+        
+        def disconnect():
+            for signal in (worker.scan_progress, worker.scan_finished, worker.scan_failed, worker.scan_cancelled):
+                signal.disconnect()
+        
+        def on_finished(flagged):
+            disconnect()
+            dialog.close()
+            # 检测期间被编辑或批量更换的记录，结果针对的是旧密码，不再标记
+            flagged = self.password_model.finish_breach_scan(flagged)
+            if flagged:
+                QMessageBox.warning(self, "泄露检测",
+                                    f"有 {len(flagged)} 条记录的密码出现在已知泄露数据中，已在列表中标红，请尽快更换。")
+            else:
+                QMessageBox.information(self, "泄露检测", "未发现泄露的密码。")
+        
+        def on_failed(message):
+            disconnect()
+            dialog.close()
+            self.password_model.finish_breach_scan()
+            QMessageBox.critical(self, "泄露检测失败", message)
+        
+        def on_cancelled():
+            disconnect()
+            dialog.close()
+            self.password_model.finish_breach_scan()
+        
+        def on_hashes(hashes):
+            if dialog.wasCanceled():
+                self.password_model.finish_breach_scan()
+                return
+            dialog.setLabelText("正在查找泄露数据...")
+            dialog.setValue(0)
+            worker.scan_progress.connect(on_progress)
+            worker.scan_finished.connect(on_finished)
+            worker.scan_failed.connect(on_failed)
+            worker.scan_cancelled.connect(on_cancelled)
+            dialog.canceled.connect(worker.cancel)
+            worker.start(hash_path, hashes)
+        
+        def on_error(e):
+            dialog.close()
+            self.password_model.finish_breach_scan()
+            QMessageBox.critical(self, "泄露检测失败", str(e))
+        
+        worker = self.breach_worker
+        # 从提交读取任务起记录被修改的密码：排在读取之前执行的修改也算在内，宁可少标记也不误标
+        self.password_model.begin_breach_scan()
+        # 解密和计算哈希在数据库线程中完成，明文不离开该线程
+        self.db_executor.submit(breach_check.collect_hashes, on_done=on_hashes, on_error=on_error, progress=on_progress)
+    
+    def refresh_password_details(self):
+        """密码被批量修改后，刷新右侧详情中的掩码"""
+        index = self.table.currentIndex()
+        if self.current_viewing_id is not None and index.isValid():
+            self.show_password_details(index)
 
 
     def load_groups(self):
@@ -494,70 +827,109 @@ class PasswordManagerWindow(QMainWindow):
         self.load_groups()
 
     def load_passwords(self):
-        passwords = self.db.get_all_passwords()
-        self.table.setRowCount(len(passwords))
-        
-        for row, (id, name, username, password, group_name, note) in enumerate(passwords):
-            group_item = QTableWidgetItem(group_name)
-            group_item.setData(Qt.UserRole, id)
-            name_item = QTableWidgetItem(name)
-            name_item.setData(Qt.UserRole, id)
-            
-            self.table.setItem(row, 0, group_item)
-            self.table.setItem(row, 1, name_item)
+        # 列表只需要 ID、分组和名称；只重新读取已载入的范围，与旧数据比对后只通知变化的行
+        self.password_model.refresh()
             
         # 重新应用当前的搜索过滤
         self.search_passwords()
             
     def search_passwords(self):
-        group_filter = self.search_group_input.text().lower()
-        name_filter = self.search_name_input.text().lower()
-        
-        for row in range(self.table.rowCount()):
-            group_item = self.table.item(row, 0)
-            name_item = self.table.item(row, 1)
-            
-            if group_item and name_item:
-                group_text = group_item.text().lower()
-                name_text = name_item.text().lower()
-                
-                show_row = True
-                if group_filter and group_filter not in group_text:
-                    show_row = False
-                if name_filter and name_filter not in name_text:
-                    show_row = False
-                    
-                self.table.setRowHidden(row, not show_row)
+        self.search_timer.stop()
+        group_filter, name_filter = self.search_group_input.text(), self.search_name_input.text()
+        fulltext = self.search_all_input.text().strip()
+        if not fulltext:
+            self.password_proxy.set_filters(group_filter, name_filter)
+            self.show_table_model(self.password_proxy)
+            return
+        # 全文搜索只取相关度最高的若干条，按相关度顺序显示，不载入主列表的其它分页；
+        # 分组/名称关键字在这些结果中继续筛选
+        group_filter, name_filter = group_filter.lower(), name_filter.lower()
+        current_id = self.table.currentIndex().data(Qt.UserRole)
+        self.search_results.set_results(
+            (record_id, group_name, name) for record_id, name, group_name in self.db.search(fulltext, self.FULLTEXT_LIMIT)
+            if group_filter in (group_name or '').lower() and name_filter in name.lower())
+        self.show_table_model(self.search_results)
+        self.select_source_row(None, current_id)
+    
+    def show_table_model(self, model):
+        """在主列表（代理模型）和全文搜索结果之间切换表格的模型"""
+        if self.table.model() is not model:
+            selection_model = self.table.selectionModel()
+            self.table.setModel(model)
+            # setModel 不会释放旧的选择模型
+            selection_model.deleteLater()
+    
+    def select_source_row(self, row, record_id=None):
+        """选中模型中的某一行（被过滤隐藏时忽略）；显示全文搜索结果时按记录ID在结果中查找"""
+        if self.table.model() is self.search_results:
+            row = self.search_results.row_of(record_id)
+            if row is not None:
+                self.table.setCurrentIndex(self.search_results.index(row, 0))
+            return
+        if row is None:
+            return
+        index = self.password_proxy.mapFromSource(self.password_model.index(row, 0))
+        if index.isValid():
+            self.table.setCurrentIndex(index)
+    
+    def refresh_fulltext_results(self):
+        """全文搜索结果是独立的列表，单行增删改后需要重新查询；未使用全文搜索时无需处理"""
+        if self.search_all_input.text().strip():
+            self.search_passwords()
     
-    def show_password_details(self, row, column):
-        item = self.table.item(row, 0)
-        if item:
-            password_id = item.data(Qt.UserRole)
+    def show_password_details(self, index):
+        password_id = index.data(Qt.UserRole)
+        if password_id is not None:
+            # 切换条目前先把上一条的备注交给数据库线程
+            self.note_autosave.flush()
             self.current_viewing_id = password_id # 记录当前查看的ID
-            password_data = self.db.get_password_by_id(password_id)
+            # 详情只显示掩码，不需要解密密码
+            password_data = self.db.get_password_by_id(password_id, decrypt=False)
             if password_data:
                 # 只设置一列的值
+                password = password_data[3]
+                mask = '*' * (self.ENCRYPTED_MASK_LENGTH if self.db.encryption_enabled() else len(password))
                 self.detail_table.setItem(0, 0, QTableWidgetItem(password_data[2]))
-                self.detail_table.setItem(1, 0, QTableWidgetItem('*' * len(password_data[3])))
-                # 加载备注
-                self.note_edit.setPlainText(password_data[5])
+                self.detail_table.setItem(1, 0, QTableWidgetItem(mask))
+                # 加载备注（尚未写入数据库的修改优先）
+                note = self.note_autosave.pending_text(password_id)
+                if note is None:
+                    note = password_data[5]
+                    self.note_autosave.loaded(password_id, note)
+                self.note_edit.setPlainText(note)
     
-    def save_current_note(self):
+    def on_note_changed(self):
         if self.current_viewing_id:
-            content = self.note_edit.toPlainText()
-            self.db.update_note(self.current_viewing_id, content)
+            self.note_autosave.note_changed(self.current_viewing_id, self.note_edit.toPlainText())
+    
+    def save_current_note(self):
+        # 失去焦点时立即写入（内容没有变化时什么也不做）
+        self.note_autosave.flush()
+    
+    def on_note_save_failed(self, message):
+        QMessageBox.warning(self, "保存备注失败",
+                            f"备注多次保存失败，修改仍保留在编辑器中，切换条目时会再次尝试。\n错误详情: {message}")
+    
+    def shutdown(self):
+        """退出前写完待保存的备注，并等待数据库线程处理完所有请求"""
+        self.breach_worker.stop()
+        try:
+            self.note_autosave.flush(wait=True)
+        except Exception as e:
+            # 在 aboutToQuit 槽中抛出的异常会让 PyQt 直接中止进程，数据库线程也来不及关闭
+            QMessageBox.critical(self, "保存备注失败", f"退出前未能保存备注: {e}")
+        self.db_executor.shutdown()
             
-    def edit_password(self, row, column):
-        item = self.table.item(row, 0)
-        if item:
-            password_id = item.data(Qt.UserRole)
+    def edit_password(self, index):
+        password_id = index.data(Qt.UserRole)
+        if password_id is not None:
             password_data = self.db.get_password_by_id(password_id)
             if password_data:
                 # 设置下拉框选中项
                 group_name = password_data[4]
-                index = self.group_combo.findText(group_name)
-                if index >= 0:
-                    self.group_combo.setCurrentIndex(index)
+                combo_index = self.group_combo.findText(group_name)
+                if combo_index >= 0:
+                    self.group_combo.setCurrentIndex(combo_index)
                 
                 self.name_input.setText(password_data[1])
                 self.username_input.setText(password_data[2])
@@ -580,19 +952,27 @@ class PasswordManagerWindow(QMainWindow):
                 QMessageBox.warning(self, '警告', f'分组"{group_name}"下已存在名称为"{name}"的记录！')
                 return
             
-            # 为了防止覆盖备注，需要先获取原有的备注
-            old_data = self.db.get_password_by_id(self.editing_id)
-            existing_note = old_data[5] if old_data else ''
+            # 为了防止覆盖备注，需要先获取原有的备注（包括尚未写入的修改）
+            existing_note = self.note_autosave.pending_text(self.editing_id)
+            if existing_note is None:
+                existing_note = self.db.get_note(self.editing_id) or ''
             
-            self.db.update_password(self.editing_id, name, username, password, group_name, existing_note)
+            old_entry = self.db.get_entry(self.editing_id)
+            entry = self.db.update_password(self.editing_id, name, username, password, group_name, existing_note)
+            # 密码可能已修改，之前的泄露检测结果不再适用
+            self.password_model.clear_breach_flags([self.editing_id])
             delattr(self, 'editing_id')
+            if old_entry and entry:
+                # 只把这一行移动到新的排序位置，并保持选中
+                row = self.password_model.replace_record(old_entry, entry)
+                self.refresh_fulltext_results()
+                self.select_source_row(row, entry[0])
         else:
             if self.db.check_name_exists(name, group_name):
                 QMessageBox.warning(self, '警告', f'分组"{group_name}"下已存在名称为"{name}"的记录！')
                 return
-            self.db.add_password(name, username, password, group_name)
-        
-        self.load_passwords()
+            self.password_model.insert_record(self.db.add_password(name, username, password, group_name))
+            self.refresh_fulltext_results()
         
         # 清空输入框，但保留分组选择以便连续添加
         self.name_input.clear()
@@ -600,18 +980,20 @@ class PasswordManagerWindow(QMainWindow):
         self.password_input.clear()
     
     def delete_password(self):
-        selected_rows = self.table.selectedItems()
+        selected_rows = self.table.selectionModel().selectedRows()
         if not selected_rows:
             QMessageBox.warning(self, '警告', '请先选择要删除的项！')
             return
         
-        row = selected_rows[0].row()
-        item = self.table.item(row, 0)
-        if item:
-            password_id = item.data(Qt.UserRole)
-            self.db.delete_password(password_id)
-            self.load_passwords()
-            # 清空预览区
+        password_id = selected_rows[0].data(Qt.UserRole)
+        if password_id is not None:
+            self.note_autosave.forget(password_id)
+            self.password_model.clear_breach_flags([password_id])
+            entry = self.db.delete_password(password_id)
+            if entry:
+                self.password_model.remove_record(entry)
+                self.refresh_fulltext_results()
+            # 清空预览区（先解除当前条目，清空备注框不应被当作对它的编辑）
+            self.current_viewing_id = None
             self.detail_table.clearContents()
-            self.note_edit.clear()
-            self.current_viewing_id = None
\ No newline at end of file
+            self.note_edit.clear()
\ No newline at end of file
@@ -0,0 +1,534 @@
+import bisect
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+from search_index import SearchIndex
+
+
+def _sort_key(group_name, name):
+    """行的排序键，与 list_entries 的 ORDER BY group_name, name 一致（NULL 分组已由迁移改为“未分组”）"""
+    return (group_name, name)
+
+
+class PasswordTableModel(QAbstractTableModel):
+    """主界面密码列表的数据模型。
+    
+    只保存列表需要的 ID、分组、名称三列（并行列表，按 分组+名称 排序），
+    不持有用户名、密码和备注。重新加载时与旧数据做有序归并比对，
+    只对真正变化的连续区段发出 rowsInserted/rowsRemoved，视图只需刷新可见行。
+    
+    通过 set_source 指定数据源后按需分页加载：先载入第一页，视图滚动到底部时经
+    canFetchMore/fetchMore 按 (分组, 名称) keyset 读取下一页，大库打开时不会一次读完。
+    """
+    HEADERS = ('分组', '名称')
+    # 变化超过这个比例时直接整体重置，比逐段发信号更快
+    RESET_RATIO = 0.5
+    # 按需加载时每页的行数
+    PAGE_SIZE = 1000
+    # 密码出现在泄露数据中的行的背景色
+    BREACHED_BACKGROUND = QColor('#ffdce0')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = []
+        self._groups = []
+        self._names = []
+        # 数据源（提供 list_entries_page/list_entries 的 PasswordDatabase）；None 时只由 set_records 填充
+        self._source = None
+        self._exhausted = True
+        # 正在追加一页：视图会在 rowsInserted 的处理中再次调用 fetchMore，需避免嵌套插入
+        self._fetching = False
+        # 泄露检测结果：记录ID -> 泄露次数。按ID保存，与分页和行号变化无关
+        self._breached = {}
+        # 检测进行中时，读取密码之后又被修改的记录ID（True 表示全部），检测结果中这些记录作废；None 表示没有检测在进行
+        self._modified_during_scan = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self._groups[row] if index.column() == 0 else self._names[row]
+        if role == Qt.UserRole:
+            return self._ids[row]
+        return self.breach_data(self._ids[row], role)
+
+    def breach_data(self, record_id, role):
+        """泄露标记对应的背景色和提示，未标记或其它角色返回 None"""
+        if record_id not in self._breached:
+            return None
+        if role == Qt.BackgroundRole:
+            return self.BREACHED_BACKGROUND
+        if role == Qt.ToolTipRole:
+            return f"该密码在已知泄露数据中出现过 {self._breached[record_id]} 次，请尽快更换"
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    @property
+    def ids(self):
+        """记录ID列（只读，按行顺序）"""
+        return self._ids
+
+    @property
+    def groups(self):
+        """分组列（只读，按行顺序）"""
+        return self._groups
+
+    @property
+    def names(self):
+        """名称列（只读，按行顺序）"""
+        return self._names
+
+    def record_id(self, row):
+        return self._ids[row]
+
+    def group_at(self, row):
+        return self._groups[row]
+
+    def name_at(self, row):
+        return self._names[row]
+
+    # ---- 按需加载 ----
+
+    def set_source(self, source):
+        """切换到分页加载模式并载入第一页"""
+        self._source = source
+        self._exhausted = False
+        self._reset([], [], [])
+        self.fetchMore()
+
+    def _last_key(self):
+        return (self._groups[-1], self._names[-1]) if self._ids else None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._fetching:
+            return
+        self._append_page(self._source.list_entries_page(self._last_key(), self.PAGE_SIZE), self.PAGE_SIZE)
+
+    def fetch_all(self):
+        """载入剩余的全部记录（过滤和全文搜索需要完整的数据）"""
+        if not self._exhausted:
+            self._append_page(self._source.list_entries_page(self._last_key(), None), None)
+
+    def _append_page(self, page, limit):
+        if limit is None or len(page) < limit:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._ids)
+        self._fetching = True
+        try:
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            for record_id, group_name, name in page:
+                self._ids.append(record_id)
+                self._groups.append(group_name)
+                self._names.append(name)
+            self.endInsertRows()
+        finally:
+            self._fetching = False
+
+    def refresh(self):
+        """从数据源重新读取已载入的范围并与当前内容比对；已全部载入时读取全部记录"""
+        if self._exhausted:
+            self.set_records(self._source.list_entries())
+            return
+        last_key = self._last_key()
+        self.set_records(self._source.list_entries(until=last_key) if last_key is not None else ())
+        if not self._ids:
+            self.fetchMore()
+
+    # ---- 泄露标记 ----
+
+    def set_breach_flags(self, flags):
+        """用泄露检测结果 {记录ID: 泄露次数} 替换当前标记"""
+        self._breached = dict(flags)
+        self._breach_flags_changed()
+
+    def begin_breach_scan(self):
+        """泄露检测开始读取密码前调用，之后 clear_breach_flags 涉及的记录会从本次结果中去掉"""
+        self._modified_during_scan = set()
+
+    def finish_breach_scan(self, flags=None):
+        """结束泄露检测。flags 为检测结果时，去掉检测期间被修改过的记录后替换当前标记，返回实际采用的结果"""
+        modified, self._modified_during_scan = self._modified_during_scan, None
+        if flags is None:
+            return {}
+        if modified is True:
+            flags = {}
+        elif modified:
+            flags = {record_id: count for record_id, count in flags.items() if record_id not in modified}
+        self.set_breach_flags(flags)
+        return flags
+
+    def clear_breach_flags(self, record_ids=None):
+        """清除指定记录（None 为全部）的标记，用于密码被修改之后"""
+        if self._modified_during_scan is not None:
+            if record_ids is None:
+                self._modified_during_scan = True
+            elif self._modified_during_scan is not True:
+                record_ids = list(record_ids)
+                self._modified_during_scan.update(record_ids)
+        if record_ids is None:
+            changed = bool(self._breached)
+            self._breached = {}
+        else:
+            removed = [self._breached.pop(record_id) for record_id in record_ids if record_id in self._breached]
+            changed = bool(removed)
+        if changed:
+            self._breach_flags_changed()
+
+    def breach_count(self, record_id):
+        return self._breached.get(record_id, 0)
+
+    def _breach_flags_changed(self):
+        if self._ids:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._ids) - 1, len(self.HEADERS) - 1),
+                                  [Qt.BackgroundRole, Qt.ToolTipRole])
+
+    # ---- 单行更新 ----
+
+    def _lower_bound(self, group_name, name):
+        """二分查找 (分组, 名称) 的插入位置"""
+        groups, names = self._groups, self._names
+        key = _sort_key(group_name, name)
+        lo, hi = 0, len(self._ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _sort_key(groups[mid], names[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def row_of(self, record):
+        """(id, 分组, 名称) 所在的行号，不在模型中时返回 None"""
+        record_id, group_name, name = record
+        row = self._lower_bound(group_name, name)
+        if row < len(self._ids) and self._ids[row] == record_id:
+            return row
+        return None
+
+    def insert_record(self, record):
+        """在排序位置插入一条记录，返回行号；位于尚未载入的分页范围时不插入，返回 None"""
+        record_id, group_name, name = record
+        if not self._exhausted and (not self._ids or _sort_key(group_name, name) > _sort_key(*self._last_key())):
+            return None
+        row = self._lower_bound(group_name, name)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ids.insert(row, record_id)
+        self._groups.insert(row, group_name)
+        self._names.insert(row, name)
+        self.endInsertRows()
+        return row
+
+    def remove_record(self, record):
+        """删除一条记录，返回原行号；不在模型中时返回 None"""
+        row = self.row_of(record)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._ids[row], self._groups[row], self._names[row]
+            self.endRemoveRows()
+        return row
+
+    def replace_record(self, old_record, record):
+        """记录改名或换分组后移到新的排序位置，返回新行号；排序键未变时不做任何改动"""
+        if old_record[1:] == record[1:]:
+            return self.row_of(record)
+        self.remove_record(old_record)
+        return self.insert_record(record)
+
+    def set_records(self, records):
+        """用新的 (id, 分组, 名称) 列表替换当前内容，records 需已按 分组+名称 排序"""
+        new_ids, new_groups, new_names = [], [], []
+        for record_id, group_name, name in records:
+            new_ids.append(record_id)
+            new_groups.append(group_name)
+            new_names.append(name)
+
+        if new_ids == self._ids and new_groups == self._groups and new_names == self._names:
+            return
+        old_count = len(self._ids)
+        if not old_count or not new_ids:
+            self._reset(new_ids, new_groups, new_names)
+            return
+
+        ops = self._diff(new_ids, new_groups, new_names)
+        changed = sum(count for _, _, count, _ in ops)
+        if changed > max(old_count, len(new_ids)) * self.RESET_RATIO:
+            self._reset(new_ids, new_groups, new_names)
+            return
+
+        # 行号已按先前操作折算过，按顺序逐段应用即可
+        for kind, row, count, new_start in ops:
+            end = row + count
+            if kind == 'remove':
+                self.beginRemoveRows(QModelIndex(), row, end - 1)
+                del self._ids[row:end], self._groups[row:end], self._names[row:end]
+                self.endRemoveRows()
+            else:
+                src = slice(new_start, new_start + count)
+                self.beginInsertRows(QModelIndex(), row, end - 1)
+                self._ids[row:row] = new_ids[src]
+                self._groups[row:row] = new_groups[src]
+                self._names[row:row] = new_names[src]
+                self.endInsertRows()
+
+    def _reset(self, ids, groups, names):
+        self.beginResetModel()
+        self._ids, self._groups, self._names = ids, groups, names
+        self.endResetModel()
+
+    def _diff(self, new_ids, new_groups, new_names):
+        """对新旧两个有序列表做归并，返回连续区段操作列表 (类型, 行号, 行数, 新列表起点)。
+        
+        行号是应用此前所有操作之后的位置；类型为 'remove' 或 'insert'。
+        """
+        ops = []
+        old_keys = [(*_sort_key(g, n), i) for g, n, i in zip(self._groups, self._names, self._ids)]
+        new_keys = [(*_sort_key(g, n), i) for g, n, i in zip(new_groups, new_names, new_ids)]
+        old_len, new_len = len(old_keys), len(new_keys)
+        i = j = row = 0
+        while i < old_len or j < new_len:
+            if j >= new_len or (i < old_len and old_keys[i] < new_keys[j]):
+                start = i
+                while i < old_len and (j >= new_len or old_keys[i] < new_keys[j]):
+                    i += 1
+                ops.append(('remove', row, i - start, None))
+            elif i >= old_len or new_keys[j] < old_keys[i]:
+                start = j
+                while j < new_len and (i >= old_len or new_keys[j] < old_keys[i]):
+                    j += 1
+                ops.append(('insert', row, j - start, start))
+                row += j - start
+            else:
+                i += 1
+                j += 1
+                row += 1
+        return ops
+
+
+class SearchResultsModel(QAbstractTableModel):
+    """全文搜索结果：按 bm25 相关度排列的 (id, 分组, 名称)，只包含 db.search 返回的那几百条。
+    
+    与主列表模型分开，不受其排序和分页影响；表头和泄露标记沿用 PasswordTableModel。
+    """
+
+    def __init__(self, table_model, parent=None):
+        super().__init__(parent)
+        self._table_model = table_model
+        self._records = []
+        # 泄露标记变化时主列表模型会发出 dataChanged，结果列表跟着刷新背景色
+        table_model.dataChanged.connect(self._on_table_data_changed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(PasswordTableModel.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record_id, group_name, name = self._records[index.row()]
+        if role == Qt.DisplayRole:
+            return group_name if index.column() == 0 else name
+        if role == Qt.UserRole:
+            return record_id
+        return self._table_model.breach_data(record_id, role)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        return self._table_model.headerData(section, orientation, role)
+
+    def set_results(self, records):
+        """用 (id, 分组, 名称) 列表（按相关度排序）替换当前结果"""
+        self.beginResetModel()
+        self._records = list(records)
+        self.endResetModel()
+
+    def record_ids(self):
+        return [record[0] for record in self._records]
+
+    def row_of(self, record_id):
+        for row, record in enumerate(self._records):
+            if record[0] == record_id:
+                return row
+        return None
+
+    def _on_table_data_changed(self, top_left, bottom_right, roles=()):
+        if self._records and Qt.BackgroundRole in roles:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._records) - 1, self.columnCount() - 1), roles)
+
+
+class PasswordFilterProxyModel(QAbstractProxyModel):
+    """按 分组/名称 关键字过滤的代理模型（全文搜索结果由 SearchResultsModel 单独显示）。
+    
+    匹配结果由 SearchIndex 计算，代理只保存可见的源行号列表（升序），
+    过滤条件变化时整体重置一次，不会对每一行回调 Python 的 filterAcceptsRow。
+    源模型的行插入/删除会增量同步到索引和可见列表，保持视图的选中与滚动位置。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search_index = SearchIndex()
+        self._group_filter = ''
+        self._name_filter = ''
+        # None 表示没有过滤条件，所有源行都可见
+        self._rows = None
+        self._pending_removal = None
+
+    # ---- 过滤 ----
+
+    def set_filters(self, group_filter, name_filter):
+        """设置 分组/名称 关键字"""
+        if (group_filter, name_filter) == (self._group_filter, self._name_filter):
+            return
+        if group_filter or name_filter:
+            # 源模型分页加载时，过滤前先载入剩余记录，否则未加载的行永远搜不到
+            self.sourceModel().fetch_all()
+        self._group_filter, self._name_filter = group_filter, name_filter
+        self.beginResetModel()
+        self._rows = self._search()
+        self.endResetModel()
+
+    def _search(self):
+        return self.search_index.search(self._group_filter, self._name_filter)
+
+    def _accepts(self, row):
+        return self.search_index.matches(row, self._group_filter, self._name_filter)
+
+    def _refilter(self):
+        self.search_index.rebuild(self.sourceModel().groups, self.sourceModel().names)
+        self._rows = self._search()
+
+    # ---- 源模型 ----
+
+    def setSourceModel(self, model):
+        old = self.sourceModel()
+        if old is not None:
+            for signal, slot in self._source_connections(old):
+                signal.disconnect(slot)
+        self.beginResetModel()
+        super().setSourceModel(model)
+        for signal, slot in self._source_connections(model):
+            signal.connect(slot)
+        self._refilter()
+        self.endResetModel()
+
+    def _source_connections(self, model):
+        return ((model.modelAboutToBeReset, self.beginResetModel),
+                (model.modelReset, self._on_source_reset),
+                (model.rowsAboutToBeInserted, self._on_rows_about_to_be_inserted),
+                (model.rowsInserted, self._on_rows_inserted),
+                (model.rowsAboutToBeRemoved, self._on_rows_about_to_be_removed),
+                (model.rowsRemoved, self._on_rows_removed),
+                (model.dataChanged, self._on_data_changed))
+
+    def _on_source_reset(self):
+        self._refilter()
+        self.endResetModel()
+
+    def _on_rows_about_to_be_inserted(self, parent, first, last):
+        # 无过滤时与源模型一一对应，直接转发；有过滤时要等插入完成后才知道哪些行可见
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(self, parent, first, last):
+        model = self.sourceModel()
+        count = last - first + 1
+        self.search_index.insert_rows(first, model.groups[first:last + 1], model.names[first:last + 1])
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        pos = bisect.bisect_left(self._rows, first)
+        # 插入点之后的源行号整体后移
+        self._rows[pos:] = [row + count for row in self._rows[pos:]]
+        added = [row for row in range(first, last + 1) if self._accepts(row)]
+        if added:
+            self.beginInsertRows(QModelIndex(), pos, pos + len(added) - 1)
+            self._rows[pos:pos] = added
+            self.endInsertRows()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None:
+            start, end = first, last + 1
+        else:
+            start = bisect.bisect_left(self._rows, first)
+            end = bisect.bisect_right(self._rows, last)
+        self._pending_removal = (start, end)
+        if end > start:
+            self.beginRemoveRows(QModelIndex(), start, end - 1)
+
+    def _on_rows_removed(self, parent, first, last):
+        start, end = self._pending_removal
+        self._pending_removal = None
+        count = last - first + 1
+        self.search_index.remove_rows(first, count)
+        if self._rows is not None:
+            self._rows[start:] = [row - count for row in self._rows[end:]]
+        if end > start:
+            self.endRemoveRows()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        # 有过滤时源区间的首尾行可能不可见，按可见行号列表折算成代理中的区间
+        first, last = top_left.row(), bottom_right.row()
+        if self._rows is not None:
+            first = bisect.bisect_left(self._rows, first)
+            last = bisect.bisect_right(self._rows, last) - 1
+        if first <= last:
+            self.dataChanged.emit(self.index(first, top_left.column()), self.index(last, bottom_right.column()), roles)
+
+    # ---- 行号映射 ----
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        # 无参数调用时保持 QObject.parent() 的语义
+        if index is None:
+            return super().parent()
+        return QModelIndex()
+
+    def source_row(self, proxy_row):
+        return proxy_row if self._rows is None else self._rows[proxy_row]
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        return self.sourceModel().index(self.source_row(proxy_index.row()), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            pos = bisect.bisect_left(self._rows, row)
+            if pos >= len(self._rows) or self._rows[pos] != row:
+                return QModelIndex()
+            row = pos
+        return self.createIndex(row, source_index.column())
@@ -0,0 +1,106 @@
+import bisect
+
+
+def _lowered(values):
+    # 早期导入可能留下 NULL 分组，按空串处理
+    return [(value or '').lower() for value in values]
+
+
+class SearchIndex:
+    """主界面 分组/名称 双搜索框的子串搜索索引（不区分大小写）。
+    
+    每次重新加载时对两列各做一次小写化；搜索时若新关键字包含上一次的关键字
+    （连续输入的常见情况），只在上一次的结果中继续筛选。
+    首次全量扫描时，若关键字在整列中出现次数较少，则在拼接后的整列字符串上用
+    str.find 跳跃定位，耗时只与命中数有关；否则逐行判断。
+    """
+    # 命中数少于总行数的这个比例时走 find 跳跃路径
+    SPARSE_RATIO = 0.1
+    # 搜索框是单行输入，关键字不会包含换行，因此命中不会跨越两行
+    SEPARATOR = '\n'
+
+    def __init__(self, groups=(), names=()):
+        self.rebuild(groups, names)
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def rebuild(self, groups, names):
+        self._columns = (_lowered(groups), _lowered(names))
+        self._invalidate()
+
+    def insert_rows(self, row, groups, names):
+        self._columns[0][row:row] = _lowered(groups)
+        self._columns[1][row:row] = _lowered(names)
+        self._invalidate()
+
+    def remove_rows(self, row, count):
+        for column in self._columns:
+            del column[row:row + count]
+        self._invalidate()
+
+    def _invalidate(self):
+        # 拼接字符串和行起点在需要全量稀疏扫描时才构建
+        self._joined = [None, None]
+        self._last_query = None
+        self._last_rows = None
+
+    def matches(self, row, group_filter, name_filter):
+        group_filter, name_filter = group_filter.lower(), name_filter.lower()
+        return group_filter in self._columns[0][row] and name_filter in self._columns[1][row]
+
+    def search(self, group_filter, name_filter):
+        """返回匹配的行号列表（升序）；两个关键字都为空时返回 None，表示全部行"""
+        query = (group_filter.lower(), name_filter.lower())
+        if not any(query):
+            self._last_query, self._last_rows = query, None
+            return None
+
+        candidates = None
+        if self._last_query is not None and self._last_rows is not None \
+                and all(old in new for old, new in zip(self._last_query, query)):
+            candidates = self._last_rows
+
+        for column, text in enumerate(query):
+            if not text:
+                continue
+            if candidates is None:
+                candidates = self._scan(column, text)
+            else:
+                values = self._columns[column]
+                candidates = [row for row in candidates if text in values[row]]
+
+        self._last_query, self._last_rows = query, candidates
+        return candidates
+
+    def _scan(self, column, text):
+        values = self._columns[column]
+        joined, starts = self._joined_column(column)
+        if joined.count(text) > len(values) * self.SPARSE_RATIO:
+            return [row for row, value in enumerate(values) if text in value]
+
+        rows = []
+        find = joined.find
+        pos = 0
+        last_row = len(starts) - 1
+        while True:
+            hit = find(text, pos)
+            if hit < 0:
+                return rows
+            row = bisect.bisect_right(starts, hit) - 1
+            rows.append(row)
+            if row >= last_row:
+                return rows
+            pos = starts[row + 1]
+
+    def _joined_column(self, column):
+        cached = self._joined[column]
+        if cached is None:
+            values = self._columns[column]
+            starts = []
+            offset = 0
+            for value in values:
+                starts.append(offset)
+                offset += len(value) + 1
+            cached = self._joined[column] = (self.SEPARATOR.join(values), starts)
+        return cached
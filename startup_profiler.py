@@ -0,0 +1,50 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """记录启动过程中各阶段的耗时。
+
+    只依赖标准库，main.py 在导入 PyQt5 之前就创建它，因此 import 阶段也能计入。
+    阶段按 phase() 的调用顺序排列；同名阶段多次出现时耗时累加。
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        begin = self.clock()
+        try:
+            yield
+        finally:
+            self.record(name, self.clock() - begin)
+
+    def record(self, name, seconds):
+        """直接计入一段无法用 with 包住的耗时（例如跨越事件循环的阶段）"""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        """从创建到现在的总耗时（秒），包含未计入任何阶段的部分"""
+        return self.clock() - self.started
+
+    def to_dict(self):
+        return {
+            'phases_ms': {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()},
+            'total_ms': round(self.elapsed() * 1000, 2),
+        }
+
+    def report(self):
+        """人类可读的分阶段耗时表"""
+        total = self.elapsed()
+        width = max([len(name) for name in self.phases] + [len('total')])
+        lines = [f"{name.ljust(width)}  {seconds * 1000:8.1f} ms" for name, seconds in self.phases.items()]
+        lines.append(f"{'total'.ljust(width)}  {total * 1000:8.1f} ms")
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
@@ -0,0 +1,43 @@
+"""测试共用的夹具：临时数据库文件、按旧版本结构准备的数据库，以及 Qt 应用对象"""
+import os
+import sqlite3
+
+import pytest
+
+from database import MIGRATIONS, PasswordDatabase, SharedConnection
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    yield str(tmp_path / 'passwords.db')
+    SharedConnection.close_all()
+
+
+@pytest.fixture
+def db(db_path):
+    return PasswordDatabase(db_path)
+
+
+@pytest.fixture
+def legacy_db(db_path):
+    """legacy_db(version, sql, rows) 建一个停在 version 步迁移的库，执行 sql 插入 rows 后再正常打开，触发其余迁移"""
+    def open_legacy(version, sql=None, rows=()):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        for step in MIGRATIONS[:version]:
+            step(cursor)
+        if sql:
+            cursor.executemany(sql, rows)
+        cursor.execute(f'PRAGMA user_version = {version}')
+        conn.commit()
+        conn.close()
+        return PasswordDatabase(db_path)
+    return open_legacy
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    pytest.importorskip('PyQt5')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
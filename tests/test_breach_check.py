@@ -0,0 +1,88 @@
+"""离线泄露检测的测试：小型排序哈希文件，分别在有索引、无索引和索引失效时查找"""
+import threading
+
+import pytest
+
+import breach_check
+from breach_check import INDEX_SUFFIX, IndexMismatch, PwnedHashFile, build_index, sha1_hex
+
+LEAKED = {f'leaked{i}': i + 1 for i in range(2000)}
+
+
+def _write_dump(path, passwords, newline='\r\n'):
+    lines = sorted(f'{sha1_hex(password)}:{count}' for password, count in passwords.items())
+    with open(path, 'w', newline=newline) as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+@pytest.fixture
+def dump(tmp_path):
+    path = str(tmp_path / 'pwned.txt')
+    _write_dump(path, LEAKED)
+    return path
+
+
+def _check_lookups(hash_file):
+    for password in ('leaked0', 'leaked777', 'leaked1999'):
+        assert hash_file.lookup(sha1_hex(password)) == LEAKED[password]
+    for password in ('safe', 'leaked2000', ''):
+        assert hash_file.lookup(sha1_hex(password)) == 0
+    assert hash_file.lookup(sha1_hex('leaked5').lower()) == 6
+
+
+def test_lookup_without_index(dump):
+    with PwnedHashFile(dump) as hash_file:
+        assert hash_file.index is None
+        _check_lookups(hash_file)
+
+
+@pytest.mark.parametrize('prefix_bits', [4, 12])
+def test_lookup_with_index(dump, prefix_bits):
+    assert build_index(dump, prefix_bits=prefix_bits) == dump + INDEX_SUFFIX
+    with PwnedHashFile(dump) as hash_file:
+        assert hash_file.index is not None
+        _check_lookups(hash_file)
+
+
+def test_lf_line_endings(tmp_path):
+    path = str(tmp_path / 'pwned.txt')
+    _write_dump(path, LEAKED, newline='\n')
+    build_index(path, prefix_bits=8)
+    with PwnedHashFile(path) as hash_file:
+        _check_lookups(hash_file)
+
+
+def test_stale_index_is_ignored_or_rejected(dump):
+    build_index(dump, prefix_bits=8)
+    # 哈希文件更新后（少了一条），自动找到的索引被忽略，仍能正确查找
+    _write_dump(dump, {password: count for password, count in LEAKED.items() if password != 'leaked0'})
+    with PwnedHashFile(dump) as hash_file:
+        assert hash_file.index is None
+        assert hash_file.lookup(sha1_hex('leaked777')) == 778
+        assert hash_file.lookup(sha1_hex('leaked0')) == 0
+    with pytest.raises(IndexMismatch):
+        PwnedHashFile(dump, dump + INDEX_SUFFIX)
+
+
+@pytest.mark.parametrize('damage', [lambda data: data[:-1], lambda data: b'x', lambda data: b'NOTANIDX' + data[8:]])
+def test_damaged_index_is_ignored(dump, damage):
+    index_path = build_index(dump, prefix_bits=8)
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    with open(index_path, 'wb') as f:
+        f.write(damage(data))
+    with PwnedHashFile(dump) as hash_file:
+        assert hash_file.index is None
+        _check_lookups(hash_file)
+
+
+def test_check_vault_passwords(db, dump):
+    ids = [db.add_password(name, 'u', password, 'g')[0]
+           for name, password in (('a', 'leaked3'), ('b', 'safe'), ('c', 'leaked3'), ('d', 'leaked10'))]
+    hashes = breach_check.collect_hashes(db)
+    assert len(hashes) == 3
+    with PwnedHashFile(dump) as hash_file:
+        assert breach_check.check_hashes(hash_file, hashes) == {ids[0]: 4, ids[2]: 4, ids[3]: 11}
+        cancelled = threading.Event()
+        cancelled.set()
+        assert breach_check.check_hashes(hash_file, hashes, cancelled=cancelled) == {}
@@ -0,0 +1,220 @@
+"""PasswordDatabase 写入路径的测试，每个用例使用临时目录中的独立数据库文件"""
+import json
+import sqlite3
+
+import pytest
+
+import password_gen
+import vault_io
+from database import HISTORY_KEEP_ROTATIONS, MIGRATIONS, SCHEMA_VERSION, PasswordDatabase, SharedConnection
+
+
+def _record(name, password='p', group='g', username='u', note=''):
+    return {'group': group, 'name': name, 'username': username, 'password': password, 'note': note}
+
+
+# ---- bulk_upsert ----
+
+def test_bulk_upsert_counts_added_updated_unchanged(db):
+    assert db.bulk_upsert([_record('a'), _record('b'), _record('a', group='h')]) == (3, 0, 0)
+    result = db.bulk_upsert([
+        _record('a'),                   # 完全相同
+        _record('b', password='new'),   # 密码变化
+        _record('a', group='h', note='备注'),  # 备注变化
+        _record('c'),                   # 新增
+    ])
+    assert result == (1, 2, 1)
+    b = db.get_password_id('g', 'b')
+    assert db.get_password(b) == 'new'
+    assert db.get_note(db.get_password_id('h', 'a')) == '备注'
+    assert db.count_passwords() == 4
+
+
+def test_bulk_upsert_matches_on_group_and_name_and_keeps_id(db):
+    db.bulk_upsert([_record('a', username='old')])
+    original = db.get_password_id('g', 'a')
+    db.bulk_upsert([_record('a', username='new')])
+    assert db.get_password_id('g', 'a') == original
+    assert db.get_username(original) == 'new'
+    # 同名不同组是另一条记录
+    db.bulk_upsert([_record('a', group='other')])
+    assert db.get_password_id('other', 'a') != original
+
+
+def test_bulk_upsert_later_duplicate_in_batch_wins(db):
+    assert db.bulk_upsert([_record('a', password='1'), _record('a', password='2')]) == (1, 1, 0)
+    assert db.get_password(db.get_password_id('g', 'a')) == '2'
+
+
+def test_bulk_upsert_defaults_null_group_and_note_and_skips_incomplete(db):
+    result = db.bulk_upsert([
+        {'group': None, 'name': 'a', 'username': 'u', 'password': 'p', 'note': None},
+        {'group': 'g', 'name': 'b', 'username': 'u'},   # 缺少密码
+    ])
+    assert result == (1, 0, 0)
+    assert db.list_entries() == [(db.get_password_id('未分组', 'a'), '未分组', 'a')]
+    assert db.get_note(db.get_password_id('未分组', 'a')) == ''
+
+
+def test_bulk_upsert_registers_new_groups(db):
+    db.bulk_upsert([_record('a', group='新分组')])
+    assert '新分组' in db.get_all_groups()
+
+
+def test_bulk_upsert_compares_plaintext_when_encrypted(db):
+    pytest.importorskip('cryptography')
+    db.bulk_upsert([_record('a', password='secret')])
+    db.enable_encryption('主密码')
+    # 每次加密的 nonce 不同，密文必然不同；相同明文仍算作未变化
+    assert db.bulk_upsert([_record('a', password='secret')]) == (0, 0, 1)
+    assert db.bulk_upsert([_record('a', password='other')]) == (0, 1, 0)
+    assert db.get_password(db.get_password_id('g', 'a')) == 'other'
+
+def test_import_rolls_back_entirely_on_malformed_file(db, tmp_path):
+    db.bulk_upsert([_record('keep')])
+    path = tmp_path / 'broken.json'
+    # 第一批（batch_size=1）已经写入后才遇到格式错误
+    path.write_text('[' + json.dumps(_record('a')) + ', ' + json.dumps(_record('b')) + ' oops]', encoding='utf-8')
+    with pytest.raises(ValueError):
+        vault_io.import_json(db, str(path), batch_size=1)
+    assert [name for _, _, name in db.list_entries()] == ['keep']
+
+
+def test_export_then_import_is_unchanged(db, tmp_path):
+    db.bulk_upsert([_record('a', note='多行\n备注'), _record('b', group='h', password='"quoted"')])
+    path = str(tmp_path / 'export.json')
+    assert vault_io.export_json(db, path) == 2
+    assert vault_io.import_json(db, path) == (0, 0, 2)
+
+
+# ---- 迁移 ----
+
+def _user_version(db):
+    return db.conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def test_fresh_database_runs_every_migration(db):
+    assert _user_version(db) == SCHEMA_VERSION
+    assert db.get_all_groups() == ['未分组']
+
+
+def test_original_schema_upgrades_to_latest(db_path):
+    # 最早版本的库：没有 note 列、没有 groups 表、没有唯一索引，存在重名、ID 空洞和 NULL 分组
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE passwords (id INTEGER PRIMARY KEY, name TEXT NOT NULL, username TEXT NOT NULL, '
+                 "password TEXT NOT NULL, group_name TEXT DEFAULT '未分组')")
+    conn.executemany('INSERT INTO passwords (id, name, username, password, group_name) VALUES (?, ?, ?, ?, ?)', [
+        (1, 'mail', 'u1', 'p1', '工作'),
+        (2, 'mail', 'u2', 'p2', '工作'),
+        (3, 'mail (2)', 'u3', 'p3', '工作'),
+        (6, 'bank', 'u6', 'p6', None),
+    ])
+    conn.commit()
+    conn.close()
+
+    db = PasswordDatabase(db_path)
+    assert _user_version(db) == SCHEMA_VERSION
+    assert db.list_entries() == [(1, '工作', 'mail'), (3, '工作', 'mail (2)'), (2, '工作', 'mail (2-2)'),
+                                 (6, '未分组', 'bank')]
+    assert db.get_note(1) == ''
+    assert db.get_all_groups() == ['工作', '未分组']
+    assert [row[0] for row in db.search('u2')] == [2]
+    # 空洞 4、5 登记在 free_ids 中，新记录优先复用
+    assert db.add_password('new', 'u', 'p', '工作')[0] == 4
+    # 唯一索引已建立
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_password('mail', 'u', 'p', '工作')
+
+
+@pytest.mark.parametrize('version', range(1, SCHEMA_VERSION))
+def test_each_intermediate_version_upgrades(legacy_db, version):
+    db = legacy_db(version, 'INSERT INTO passwords (id, name, username, password, group_name) VALUES (?, ?, ?, ?, ?)',
+                   [(1, 'a', 'u', 'p', 'g')])
+    assert _user_version(db) == SCHEMA_VERSION
+    assert db.list_entries() == [(1, 'g', 'a')]
+    assert db.get_password(1) == 'p'
+
+
+def test_reopening_does_not_rerun_migrations(db_path, monkeypatch):
+    PasswordDatabase(db_path).add_password('a', 'u', 'p', 'g')
+    SharedConnection.close_all()
+    calls = []
+    monkeypatch.setattr('database.MIGRATIONS', [lambda cursor: calls.append(cursor)] * len(MIGRATIONS))
+    db = PasswordDatabase(db_path)
+    assert calls == []
+    assert db.count_passwords() == 1
+
+
+# ---- 批量更换与撤销 ----
+
+@pytest.fixture
+def three(db):
+    return [db.add_password(f'n{i}', 'u', f'old{i}', 'g')[0] for i in range(3)]
+
+
+def _passwords(db, ids):
+    return [db.get_password(i) for i in ids]
+
+
+def test_rotation_writes_history_and_undo_restores(db, three):
+    rotation, changed = password_gen.rotate_passwords(db, three, password_gen.DEFAULT_POLICY)
+    assert changed == 3
+    rotated = _passwords(db, three)
+    assert all(len(p) == password_gen.DEFAULT_POLICY.length for p in rotated)
+    assert [h[2] for h in db.get_password_history(three[0])] == ['old0']
+    last_rotation, _, count, undoes = db.last_rotation()
+    assert (last_rotation, count, undoes) == (rotation, 3, None)
+
+    new_rotation, restored, skipped = db.restore_rotation(rotation)
+    assert (restored, skipped) == (3, [])
+    assert _passwords(db, three) == ['old0', 'old1', 'old2']
+    # 撤销本身也是一批，指向被撤销的批次，再执行一次即重做
+    assert db.last_rotation()[0] == new_rotation and db.last_rotation()[3] == rotation
+    db.restore_rotation(new_rotation)
+    assert _passwords(db, three) == rotated
+
+
+def test_undo_skips_rows_edited_after_rotation(db, three):
+    rotation, _ = db.rotate_passwords([(i, f'new{k}') for k, i in enumerate(three)])
+    db.update_password(three[1], 'n1', 'u', 'manual', 'g')
+    _, restored, skipped = db.restore_rotation(rotation)
+    assert (restored, skipped) == (2, [three[1]])
+    assert _passwords(db, three) == ['old0', 'manual', 'old2']
+
+
+def test_undo_with_every_row_edited_creates_no_batch(db, three):
+    rotation, _ = db.rotate_passwords([(three[0], 'new')])
+    db.update_password(three[0], 'n0', 'u', 'manual', 'g')
+    assert db.restore_rotation(rotation) == (None, 0, [three[0]])
+    assert db.last_rotation()[0] == rotation
+    assert db.get_password(three[0]) == 'manual'
+
+
+def test_history_keeps_only_recent_rotations(db, three):
+    rotations = [db.rotate_passwords([(three[0], f'v{k}')])[0] for k in range(HISTORY_KEEP_ROTATIONS + 2)]
+    kept = [h[0] for h in db.get_password_history(three[0])]
+    assert kept == rotations[::-1][:HISTORY_KEEP_ROTATIONS]
+
+
+def test_purge_removes_all_history(db, three):
+    db.rotate_passwords([(i, 'new') for i in three])
+    assert db.purge_password_history() == 3
+    assert db.last_rotation() is None
+    assert db.get_password_history(three[0]) == []
+    assert _passwords(db, three) == ['new'] * 3
+
+
+def test_undo_compares_plaintext_when_encrypted(db, three):
+    pytest.importorskip('cryptography')
+    # 加密前的一批：启用加密时历史与 replacement 一起被加密，nonce 不同，只能按明文比较
+    rotation, _ = db.rotate_passwords([(i, f'new{k}') for k, i in enumerate(three)])
+    db.enable_encryption('主密码')
+    db.update_password(three[2], 'n2', 'u', 'manual', 'g')
+    _, restored, skipped = db.restore_rotation(rotation)
+    assert (restored, skipped) == (2, [three[2]])
+    assert _passwords(db, three) == ['old0', 'old1', 'manual']
+
+    rotation, _ = db.rotate_passwords([(three[0], 'again')])
+    assert db.restore_rotation(rotation)[1] == 1
+    assert db.get_password(three[0]) == 'old0'
+
@@ -0,0 +1,32 @@
+"""FuzzyMatcher 的排序测试：命中超过 SCORE_LIMIT 时，排在库末尾的强匹配不能被截掉"""
+from fuzzy import FuzzyMatcher
+
+
+def test_boundary_hits_beyond_score_limit_are_ranked():
+    filler = [(i, 'x', f'word-g{i}') for i in range(FuzzyMatcher.SCORE_LIMIT + 100)]
+    matcher = FuzzyMatcher(filler + [(9999, 'g', 'mail')])
+    results = matcher.search('g', limit=3)
+    assert results[0][1] == 9999
+    assert len(results) == 3
+
+
+def test_boundary_scores_match_full_scoring():
+    entries = [(i, 'x', f'word-gm{i}') for i in range(FuzzyMatcher.SCORE_LIMIT + 1)] + [(9999, 'gm', 'a')]
+    matcher = FuzzyMatcher(entries)
+    ranked = dict((entry_id, value) for value, entry_id in matcher.search('gm', limit=len(entries)))
+    small = FuzzyMatcher([entries[0], entries[-1]])
+    assert dict((entry_id, value) for value, entry_id in small.search('gm')) == \
+        {entry_id: ranked[entry_id] for entry_id in (0, 9999)}
+
+
+def test_tight_match_beyond_score_limit_survives_prescreen():
+    # 没有词首命中：只能按预估分（命中跨度、文本长度）挑选候选，而不是按库中的位置
+    filler = [(i, 'x', f'qaqqqqqqqqb{i}') for i in range(FuzzyMatcher.SCORE_LIMIT + 100)]
+    matcher = FuzzyMatcher(filler + [(9999, 'x', 'zab')])
+    assert matcher.search('ab', limit=1)[0][1] == 9999
+
+
+def test_incremental_query_narrows_previous_hits():
+    matcher = FuzzyMatcher([(1, 'mail', 'github'), (2, 'bank', 'gitee'), (3, 'x', 'y')])
+    assert {entry_id for _, entry_id in matcher.search('g')} == {1, 2}
+    assert [entry_id for _, entry_id in matcher.search('gith')] == [1]
@@ -0,0 +1,25 @@
+"""PasswordMenu 的构建测试：条目来自按旧版本结构准备的数据库"""
+from database import MIGRATIONS
+
+INSERT = 'INSERT INTO passwords (id, name, username, password, group_name) VALUES (?, ?, ?, ?, ?)'
+
+
+def test_menu_builds_from_vault_with_null_groups(qapp, legacy_db):
+    # 早期导入留下的 NULL 分组，其中一条与“未分组”中已有的名称重复
+    db = legacy_db(len(MIGRATIONS) - 1, INSERT, [
+        (1, 'a', 'u', 'p', None),
+        (2, 'b', 'u', 'p', 'g'),
+        (3, 'a', 'u', 'p', '未分组'),
+        (4, 'c', 'u', 'p', None),
+    ])
+    from autofill import RecordingBackend
+    from menu import PasswordMenu
+
+    entries = db.list_entries()
+    assert all(group_name is not None for _, group_name, _ in entries)
+    assert db.get_entry(1) == (1, '未分组', 'a (1)')
+    assert db.get_entry(3) == (3, '未分组', 'a')
+
+    menu = PasswordMenu(entries, input_backend=RecordingBackend())
+    groups = [action.text() for action in menu.actions() if action.menu() is not None]
+    assert groups == ['g', '未分组']
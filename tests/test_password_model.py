@@ -0,0 +1,71 @@
+"""PasswordTableModel 的分页载入和泄露标记测试"""
+from database import MIGRATIONS
+
+INSERT = 'INSERT INTO passwords (id, name, username, password, group_name) VALUES (?, ?, ?, ?, ?)'
+
+
+def _null_group_vault(legacy_db):
+    # 1500 条 NULL 分组（超过一页）在前，500 条分组 g 在后
+    rows = [(i, f'n{i:05d}', 'u', 'p', None) for i in range(1, 1501)]
+    rows += [(i, f'n{i:05d}', 'u', 'p', 'g') for i in range(1501, 2001)]
+    return legacy_db(len(MIGRATIONS) - 1, INSERT, rows)
+
+
+def test_paging_loads_every_row_after_null_groups(qapp, legacy_db):
+    from password_model import PasswordTableModel
+    db = _null_group_vault(legacy_db)
+
+    model = PasswordTableModel()
+    model.set_source(db)
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 2000
+    assert model.ids == [entry[0] for entry in db.list_entries()]
+    # 刷新已载入范围用的 until 查询同样覆盖全部行
+    assert len(db.list_entries(until=(model.group_at(1999), model.name_at(1999)))) == 2000
+
+
+def test_fetch_all_after_first_page(qapp, legacy_db):
+    from password_model import PasswordTableModel
+    db = _null_group_vault(legacy_db)
+
+    model = PasswordTableModel()
+    model.set_source(db)
+    assert model.rowCount() == PasswordTableModel.PAGE_SIZE
+    model.fetch_all()
+    assert model.rowCount() == 2000
+
+
+def test_inserted_record_lands_where_the_database_sorts_it(qapp, legacy_db):
+    from password_model import PasswordTableModel
+    db = _null_group_vault(legacy_db)
+
+    model = PasswordTableModel()
+    model.set_source(db)
+    model.fetch_all()
+    record = db.add_password('n00000', 'u', 'p', '未分组')
+    model.insert_record(record)
+    assert model.ids == [entry[0] for entry in db.list_entries()]
+
+
+
+def test_flags_of_records_changed_during_scan_are_dropped(qapp):
+    from password_model import PasswordTableModel
+    model = PasswordTableModel()
+
+    model.begin_breach_scan()
+    model.clear_breach_flags([2])
+    assert model.finish_breach_scan({1: 5, 2: 3}) == {1: 5}
+    assert (model.breach_count(1), model.breach_count(2)) == (5, 0)
+
+    # 检测期间清除了全部标记（如撤销批量更换），整个结果作废
+    model.begin_breach_scan()
+    model.clear_breach_flags()
+    assert model.finish_breach_scan({1: 5}) == {}
+    assert model.breach_count(1) == 0
+
+    # 检测结束后不再记录
+    model.set_breach_flags({3: 1})
+    model.clear_breach_flags([4])
+    assert model.finish_breach_scan() == {}
+    assert model.breach_count(3) == 1
@@ -0,0 +1,125 @@
+"""TriggerStateMachine 的行为测试：事件经 SyntheticEventSource 注入，不需要 Windows 钩子"""
+import os
+import threading
+import time
+
+import pytest
+
+from trigger import VK_ESCAPE, SyntheticEventSource, TriggerStateMachine
+
+
+class Harness:
+    """与 HotkeyManager.on_input_event 相同的接线：事件交给状态机，返回是否拦截，并记下每次的决定"""
+
+    def __init__(self):
+        self.machine = TriggerStateMachine()
+        self.filling = False
+        self.decisions = []
+        self.source = SyntheticEventSource(self.on_event)
+
+    def on_event(self, event):
+        decision = self.machine.handle(event, filling=self.filling)
+        self.decisions.append(decision)
+        return decision.consume
+
+    @property
+    def last(self):
+        return self.decisions[-1]
+
+
+@pytest.fixture
+def harness():
+    return Harness()
+
+
+def test_ctrl_right_click_requests_menu_at_cursor(harness):
+    assert harness.source.click(120, 340) is True
+    assert harness.last.show == (120, 340)
+    assert harness.last.cancel_fill is False
+    assert harness.machine.state == TriggerStateMachine.PENDING
+
+
+def test_plain_right_click_passes_through(harness):
+    assert harness.source.click(10, 20, ctrl=False) is False
+    assert harness.last.show is None
+    assert harness.machine.state == TriggerStateMachine.IDLE
+
+
+def test_repeats_while_pending_are_consumed_but_merged(harness):
+    harness.source.click(1, 1)
+    # GUI 线程还没弹出菜单：后续的 Ctrl+右键照样拦截，但不再请求弹出
+    assert harness.source.click(2, 2) is True
+    assert harness.source.click(3, 3) is True
+    assert [d.show for d in harness.decisions] == [(1, 1), None, None]
+
+
+def test_menu_shown_allows_next_trigger(harness):
+    harness.source.click(1, 1)
+    harness.machine.menu_shown()
+    assert harness.machine.state == TriggerStateMachine.IDLE
+    harness.source.click(5, 6)
+    assert harness.last.show == (5, 6)
+
+
+def test_escape_cancels_fill_without_consuming_key(harness):
+    harness.filling = True
+    assert harness.source.key(VK_ESCAPE) is False
+    assert harness.last.cancel_fill is True
+
+
+def test_escape_without_fill_is_ignored(harness):
+    assert harness.source.key(VK_ESCAPE) is False
+    assert harness.last.cancel_fill is False
+
+
+def test_other_keys_never_cancel_fill(harness):
+    harness.filling = True
+    harness.source.key(0x41)
+    assert harness.last.cancel_fill is False
+
+
+def test_new_trigger_during_fill_cancels_it(harness):
+    harness.filling = True
+    harness.source.click(7, 8)
+    assert harness.last.show == (7, 8)
+    assert harness.last.cancel_fill is True
+
+
+def test_escape_cancels_running_fill_through_hotkey_manager(tmp_path, monkeypatch):
+    pytest.importorskip('PyQt5')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    # HotkeyManager 使用当前目录下的 passwords.db
+    monkeypatch.chdir(tmp_path)
+    from database import SharedConnection
+    from hotkey_manager import HotkeyManager
+
+    started = threading.Event()
+
+    class BlockingBackend:
+        """输入前一直等到被取消，模拟正在进行中的填充"""
+        def send(self, steps, cancelled=None):
+            started.set()
+            cancelled.wait(5)
+
+    manager = HotkeyManager(event_source_factory=SyntheticEventSource)
+    try:
+        cancelled_jobs = []
+        manager.fill_worker.fill_cancelled.connect(cancelled_jobs.append)
+        job_id = manager.fill_worker.submit(BlockingBackend(), [])
+        assert started.wait(5)
+        # 有填充任务时才监听键盘
+        assert manager.event_source.key_watch is True
+        assert manager.event_source.key(VK_ESCAPE) is False
+        for _ in range(500):
+            app.processEvents()
+            if cancelled_jobs:
+                break
+            time.sleep(0.01)
+        assert cancelled_jobs == [job_id]
+        assert manager.event_source.key_watch is False
+    finally:
+        manager.close()
+        manager.fill_worker.stop(5)
+        SharedConnection.close_all()
@@ -0,0 +1,29 @@
+"""JsonArrayReader 的增量解析测试：数据块可以小到一个字节，元素会在任意位置被切开"""
+import io
+import json
+
+import pytest
+
+from vault_io import JsonArrayReader
+
+SAMPLE = '[1e5, 100, -4.5e-3, 7, "a\\u4e2d", {"group": null, "n": [1, 22]}, true, false, null, 12]'
+
+
+def _read(text, chunk_size):
+    return list(JsonArrayReader(io.BytesIO(text.encode('utf-8')), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 64 * 1024])
+def test_elements_split_across_chunks(chunk_size):
+    assert _read(SAMPLE, chunk_size) == json.loads(SAMPLE)
+
+
+def test_number_at_end_of_array():
+    assert _read('[100]', 1) == [100]
+    assert _read('[]', 1) == []
+
+
+@pytest.mark.parametrize('text', ['[1e, 2]', '[1 2]', '{"a": 1}', '[1, }'])
+def test_malformed_input_is_rejected(text):
+    with pytest.raises(ValueError):
+        _read(text, 1)
@@ -0,0 +1,280 @@
+import json
+import math
+import sys
+import time
+from collections import namedtuple
+
+
+# ---- 输入事件 ----
+# 事件源把底层输入（Win32 低级钩子或测试中的合成事件）统一翻译成 InputEvent，
+# 交给 TriggerStateMachine 判断该做什么；状态机本身不依赖 Windows 也不依赖 Qt。
+
+EVENT_RBUTTON_DOWN = 'rbutton_down'
+EVENT_KEY_DOWN = 'key_down'
+
+VK_ESCAPE = 0x1B
+
+# timestamp 为 time.perf_counter()，作为整条链路耗时追踪的起点
+InputEvent = namedtuple('InputEvent', 'kind x y ctrl vk timestamp')
+
+# 状态机的处理结果：consume 表示拦截这次输入；show 为需要弹出菜单的位置 (x, y)；
+# cancel_fill 表示取消尚未完成的自动填充
+Decision = namedtuple('Decision', 'consume show cancel_fill')
+PASS = Decision(False, None, False)
+
+
+def mouse_event(x, y, ctrl, timestamp=None):
+    return InputEvent(EVENT_RBUTTON_DOWN, x, y, ctrl, None,
+                      time.perf_counter() if timestamp is None else timestamp)
+
+
+def key_event(vk, timestamp=None):
+    return InputEvent(EVENT_KEY_DOWN, None, None, False, vk,
+                      time.perf_counter() if timestamp is None else timestamp)
+
+
+class TriggerStateMachine:
+    """快捷键触发逻辑。
+
+    IDLE：Ctrl+右键按下 -> 拦截并请求弹出菜单，进入 PENDING；
+    PENDING：菜单请求已发出但 GUI 线程尚未处理，此时重复的 Ctrl+右键只拦截不再重复请求，
+             GUI 线程弹出菜单后调用 menu_shown() 回到 IDLE；
+    任意状态下，填充进行中按 Esc 取消填充（不拦截按键）。
+    """
+    IDLE = 'idle'
+    PENDING = 'pending'
+
+    def __init__(self):
+        self.state = self.IDLE
+
+    def handle(self, event, filling=False):
+        if event.kind == EVENT_RBUTTON_DOWN:
+            if not event.ctrl:
+                return PASS
+            if self.state == self.PENDING:
+                return Decision(True, None, False)
+            self.state = self.PENDING
+            # 新的触发意味着用户已放弃上一次尚未完成的填充
+            return Decision(True, (event.x, event.y), filling)
+        if event.kind == EVENT_KEY_DOWN and event.vk == VK_ESCAPE and filling:
+            return Decision(False, None, True)
+        return PASS
+
+    def menu_shown(self):
+        self.state = self.IDLE
+
+
+# ---- 事件源 ----
+
+class SyntheticEventSource:
+    """测试与基准用的事件源：直接构造事件交给 sink，返回是否被拦截"""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.key_watch = False
+
+    def click(self, x, y, ctrl=True):
+        return self.sink(mouse_event(x, y, ctrl))
+
+    def key(self, vk):
+        return self.sink(key_event(vk))
+
+    def set_key_watch(self, enabled):
+        # 只记录状态；合成按键总是投递，测试可以直接注入
+        self.key_watch = enabled
+
+    def close(self):
+        pass
+
+
+class Win32HookEventSource:
+    """Win32 低级鼠标/键盘钩子。钩子回调在安装线程（GUI 线程）的消息循环中执行，需尽快返回"""
+
+    def __init__(self, sink):
+        import ctypes
+        import win32api
+        import win32con
+        import win32gui
+
+        self.sink = sink
+        self._ctypes = ctypes
+        self._win32api = win32api
+        self._win32con = win32con
+        self._win32gui = win32gui
+        self._user32 = ctypes.windll.user32
+        hook_proc = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_void_p))
+
+        # 回调对象必须保持引用，否则会被回收
+        self._mouse_proc = hook_proc(self._mouse_hook_proc)
+        self.mouse_hook = self._user32.SetWindowsHookExW(win32con.WH_MOUSE_LL, self._mouse_proc, None, 0)
+        if not self.mouse_hook:
+            raise Exception('Failed to set mouse hook')
+        # 键盘钩子只用于在填充过程中监听 Esc，由 set_key_watch 按需安装
+        self._keyboard_proc = hook_proc(self._keyboard_hook_proc)
+        self.keyboard_hook = None
+
+    def set_key_watch(self, enabled):
+        """安装或卸载键盘钩子。低级键盘钩子会让系统中的每一次按键都先经过 Python 回调，只在填充期间安装"""
+        if enabled and not self.keyboard_hook:
+            self.keyboard_hook = self._user32.SetWindowsHookExW(
+                self._win32con.WH_KEYBOARD_LL, self._keyboard_proc, None, 0)
+        elif not enabled and self.keyboard_hook:
+            self._user32.UnhookWindowsHookEx(self.keyboard_hook)
+            self.keyboard_hook = None
+
+    def _mouse_hook_proc(self, nCode, wParam, lParam):
+        try:
+            if nCode >= 0 and wParam == self._win32con.WM_RBUTTONDOWN:
+                timestamp = time.perf_counter()
+                # 检查CTRL键状态 (最高位为1表示按下)
+                ctrl = bool(self._win32api.GetKeyState(self._win32con.VK_CONTROL) & 0x8000)
+                if ctrl:
+                    x, y = self._win32gui.GetCursorPos()
+                    if self.sink(mouse_event(x, y, ctrl, timestamp)):
+                        # 阻止事件传递 (消费掉这个点击)
+                        return 1
+        except:
+            pass
+        # 继续传递事件
+        return self._user32.CallNextHookEx(self.mouse_hook, nCode, wParam, lParam)
+
+    def _keyboard_hook_proc(self, nCode, wParam, lParam):
+        try:
+            if nCode >= 0 and wParam == self._win32con.WM_KEYDOWN:
+                # KBDLLHOOKSTRUCT 的第一个字段是 vkCode
+                vk_code = self._ctypes.cast(lParam, self._ctypes.POINTER(self._ctypes.c_ulong))[0]
+                # 状态机只关心 Esc，其它按键不构造事件
+                if vk_code == VK_ESCAPE and self.sink(key_event(vk_code)):
+                    return 1
+        except:
+            pass
+        return self._user32.CallNextHookEx(self.keyboard_hook, nCode, wParam, lParam)
+
+    def close(self):
+        for name in ('mouse_hook', 'keyboard_hook'):
+            hook = getattr(self, name, None)
+            if hook:
+                try:
+                    self._user32.UnhookWindowsHookEx(hook)
+                except:
+                    pass
+                setattr(self, name, None)
+
+    def __del__(self):
+        self.close()
+
+
+def default_event_source(sink):
+    """生产环境的事件源；非 Windows 平台没有全局钩子，返回 None"""
+    if sys.platform != 'win32':
+        return None
+    return Win32HookEventSource(sink)
+
+
+# ---- 延迟追踪 ----
+
+class LatencyHistogram:
+    """对数分桶的耗时直方图（微秒），每个 2 倍区间分 SUB_BUCKETS 个桶，分位数误差约 19%"""
+    SUB_BUCKETS = 4
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        us = max(seconds * 1e6, 1.0)
+        index = int(math.log2(us) * self.SUB_BUCKETS)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += us
+        self.min = us if self.min is None else min(self.min, us)
+        self.max = us if self.max is None else max(self.max, us)
+
+    def percentile(self, p):
+        """第 p 百分位（微秒），取所在桶的上界，并且不超过实际最大值"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(2 ** ((index + 1) / self.SUB_BUCKETS), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_us': round(self.total / self.count, 1),
+            'min_us': round(self.min, 1),
+            'p50_us': round(self.percentile(50), 1),
+            'p90_us': round(self.percentile(90), 1),
+            'p99_us': round(self.percentile(99), 1),
+            'max_us': round(self.max, 1),
+            'buckets': {str(k): v for k, v in sorted(self.buckets.items())},
+        }
+
+
+class Trace:
+    """一次触发的时间线：起点为输入事件的时间戳，之后每个阶段结束时 mark 一次"""
+
+    def __init__(self, started):
+        self.started = started
+        self.marks = []
+
+    def mark(self, stage):
+        self.marks.append((stage, time.perf_counter()))
+
+    def spans(self):
+        """[(阶段名, 耗时秒)]，每个阶段从上一个 mark（或起点）算起"""
+        result = []
+        previous = self.started
+        for stage, at in self.marks:
+            result.append((stage, at - previous))
+            previous = at
+        return result
+
+
+class LatencyTracer:
+    """按阶段汇总各次触发的耗时，另有 total 记录从输入事件到最后一个阶段的总耗时"""
+    TOTAL = 'total'
+
+    def __init__(self):
+        self.histograms = {}
+        # 阶段首次出现的顺序，输出时保持链路顺序
+        self.stages = []
+
+    def start(self, timestamp=None):
+        return Trace(time.perf_counter() if timestamp is None else timestamp)
+
+    def _histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+            self.stages.append(stage)
+        return histogram
+
+    def finish(self, trace):
+        """把一次触发的各阶段耗时计入直方图，返回总耗时（秒）"""
+        spans = trace.spans()
+        for stage, seconds in spans:
+            self._histogram(stage).record(seconds)
+        total = trace.marks[-1][1] - trace.started if trace.marks else 0.0
+        self._histogram(self.TOTAL).record(total)
+        return total
+
+    def summary(self):
+        return {stage: self.histograms[stage].summary() for stage in self.stages}
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=4)
+
+    def reset(self):
+        self.histograms.clear()
+        self.stages.clear()
@@ -0,0 +1,33 @@
+class VaultCache:
+    """PasswordDatabase 之上的内存快照缓存。
+    
+    快捷键菜单每次弹出都需要完整的密码列表，而两次弹出之间密码库几乎不会变化。
+    缓存以 (本进程写事务计数, PRAGMA data_version) 作为版本戳：
+    本进程内的写入通过共享连接的计数器感知，其他进程的写入通过 data_version 感知。
+    版本戳不变时直接返回上一次的快照，不执行任何查询。
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._rows = None
+        self._stamp = None
+        # 每次重新加载快照后递增，调用方可据此判断是否需要刷新界面
+        self.version = 0
+
+    def _current_stamp(self):
+        return self.db.write_generation, self.db.data_version()
+
+    def is_stale(self):
+        return self._rows is None or self._current_stamp() != self._stamp
+
+    def get_entries(self):
+        """返回与 PasswordDatabase.list_entries 相同格式的只读元组 ((id, group_name, name), ...)"""
+        stamp = self._current_stamp()
+        if self._rows is None or stamp != self._stamp:
+            self._rows = tuple(self.db.list_entries())
+            self._stamp = stamp
+            self.version += 1
+        return self._rows
+
+    def invalidate(self):
+        self._rows = None
@@ -0,0 +1,68 @@
+import base64
+import hashlib
+import importlib.util
+import json
+import os
+
+# cryptography 为可选依赖：未安装时不能启用或解锁加密，明文数据库照常使用。
+# 这里只检查是否已安装，真正的导入（加载 OpenSSL）推迟到第一次创建 VaultCipher 时，
+# 未加密的数据库启动时完全不需要它
+CRYPTO_AVAILABLE = importlib.util.find_spec('cryptography') is not None
+
+# 加密字段的存储格式：前缀 + base64(12字节随机 nonce + 密文 + 16字节 GCM 标签)
+TOKEN_PREFIX = 'enc1:'
+NONCE_SIZE = 12
+KEY_SIZE = 32
+SALT_SIZE = 16
+
+# 主密码派生参数（scrypt，约 32MB 内存）；参数随盐一起保存，以后调整不影响已有数据库
+KDF_PARAMS = {'kdf': 'scrypt', 'n': 2 ** 15, 'r': 8, 'p': 1}
+# 用于校验主密码是否正确的固定明文
+VERIFIER_PLAINTEXT = 'SuperEasyPass'
+
+
+class VaultLockedError(Exception):
+    """数据库已启用加密但尚未解锁（或缺少 cryptography），无法读写加密字段"""
+
+
+def new_salt():
+    return os.urandom(SALT_SIZE)
+
+
+def derive_key(passphrase, salt, params=None):
+    """由主密码派生 256 位密钥，每次解锁只执行一次"""
+    params = params or KDF_PARAMS
+    if params['kdf'] == 'scrypt':
+        n, r, p = params['n'], params['r'], params['p']
+        return hashlib.scrypt(passphrase.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r, dklen=KEY_SIZE)
+    if params['kdf'] == 'pbkdf2':
+        return hashlib.pbkdf2_hmac('sha256', passphrase.encode('utf-8'), salt, params['iterations'], KEY_SIZE)
+    raise ValueError(f"未知的密钥派生算法: {params['kdf']}")
+
+
+def dump_params(params=None):
+    return json.dumps(params or KDF_PARAMS, sort_keys=True)
+
+
+def load_params(text):
+    return json.loads(text)
+
+
+class VaultCipher:
+    """AES-256-GCM 字段加解密，密钥只保存在内存中"""
+
+    def __init__(self, key):
+        if not CRYPTO_AVAILABLE:
+            raise VaultLockedError("未安装 cryptography，无法使用数据库加密")
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        self._aead = AESGCM(key)
+
+    def encrypt(self, plaintext):
+        nonce = os.urandom(NONCE_SIZE)
+        sealed = self._aead.encrypt(nonce, plaintext.encode('utf-8'), None)
+        return TOKEN_PREFIX + base64.b64encode(nonce + sealed).decode('ascii')
+
+    def decrypt(self, token):
+        raw = base64.b64decode(token[len(TOKEN_PREFIX):])
+        return self._aead.decrypt(raw[:NONCE_SIZE], raw[NONCE_SIZE:], None).decode('utf-8')
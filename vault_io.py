@@ -0,0 +1,158 @@
+import codecs
+import json
+import os
+
+IMPORT_BATCH_SIZE = 1000
+READ_CHUNK_SIZE = 64 * 1024
+# 解析错误距缓冲区末尾不超过该字符数时，视为元素被数据块边界截断，读入下一块后重试
+TRUNCATION_MARGIN = 6
+# 可能出现在 JSON 数字中的字符：数字后面紧跟这些字符时，数字可能还没读完
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+class JsonArrayReader:
+    """逐个解析 JSON 数组元素的增量读取器，内存占用只和单个元素大小有关。
+    
+    file_obj 需以二进制模式打开；bytes_read 记录已读取的字节数，用于进度显示。
+    """
+
+    def __init__(self, file_obj, chunk_size=READ_CHUNK_SIZE):
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._json = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """读入下一块数据，返回是否读到了新内容"""
+        if self._eof:
+            return False
+        chunk = self.file_obj.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self._eof = True
+            self._buf += self._decoder.decode(b'', final=True)
+            return False
+        # 丢弃已消费的部分，避免缓冲区随文件增长
+        self._buf = self._buf[self._pos:] + self._decoder.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _next_char(self):
+        """跳过空白，返回下一个有效字符（文件结束返回空串）"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def __iter__(self):
+        if self._next_char() != '[':
+            raise ValueError("JSON格式错误：根元素必须是列表")
+        self._pos += 1
+        first = True
+        while True:
+            char = self._next_char()
+            if char == ']':
+                self._pos += 1
+                return
+            if not first:
+                if char != ',':
+                    raise ValueError(f"JSON格式错误：第 {self.bytes_read} 字节附近缺少逗号")
+                self._pos += 1
+                self._next_char()
+            first = False
+            yield self._decode_element()
+
+    def _decode_element(self):
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+                # 元素恰好在缓冲区末尾结束时（如 true）可能被截断；数字即使没到末尾，后面跟着的也可能是
+                # 被块边界切开的其余部分（'1' 后面的 'e5'），要读到一个不能属于数字的字符才算完整
+                if self._eof or (end < len(self._buf) and not self._number_may_continue(value, end)):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                # 只有出错位置在缓冲区末尾附近时才可能是元素被截断；否则是内容本身有误，
+                # 立即报错，不再把文件剩余部分读进缓冲区反复重试
+                if self._eof or not self._truncated(e):
+                    raise
+            self._fill()
+
+    def _number_may_continue(self, value, end):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return False
+        buf = self._buf
+        while end < len(buf) and buf[end] in NUMBER_CHARS:
+            end += 1
+        return end == len(buf)
+
+    def _truncated(self, error):
+        # 未闭合的字符串报告的是字符串起点，其余错误的位置距末尾不超过一个 \uXXXX 转义或 false 字面量的长度
+        return error.msg.startswith('Unterminated string') or error.pos >= len(self._buf) - TRUNCATION_MARGIN
+
+
+def _format_item(item):
+    """与旧版 json.dump(indent=4) 的输出保持一致：数组元素整体再缩进一级"""
+    return '    ' + json.dumps(item, indent=4, ensure_ascii=False).replace('\n', '\n    ')
+
+
+def export_json(db, file_path, progress=None):
+    """边遍历数据库游标边写文件，不在内存中构造完整列表。返回导出条数。
+    
+    progress(已导出条数, 总条数) 会在每批记录写出后调用。启用加密时逐条解密，导出文件为明文。
+    """
+    total = db.count_passwords()
+    count = 0
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for id, name, username, password, group_name, note in db.iter_all_passwords():
+            f.write(',\n' if count else '\n')
+            f.write(_format_item({
+                "group": group_name,
+                "name": name,
+                "username": username,
+                "password": db.decrypt_field(password),
+                "note": note
+            }))
+            count += 1
+            if progress and count % IMPORT_BATCH_SIZE == 0:
+                progress(count, total)
+        f.write('\n]' if count else ']')
+    if progress:
+        progress(count, total)
+    return count
+
+
+def import_json(db, file_path, progress=None, batch_size=IMPORT_BATCH_SIZE):
+    """增量解析 JSON 文件，按批交给 bulk_upsert 写入，整个导入只提交一次。返回 (新增数, 更新数, 未变化数)。
+    
+    progress(已读取字节数, 文件总字节数) 会在每批写入后调用。
+    """
+    total_bytes = os.path.getsize(file_path)
+    added = updated = unchanged = 0
+    # 所有批次共用一个事务：导入要么全部成功，要么出错时整体回滚
+    with open(file_path, 'rb') as f, db.transaction():
+        reader = JsonArrayReader(f)
+        batch = []
+        for item in reader:
+            if isinstance(item, dict):
+                batch.append(item)
+            if len(batch) >= batch_size:
+                a, u, n = db.bulk_upsert(batch)
+                added, updated, unchanged = added + a, updated + u, unchanged + n
+                batch = []
+                if progress:
+                    progress(reader.bytes_read, total_bytes)
+        if batch:
+            a, u, n = db.bulk_upsert(batch)
+            added, updated, unchanged = added + a, updated + u, unchanged + n
+    if progress:
+        progress(total_bytes, total_bytes)
+    return added, updated, unchanged